@@ -0,0 +1,452 @@
+"""
+Audit Log Module
+
+Append-only record of every insert, update and delete on the data tables,
+written by SQLite triggers so CSV imports, bulk statements and every
+repository write path are covered without Python-side bookkeeping.
+
+Entries are kept small: an insert stores no payload (the row itself is the
+record), an update stores only the columns that changed as a packed JSON
+object of column -> [old, new], and a delete stores the removed row's
+values, since nothing else keeps them. Updates that change nothing are not
+logged at all.
+
+Triggers list the audited columns explicitly, so a migration that adds
+columns to an audited table must call create_audit_triggers() again.
+BLOB columns are stored as hex strings. Old entries are merged by
+compact_audit_log() and dropped by prune_audit_log().
+
+Entries carry everything needed to invert them, so the undo journal is
+just a list of audit id ranges, one per user action: undo applies the
+inverse of each entry in a range, newest first, in one transaction (see
+revert_entries()). Undoing writes audit entries of its own, and redo is
+the inverse of those. Each connection notes the first entry its open
+transaction wrote in a TEMP table (see track_written_entries()), so a range
+never takes in entries another process committed in the meantime.
+"""
+
+import json
+import sqlite3
+
+# Tables whose rows are user data; derived tables (item_registry,
+# usage_rollups, attachment_mounts) are rebuilt from these and not audited
+AUDITED_TABLES = (
+    "firearms",
+    "nfa_items",
+    "soft_gear",
+    "attachments",
+    "consumables",
+    "consumable_transactions",
+    "maintenance_logs",
+    "borrowers",
+    "checkouts",
+    "transfers",
+    "reload_batches",
+    "shot_strings",
+    "loadouts",
+    "loadout_items",
+    "loadout_consumables",
+    "loadout_checkouts",
+    "manifests",
+    "manifest_lines",
+)
+
+INSERT = "I"
+UPDATE = "U"
+DELETE = "D"
+
+# Defaults for GearRepository.prune_audit_log()
+RETENTION_DAYS = 730
+COMPACT_AFTER_DAYS = 30
+
+AUDIT_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS audit_log (
+        id INTEGER PRIMARY KEY,
+        table_name TEXT NOT NULL,
+        row_id TEXT NOT NULL,
+        operation TEXT NOT NULL,
+        timestamp INTEGER NOT NULL,
+        changes TEXT
+    )
+"""
+
+# Single-row watermark: entries below this id have already been compacted
+AUDIT_STATE_SQL = """
+    CREATE TABLE IF NOT EXISTS audit_state (
+        id INTEGER PRIMARY KEY CHECK (id = 1),
+        compacted_through INTEGER NOT NULL DEFAULT 0
+    )
+"""
+
+# One row per user action, undo or redo: the audit entries it wrote.
+# ACTION rows move DONE -> UNDONE -> DONE as they are undone and redone,
+# and are DISCARDED once undone and followed by a new action (no redo).
+JOURNAL_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS undo_journal (
+        id INTEGER PRIMARY KEY,
+        label TEXT NOT NULL,
+        kind TEXT NOT NULL DEFAULT 'ACTION',
+        target INTEGER,
+        first_entry INTEGER NOT NULL,
+        last_entry INTEGER NOT NULL,
+        created INTEGER NOT NULL,
+        state TEXT NOT NULL DEFAULT 'DONE'
+    )
+"""
+
+ACTION = "ACTION"
+UNDO = "UNDO"
+REDO = "REDO"
+
+DONE = "DONE"
+UNDONE = "UNDONE"
+DISCARDED = "DISCARDED"
+
+_NOW = "CAST(strftime('%s', 'now') AS INTEGER)"
+
+
+def _table_columns(cursor: sqlite3.Cursor, table: str) -> dict[str, bool]:
+    """Column name -> whether it is a BLOB column, in table order."""
+    cursor.execute(f"PRAGMA table_info({table})")
+    return {row[1]: row[2].upper() == "BLOB" for row in cursor.fetchall()}
+
+
+def _json_value(row: str, column: str, is_blob: bool) -> str:
+    if is_blob:
+        # JSON cannot hold BLOBs (packed chronograph velocities)
+        return f"iif({row}.{column} IS NULL, NULL, hex({row}.{column}))"
+    return f"{row}.{column}"
+
+
+def _trigger_sql(table: str, columns: dict[str, bool]) -> list[str]:
+    changed = " OR ".join(f"OLD.{c} IS NOT NEW.{c}" for c in columns)
+    diffs = "\n                UNION ALL ".join(
+        f"SELECT '{c}' AS c, json_array("
+        f"{_json_value('OLD', c, blob)}, {_json_value('NEW', c, blob)}) AS v "
+        f"WHERE OLD.{c} IS NOT NEW.{c}"
+        for c, blob in columns.items()
+    )
+    values = ", ".join(
+        f"'{c}', {_json_value('OLD', c, blob)}" for c, blob in columns.items()
+    )
+    insert = "INSERT INTO audit_log (table_name, row_id, operation, timestamp"
+    return [
+        f"""
+        CREATE TRIGGER trg_audit_{table}_insert
+        AFTER INSERT ON {table}
+        BEGIN
+            {insert})
+            VALUES ('{table}', NEW.id, '{INSERT}', {_NOW});
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_audit_{table}_update
+        AFTER UPDATE ON {table}
+        WHEN {changed}
+        BEGIN
+            {insert}, changes)
+            SELECT '{table}', OLD.id, '{UPDATE}', {_NOW},
+                   json_group_object(c, json(v))
+            FROM (
+                {diffs}
+            );
+        END
+        """,
+        f"""
+        CREATE TRIGGER trg_audit_{table}_delete
+        AFTER DELETE ON {table}
+        BEGIN
+            {insert}, changes)
+            VALUES ('{table}', OLD.id, '{DELETE}', {_NOW}, json_object({values}));
+        END
+        """,
+    ]
+
+
+def create_audit_triggers(cursor: sqlite3.Cursor, tables=AUDITED_TABLES) -> None:
+    """(Re)create the audit triggers for tables from their current columns."""
+    for table in tables:
+        drop_audit_triggers(cursor, (table,))
+        for sql in _trigger_sql(table, _table_columns(cursor, table)):
+            cursor.execute(sql)
+
+
+def drop_audit_triggers(cursor: sqlite3.Cursor, tables=AUDITED_TABLES) -> None:
+    for table in tables:
+        for operation in ("insert", "update", "delete"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS trg_audit_{table}_{operation}")
+
+
+def create_audit_schema(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(AUDIT_TABLE_SQL)
+    # Per-row history; the implicit rowid keeps each row's entries in order
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_audit_log_row
+        ON audit_log(table_name, row_id)
+    """)
+    cursor.execute(AUDIT_STATE_SQL)
+    cursor.execute("INSERT OR IGNORE INTO audit_state (id) VALUES (1)")
+    create_audit_triggers(cursor)
+
+
+def create_journal_schema(cursor: sqlite3.Cursor) -> None:
+    cursor.execute(JOURNAL_TABLE_SQL)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_undo_journal_state
+        ON undo_journal(state) WHERE kind = 'ACTION'
+    """)
+
+
+# -------- RETENTION --------
+
+
+def _first_id_at(cursor: sqlite3.Cursor, cutoff: int) -> int | None:
+    """
+    Id of the first entry at or after epoch cutoff. Ids grow with time, so
+    this walks only the entries before the cutoff rather than the table.
+    """
+    cursor.execute(
+        "SELECT id FROM audit_log WHERE timestamp >= ? ORDER BY id LIMIT 1", (cutoff,)
+    )
+    row = cursor.fetchone()
+    if row is not None:
+        return row[0]
+    cursor.execute("SELECT MAX(id) FROM audit_log")
+    last = cursor.fetchone()[0]
+    return None if last is None else last + 1
+
+
+def prune_audit_log(cursor: sqlite3.Cursor, before: int) -> int:
+    """Delete entries older than epoch `before` (caller commits)."""
+    end = _first_id_at(cursor, before)
+    if end is None:
+        return 0
+    cursor.execute("DELETE FROM audit_log WHERE id < ?", (end,))
+    return cursor.rowcount
+
+
+def _merge_updates(entries: list[tuple[int, str]]) -> dict:
+    merged: dict[str, list] = {}
+    for _, changes in entries:
+        for column, (old, new) in json.loads(changes).items():
+            if column in merged:
+                merged[column][1] = new
+            else:
+                merged[column] = [old, new]
+    return {c: pair for c, pair in merged.items() if pair[0] != pair[1]}
+
+
+def compact_audit_log(cursor: sqlite3.Cursor, before: int) -> int:
+    """
+    Merge each row's consecutive updates older than epoch `before` into one
+    entry holding the first old and last new value of every column, so a
+    field edited ten times costs one entry. Inserts and deletes are kept.
+    Resumes from where the previous call stopped. Returns entries removed
+    (caller commits).
+    """
+    cursor.execute("SELECT compacted_through FROM audit_state WHERE id = 1")
+    start = cursor.fetchone()[0]
+    end = _first_id_at(cursor, before)
+    if end is None or end <= start:
+        return 0
+
+    cursor.execute(
+        """
+        SELECT id, table_name, row_id, operation, changes FROM audit_log
+        WHERE id >= ? AND id < ?
+        ORDER BY table_name, row_id, id
+    """,
+        (start, end),
+    )
+    deletes: list[tuple[int]] = []
+    rewrites: list[tuple[str, int]] = []
+
+    def flush(run: list[tuple[int, str]]) -> None:
+        if len(run) < 2:
+            return
+        merged = _merge_updates(run)
+        # The merged entry takes the last update's id and timestamp
+        *older, (last_id, _) = run
+        deletes.extend((entry_id,) for entry_id, _ in older)
+        if merged:
+            rewrites.append((json.dumps(merged, separators=(",", ":")), last_id))
+        else:
+            deletes.append((last_id,))
+
+    run: list[tuple[int, str]] = []
+    key = None
+    for entry_id, table, row_id, operation, changes in cursor.fetchall():
+        if (table, row_id) != key or operation != UPDATE:
+            flush(run)
+            run = []
+            key = (table, row_id)
+        if operation == UPDATE:
+            run.append((entry_id, changes))
+    flush(run)
+
+    cursor.executemany("UPDATE audit_log SET changes = ? WHERE id = ?", rewrites)
+    cursor.executemany("DELETE FROM audit_log WHERE id = ?", deletes)
+    cursor.execute("UPDATE audit_state SET compacted_through = ? WHERE id = 1", (end,))
+    # Merged entries can no longer be inverted one action at a time
+    cursor.execute("DELETE FROM undo_journal WHERE first_entry < ?", (end,))
+    return len(deletes)
+
+
+# -------- UNDO JOURNAL --------
+
+
+def last_entry_id(cursor: sqlite3.Cursor) -> int:
+    cursor.execute("SELECT COALESCE(MAX(id), 0) FROM audit_log")
+    return cursor.fetchone()[0]
+
+
+def track_written_entries(conn: sqlite3.Connection) -> None:
+    """
+    Have conn note the first audit entry of each of its transactions in a
+    TEMP table. TEMP triggers fire only for the connection that created
+    them, and the note commits or rolls back with the transaction.
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS audit_written (first_entry INTEGER)")
+    conn.execute("""
+        CREATE TEMP TRIGGER IF NOT EXISTS audit_written_first
+        AFTER INSERT ON main.audit_log
+        WHEN NOT EXISTS (SELECT 1 FROM temp.audit_written)
+        BEGIN
+            INSERT INTO audit_written VALUES (new.id);
+        END
+    """)
+
+
+def take_written_entries(cursor: sqlite3.Cursor) -> int | None:
+    """
+    First audit entry written by the cursor's open transaction, or None;
+    clears the note for the next transaction. Call just before committing,
+    while the write lock guarantees every later entry is this one's too.
+    """
+    cursor.execute("SELECT first_entry FROM temp.audit_written")
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    cursor.execute("DELETE FROM temp.audit_written")
+    return row[0]
+
+
+def record_action(
+    cursor: sqlite3.Cursor,
+    label: str,
+    after: int,
+    kind: str = ACTION,
+    target: int | None = None,
+) -> int | None:
+    """
+    Journal the audit entries written since entry id `after` as one step;
+    nothing is recorded if there are none. A new action ends the redo
+    history. Returns the journal id (caller commits).
+    """
+    last = last_entry_id(cursor)
+    if last <= after:
+        return None
+    if kind == ACTION:
+        cursor.execute(
+            f"UPDATE undo_journal SET state = '{DISCARDED}' "
+            f"WHERE kind = '{ACTION}' AND state = '{UNDONE}'"
+        )
+    cursor.execute(
+        f"""
+        INSERT INTO undo_journal
+            (label, kind, target, first_entry, last_entry, created)
+        VALUES (?, ?, ?, ?, ?, {_NOW})
+    """,
+        (label, kind, target, after + 1, last),
+    )
+    return cursor.lastrowid
+
+
+def extend_action(cursor: sqlite3.Cursor, journal_id: int, first: int) -> bool:
+    """
+    Add entries first..latest to a recorded step. Returns False, changing
+    nothing, if they do not directly follow it (another connection wrote
+    in between), as its range would then take in those entries too.
+    """
+    cursor.execute(
+        """
+        UPDATE undo_journal SET last_entry = (SELECT MAX(id) FROM audit_log)
+        WHERE id = ? AND last_entry = ?
+    """,
+        (journal_id, first - 1),
+    )
+    return cursor.rowcount == 1
+
+
+def _decode(value, is_blob: bool):
+    return bytes.fromhex(value) if is_blob and value is not None else value
+
+
+def revert_entries(cursor: sqlite3.Cursor, first: int, last: int) -> int:
+    """
+    Apply the inverse of audit entries first..last, newest first: delete
+    inserted rows, restore updated columns and re-insert deleted rows.
+    Raises ValueError, leaving the caller to roll back, if a row has
+    changed since (so a later edit is never silently overwritten).
+    Returns the number of entries reverted.
+    """
+    cursor.execute(
+        """
+        SELECT table_name, row_id, operation, changes FROM audit_log
+        WHERE id BETWEEN ? AND ? ORDER BY id DESC
+    """,
+        (first, last),
+    )
+    entries = cursor.fetchall()
+    columns: dict[str, dict[str, bool]] = {}
+
+    for table, row_id, operation, changes in entries:
+        if table not in columns:
+            columns[table] = _table_columns(cursor, table)
+        blobs = columns[table]
+
+        if operation == INSERT:
+            cursor.execute(f"DELETE FROM {table} WHERE id = ?", (row_id,))
+            if cursor.rowcount == 0:
+                raise ValueError(f"{table} row {row_id} no longer exists")
+
+        elif operation == UPDATE:
+            diff = {
+                c: (_decode(old, blobs.get(c)), _decode(new, blobs.get(c)))
+                for c, (old, new) in json.loads(changes).items()
+                if c in blobs
+            }
+            if not diff:
+                continue
+            current_id = diff["id"][1] if "id" in diff else row_id
+            # JSON keeps 15 significant digits, so REAL values are restored
+            # to that precision and not compared
+            expected = {
+                c: new for c, (_, new) in diff.items() if type(new) is not float
+            }
+            cursor.execute(
+                f"""
+                UPDATE {table} SET {", ".join(f"{c} = ?" for c in diff)}
+                WHERE {" AND ".join(f"{c} IS ?" for c in ("id", *expected))}
+            """,
+                [old for old, _ in diff.values()]
+                + [current_id, *expected.values()],
+            )
+            if cursor.rowcount == 0:
+                raise ValueError(f"{table} row {row_id} was changed since")
+
+        elif operation == DELETE:
+            row = {
+                c: _decode(value, blobs[c])
+                for c, value in json.loads(changes).items()
+                if c in blobs
+            }
+            try:
+                cursor.execute(
+                    f"INSERT INTO {table} ({', '.join(row)}) "
+                    f"VALUES ({', '.join('?' * len(row))})",
+                    list(row.values()),
+                )
+            except sqlite3.IntegrityError as e:
+                raise ValueError(f"Cannot restore {table} row {row_id}: {e}") from e
+    return len(entries)
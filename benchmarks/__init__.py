@@ -0,0 +1,10 @@
+"""
+Benchmark suite for GearTracker.
+
+    python -m benchmarks.run --help
+
+synthetic.py builds tracker.db files at configurable scale; run.py times the
+hot repository paths and writes/compares JSON results; contention.py runs
+several processes against one database and reports lock contention;
+http_load.py drives server.py with concurrent clients and reports requests/s.
+"""
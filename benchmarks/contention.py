@@ -0,0 +1,328 @@
+"""
+Multi-process contention harness.
+
+Runs several processes against one synthetic database at once, each with
+its own GearRepository, the way two GearTracker windows and a script would
+share tracker.db. Every process loops over a mix of listings (cached until
+another process writes), single-row writes and loadout checkout/return
+cycles for a fixed time.
+
+Reports throughput and latency percentiles per operation, the lock retries
+and lock waits the writers saw (GearRepository.lock_stats), and any
+operation that failed. Passing several process counts compares them.
+
+Each run ends with a race: every process tries to check out the same
+firearm, then the same loadout, at the same moment. Exactly one must win
+each; anything else is a failure (non-zero exit).
+
+    python -m benchmarks.contention --scale small --processes 1 2 4 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from gear_tracker import GearRepository
+
+from benchmarks.synthetic import SCALES, generate
+
+DEFAULT_PROCESSES = (1, 2, 4)
+DEFAULT_SECONDS = 5.0
+
+# Relative frequency of each operation in a worker's loop
+OPERATIONS = {
+    "get_all_firearms": 5,
+    "update_firearm_rounds": 4,
+    "loadout_cycle": 1,
+}
+
+# Lets every worker finish importing before the clock starts
+START_DELAY_S = 1.0
+# Between the item race and the loadout race
+RACE_GAP_S = 0.5
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def _worker(db_path: Path, index: int, start_at: float, seconds: float) -> dict:
+    """Loop over OPERATIONS until the deadline; returns raw timings."""
+    repo = GearRepository(db_path)
+    rng = random.Random(index)
+    firearm_ids = [f.id for f in repo.get_all_firearms()]
+    loadouts = repo.get_all_loadouts()
+    borrower_id = repo.get_all_borrowers()[0].id
+    # One loadout per worker, so cycles never collide on item availability
+    loadout = loadouts[index] if index < len(loadouts) else None
+
+    def loadout_cycle():
+        checkout_id, messages = repo.checkout_loadout(
+            loadout.id, borrower_id, datetime.now() + timedelta(days=3)
+        )
+        if not checkout_id:
+            raise ValueError(f"Loadout checkout failed: {messages}")
+        loadout_checkout = repo.get_loadout_checkout(checkout_id)
+        repo.return_loadout(loadout_checkout.id, {"total": 0})
+
+    actions = {
+        "get_all_firearms": repo.get_all_firearms,
+        "update_firearm_rounds": lambda: repo.update_firearm_rounds(
+            rng.choice(firearm_ids), 1
+        ),
+        "loadout_cycle": loadout_cycle,
+    }
+    names = [n for n in OPERATIONS if n != "loadout_cycle" or loadout]
+    weights = [OPERATIONS[n] for n in names]
+
+    durations: dict[str, list[float]] = {name: [] for name in names}
+    errors: Counter = Counter()
+    time.sleep(max(0.0, start_at - time.time()))
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        name = rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            actions[name]()
+        except (ValueError, sqlite3.Error) as e:
+            errors[f"{name}: {e}"] += 1
+            continue
+        durations[name].append(time.perf_counter() - start)
+
+    stats = repo.lock_stats
+    repo.close()
+    return {
+        "durations": durations,
+        "errors": dict(errors),
+        "lock_stats": {
+            "transactions": stats.transactions,
+            "wait_s": stats.wait_s,
+            "max_wait_s": stats.max_wait_s,
+            "retries": stats.retries,
+            "failures": stats.failures,
+        },
+    }
+
+
+def _racer(
+    db_path: Path, firearm_id: str, loadout_id: str, borrower_id: str, start_at: float
+) -> tuple[bool, bool]:
+    """Whether this process won (item race, loadout race)."""
+    repo = GearRepository(db_path)
+    time.sleep(max(0.0, start_at - time.time()))
+    try:
+        repo.checkout_items([firearm_id], borrower_id)
+        won_item = True
+    except ValueError:
+        won_item = False
+    time.sleep(max(0.0, start_at + RACE_GAP_S - time.time()))
+    checkout_id, _ = repo.checkout_loadout(
+        loadout_id, borrower_id, datetime.now() + timedelta(days=3)
+    )
+    repo.close()
+    return won_item, bool(checkout_id)
+
+
+def run_race(master: Path, workdir: Path, processes: int) -> dict:
+    """Race `processes` checkouts of one firearm and one loadout."""
+    db_path = workdir / f"race_{processes}.db"
+    shutil.copyfile(master, db_path)
+    repo = GearRepository(db_path)
+    borrower_id = repo.get_all_borrowers()[0].id
+    loadout = next(
+        candidate
+        for candidate in repo.get_all_loadouts()
+        if repo.validate_loadout_checkout(candidate.id)["can_checkout"]
+    )
+    in_loadout = {item.item_id for item in repo.get_loadout_items(loadout.id)}
+    firearm_id = next(
+        f.id
+        for f in repo.get_all_firearms()
+        if f.status.value == "AVAILABLE" and f.id not in in_loadout
+    )
+    repo.close()
+
+    start_at = time.time() + START_DELAY_S
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes) as pool:
+        outcomes = pool.starmap(
+            _racer,
+            [(db_path, firearm_id, loadout.id, borrower_id, start_at)] * processes,
+        )
+
+    conn = sqlite3.connect(db_path)
+    open_checkouts = conn.execute(
+        "SELECT COUNT(*) FROM checkouts WHERE item_id = ? AND actual_return IS NULL",
+        (firearm_id,),
+    ).fetchone()[0]
+    open_loadouts = conn.execute(
+        """
+        SELECT COUNT(*) FROM loadout_checkouts
+        WHERE loadout_id = ? AND return_date IS NULL
+        """,
+        (loadout.id,),
+    ).fetchone()[0]
+    conn.close()
+    return {
+        "item_winners": sum(won for won, _ in outcomes),
+        "item_open_checkouts": open_checkouts,
+        "loadout_winners": sum(won for _, won in outcomes),
+        "loadout_open_checkouts": open_loadouts,
+    }
+
+
+def run_contention(
+    master: Path, workdir: Path, processes: int, seconds: float
+) -> dict:
+    """Run `processes` workers on a fresh copy of master; returns the summary."""
+    db_path = workdir / f"tracker_{processes}.db"
+    shutil.copyfile(master, db_path)
+    # Migrate (and switch to WAL) once, so workers do not race to do it
+    GearRepository(db_path).close()
+
+    start_at = time.time() + START_DELAY_S
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes) as pool:
+        workers = pool.starmap(
+            _worker, [(db_path, i, start_at, seconds) for i in range(processes)]
+        )
+
+    operations = {}
+    for name in OPERATIONS:
+        samples = sorted(d for w in workers for d in w["durations"].get(name, []))
+        if not samples:
+            continue
+        operations[name] = {
+            "count": len(samples),
+            "per_s": round(len(samples) / seconds, 1),
+            "median_ms": round(statistics.median(samples) * 1000, 3),
+            "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+        }
+
+    locks = {
+        key: sum(w["lock_stats"][key] for w in workers)
+        for key in ("transactions", "wait_s", "retries", "failures")
+    }
+    transactions = locks["transactions"] or 1
+    locks["mean_wait_ms"] = round(locks["wait_s"] / transactions * 1000, 3)
+    locks["max_wait_ms"] = round(
+        max(w["lock_stats"]["max_wait_s"] for w in workers) * 1000, 3
+    )
+    locks["wait_s"] = round(locks["wait_s"], 3)
+    errors: Counter = Counter()
+    for w in workers:
+        errors.update(w["errors"])
+
+    return {
+        "processes": processes,
+        "ops_per_s": round(sum(o["count"] for o in operations.values()) / seconds, 1),
+        "operations": operations,
+        "locks": locks,
+        "errors": dict(errors),
+        "race": run_race(master, workdir, processes),
+    }
+
+
+def print_summary(result: dict) -> None:
+    locks = result["locks"]
+    print(
+        f"\n  {result['processes']} process(es): {result['ops_per_s']:.1f} ops/s; "
+        f"{locks['transactions']} write transactions waited "
+        f"{locks['mean_wait_ms']:.2f} ms on average for the lock "
+        f"(max {locks['max_wait_ms']:.1f} ms, {locks['wait_s']:.2f} s in all); "
+        f"{locks['retries']} retries, {locks['failures']} gave up"
+    )
+    print(f"  {'operation':<24}{'ops/s':>9}{'median':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, o in result["operations"].items():
+        print(
+            f"  {name:<24}{o['per_s']:>9.1f}{o['median_ms']:>9.2f}"
+            f"{o['p95_ms']:>9.2f}{o['p99_ms']:>9.2f}{o['max_ms']:>9.2f}"
+        )
+    for message, count in result["errors"].items():
+        print(f"  ! {count} x {message}")
+    race = result["race"]
+    print(
+        f"  race: {race['item_winners']} of {result['processes']} won the item "
+        f"({race['item_open_checkouts']} open checkout(s)), "
+        f"{race['loadout_winners']} won the loadout "
+        f"({race['loadout_open_checkouts']} open loadout checkout(s))"
+    )
+    if not _race_ok(race):
+        print("  ! race: expected exactly one winner and one open checkout each")
+
+
+def _race_ok(race: dict) -> bool:
+    return all(value == 1 for value in race.values())
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.contention",
+        description="Hammer one synthetic database from several processes.",
+    )
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument(
+        "--processes",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_PROCESSES),
+        help="process counts to run, one after another",
+    )
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    args = parser.parse_args(argv)
+    if min(args.processes) < 1:
+        parser.error("--processes must be at least 1")
+
+    print(
+        f"Running contention (scale={args.scale}, processes={args.processes}, "
+        f"{args.seconds:g} s each)"
+    )
+    with tempfile.TemporaryDirectory(prefix="gear_tracker_contention_") as tmp:
+        tmp = Path(tmp)
+        master = tmp / "tracker.db"
+        counts = generate(master, SCALES[args.scale], seed=args.seed)
+        results = []
+        for processes in args.processes:
+            results.append(run_contention(master, tmp, processes, args.seconds))
+            print_summary(results[-1])
+
+    if args.output:
+        report = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "scale": args.scale,
+                "seed": args.seed,
+                "seconds": args.seconds,
+                "rows": counts,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    failed = sum(r["locks"]["failures"] for r in results)
+    lost_race = not all(_race_ok(r["race"]) for r in results)
+    return 1 if failed or lost_race else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
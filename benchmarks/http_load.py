@@ -0,0 +1,323 @@
+"""
+HTTP load harness for the scanner station server.
+
+Starts server.py on a fresh synthetic database (or targets a running one
+with --url) and drives it with keep-alive clients, the way a room full of
+scanner stations would. Each client loops over a mix of lookups, listings,
+round and maintenance logging, and checkout/return cycles on a firearm of
+its own for a fixed time.
+
+Reports requests per second and latency percentiles per endpoint, plus how
+the server grouped writes into transactions (mean batch size) from /stats.
+Passing several client counts compares them.
+
+    python -m benchmarks.http_load --scale small --clients 1 8 32
+"""
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks.synthetic import SCALES, generate
+
+DEFAULT_CLIENTS = (1, 8, 32)
+DEFAULT_SECONDS = 5.0
+
+# Relative frequency of each request in a client's loop
+REQUESTS = {
+    "GET /items": 6,
+    "GET /checkouts": 2,
+    "POST /rounds": 4,
+    "POST /maintenance": 1,
+    "checkout_cycle": 1,
+}
+
+SERVER = Path(__file__).resolve().parent.parent / "server.py"
+
+
+def _percentile(sorted_values: list[float], fraction: float) -> float:
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+class _Client:
+    """One keep-alive HTTP/1.1 connection speaking JSON."""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def request(self, method: str, path: str, payload=None):
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(
+                self.host, self.port
+            )
+        body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n\r\n"
+            .encode("latin-1")
+            + body
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while (line := await self.reader.readline()) not in (b"\r\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = json.loads(await self.reader.readexactly(length)) if length else None
+        if status >= 400:
+            raise ValueError(f"{status} {data.get('error') if data else ''}")
+        return data
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def _client(
+    host: str,
+    port: int,
+    index: int,
+    deadline: float,
+    serials: list[str],
+    firearm: str | None,
+    borrower: str,
+) -> dict:
+    """Loop over REQUESTS until the deadline; returns raw timings."""
+    client = _Client(host, port)
+    rng = random.Random(index)
+
+    async def checkout_cycle():
+        await client.request(
+            "POST", "/checkouts", {"items": [firearm], "borrower": borrower}
+        )
+        await client.request("POST", "/returns", {"items": [firearm]})
+
+    actions = {
+        "GET /items": lambda: client.request("GET", f"/items/{rng.choice(serials)}"),
+        "GET /checkouts": lambda: client.request("GET", "/checkouts"),
+        "POST /rounds": lambda: client.request(
+            "POST", "/rounds", {"item": rng.choice(serials), "rounds": 1}
+        ),
+        "POST /maintenance": lambda: client.request(
+            "POST",
+            "/maintenance",
+            {"item": rng.choice(serials), "type": "CLEANING", "details": "bench"},
+        ),
+        "checkout_cycle": checkout_cycle,
+    }
+    names = [n for n in REQUESTS if n != "checkout_cycle" or firearm]
+    weights = [REQUESTS[n] for n in names]
+
+    durations: dict[str, list[float]] = {name: [] for name in names}
+    errors: Counter = Counter()
+    try:
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                await actions[name]()
+            except ValueError as e:
+                errors[f"{name}: {e}"] += 1
+                continue
+            durations[name].append(time.perf_counter() - start)
+    finally:
+        client.close()
+    return {"durations": durations, "errors": dict(errors)}
+
+
+async def run_load(host: str, port: int, clients: int, seconds: float) -> dict:
+    """Run `clients` concurrent clients for `seconds`; returns the summary."""
+    setup = _Client(host, port)
+    firearms = await setup.request("GET", "/firearms")
+    borrower = (await setup.request("GET", "/borrowers"))[0]["id"]
+    before = await setup.request("GET", "/stats")
+    serials = [f["serial_number"] for f in firearms if f["serial_number"]]
+    # One available firearm per client, so cycles never collide
+    available = [f["id"] for f in firearms if f["status"] == "AVAILABLE"]
+
+    deadline = time.perf_counter() + seconds
+    workers = await asyncio.gather(
+        *(
+            _client(
+                host,
+                port,
+                i,
+                deadline,
+                serials,
+                available[i] if i < len(available) else None,
+                borrower,
+            )
+            for i in range(clients)
+        )
+    )
+    after = await setup.request("GET", "/stats")
+    setup.close()
+
+    endpoints = {}
+    for name in REQUESTS:
+        samples = sorted(d for w in workers for d in w["durations"].get(name, []))
+        if not samples:
+            continue
+        endpoints[name] = {
+            "count": len(samples),
+            "per_s": round(len(samples) / seconds, 1),
+            "median_ms": round(statistics.median(samples) * 1000, 3),
+            "p95_ms": round(_percentile(samples, 0.95) * 1000, 3),
+            "p99_ms": round(_percentile(samples, 0.99) * 1000, 3),
+            "max_ms": round(samples[-1] * 1000, 3),
+        }
+    errors: Counter = Counter()
+    for w in workers:
+        errors.update(w["errors"])
+
+    writes = after["writes"] - before["writes"]
+    batches = after["write_batches"] - before["write_batches"]
+    # A checkout cycle is two HTTP requests
+    requests = sum(
+        e["count"] * (2 if name == "checkout_cycle" else 1)
+        for name, e in endpoints.items()
+    )
+    return {
+        "clients": clients,
+        "requests_per_s": round(requests / seconds, 1),
+        "endpoints": endpoints,
+        "writes": writes,
+        "write_batches": batches,
+        "mean_batch": round(writes / batches, 2) if batches else 0.0,
+        "largest_batch": after["largest_batch"],
+        "errors": dict(errors),
+    }
+
+
+def print_summary(result: dict) -> None:
+    print(
+        f"\n  {result['clients']} client(s): {result['requests_per_s']:.1f} requests/s; "
+        f"{result['writes']} writes in {result['write_batches']} transactions "
+        f"(mean batch {result['mean_batch']:.1f}, largest {result['largest_batch']})"
+    )
+    print(f"  {'request':<24}{'per s':>9}{'median':>9}{'p95':>9}{'p99':>9}{'max':>9}")
+    for name, e in result["endpoints"].items():
+        print(
+            f"  {name:<24}{e['per_s']:>9.1f}{e['median_ms']:>9.2f}"
+            f"{e['p95_ms']:>9.2f}{e['p99_ms']:>9.2f}{e['max_ms']:>9.2f}"
+        )
+    for message, count in result["errors"].items():
+        print(f"  ! {count} x {message}")
+
+
+def _start_server(db_path: Path, workers: int) -> tuple[subprocess.Popen, str]:
+    """Start server.py on any free port; returns it and its base URL."""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            str(SERVER),
+            "--db",
+            str(db_path),
+            "--port",
+            "0",
+            "--workers",
+            str(workers),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # Migration notes may come first on a database from an older version
+    for line in process.stdout:
+        if line.startswith("Listening on "):
+            return process, line.split()[-1]
+    process.wait()
+    raise RuntimeError(f"Server exited with status {process.returncode}")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.http_load",
+        description="Drive the scanner station server with concurrent clients.",
+    )
+    parser.add_argument("--scale", choices=list(SCALES), default="small")
+    parser.add_argument(
+        "--clients",
+        type=int,
+        nargs="+",
+        default=list(DEFAULT_CLIENTS),
+        help="client counts to run, one after another",
+    )
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS)
+    parser.add_argument("--workers", type=int, default=4, help="server read workers")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--url", help="use this running server instead of starting one"
+    )
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    args = parser.parse_args(argv)
+    if min(args.clients) < 1:
+        parser.error("--clients must be at least 1")
+
+    print(
+        f"Running http_load (scale={args.scale}, clients={args.clients}, "
+        f"{args.seconds:g} s each)"
+    )
+    with tempfile.TemporaryDirectory(prefix="gear_tracker_http_") as tmp:
+        process = None
+        counts = None
+        url = args.url
+        if url is None:
+            db_path = Path(tmp) / "tracker.db"
+            counts = generate(db_path, SCALES[args.scale], seed=args.seed)
+            process, url = _start_server(db_path, args.workers)
+        target = urlsplit(url)
+        try:
+            results = []
+            for clients in args.clients:
+                results.append(
+                    asyncio.run(
+                        run_load(target.hostname, target.port, clients, args.seconds)
+                    )
+                )
+                print_summary(results[-1])
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait()
+
+    if args.output:
+        report = {
+            "meta": {
+                "date": datetime.now().isoformat(timespec="seconds"),
+                "scale": args.scale,
+                "seed": args.seed,
+                "seconds": args.seconds,
+                "workers": args.workers,
+                "rows": counts,
+                "python": platform.python_version(),
+                "sqlite": sqlite3.sqlite_version,
+                "platform": platform.platform(),
+            },
+            "results": results,
+        }
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    failed = sum(sum(r["errors"].values()) for r in results)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+"""
+Repository benchmark runner.
+
+Generates a synthetic database, times the hot GearRepository paths against
+fresh copies of it, and writes the results as JSON. Passing --baseline
+compares the run against an earlier results file and exits non-zero when a
+benchmark's median regressed by more than --threshold.
+
+    python -m benchmarks.run --scale medium --output results.json
+    python -m benchmarks.run --scale medium --baseline baseline.json
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import audit
+from gear_tracker import GearRepository
+
+from benchmarks.synthetic import SCALES, generate
+
+DEFAULT_REPEAT = 5
+DEFAULT_THRESHOLD = 0.20
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """Register fn(repo, workdir, repeat) -> list of durations in seconds."""
+
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+
+    return register
+
+
+def _timed(fn, *args, **kwargs) -> float:
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def _uncached(repo, fn):
+    """Time fn against the database rather than the repository's entity cache."""
+    repo.invalidate_cache()
+    return _timed(fn)
+
+
+@benchmark("get_all_firearms")
+def bench_get_all_firearms(repo, workdir, repeat):
+    return [_uncached(repo, repo.get_all_firearms) for _ in range(repeat)]
+
+
+@benchmark("get_all_firearms_cached")
+def bench_get_all_firearms_cached(repo, workdir, repeat):
+    repo.get_all_firearms()
+    return [_timed(repo.get_all_firearms) for _ in range(repeat)]
+
+
+@benchmark("get_maintenance_status")
+def bench_get_maintenance_status(repo, workdir, repeat):
+    # The firearms tab computes status for every firearm on refresh
+    firearm_ids = [f.id for f in repo.get_all_firearms()]
+
+    def all_statuses():
+        for firearm_id in firearm_ids:
+            repo.get_maintenance_status(firearm_id)
+
+    return [_timed(all_statuses) for _ in range(repeat)]
+
+
+@benchmark("get_active_checkouts")
+def bench_get_active_checkouts(repo, workdir, repeat):
+    return [_uncached(repo, repo.get_active_checkouts) for _ in range(repeat)]
+
+
+@benchmark("count_overdue_checkouts")
+def bench_count_overdue_checkouts(repo, workdir, repeat):
+    # Runs on every refresh and on a timer for the Checkouts tab badge
+    return [_timed(repo.count_overdue_checkouts) for _ in range(repeat)]
+
+
+def _round_count_updates(repo, repeat, batch=100):
+    """Time batches of single-row overwrites, the most common write path."""
+    firearms = repo.get_all_firearms()[:batch]
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for fw in firearms:
+            repo.update_firearm_rounds(fw.id, 10)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+@benchmark("update_firearm_rounds_x100")
+def bench_update_firearm_rounds(repo, workdir, repeat):
+    return _round_count_updates(repo, repeat)
+
+
+@benchmark("update_firearm_rounds_x100_unaudited")
+def bench_update_firearm_rounds_unaudited(repo, workdir, repeat):
+    # Same writes without the audit triggers, so the two results give the
+    # audit log's share of write cost
+    conn = repo.connect()
+    audit.drop_audit_triggers(conn.cursor())
+    conn.commit()
+    conn.close()
+    return _round_count_updates(repo, repeat)
+
+
+def _loadout_cycle(repo, repeat):
+    """Check out and return loadouts in turn; yields (checkout_s, return_s)."""
+    loadouts = repo.get_all_loadouts()
+    if not loadouts:
+        raise ValueError("Synthetic database has no loadouts")
+    borrower_id = repo.get_all_borrowers()[0].id
+    expected_return = datetime.now() + timedelta(days=3)
+
+    for i in range(repeat):
+        loadout = loadouts[i % len(loadouts)]
+        start = time.perf_counter()
+        checkout_id, messages = repo.checkout_loadout(
+            loadout.id, borrower_id, expected_return
+        )
+        checkout_s = time.perf_counter() - start
+        if not checkout_id:
+            raise ValueError(f"Loadout checkout failed: {messages}")
+
+        loadout_checkout = repo.get_loadout_checkout(checkout_id)
+        rounds = {
+            item.item_id: 50
+            for item in repo.get_loadout_items(loadout.id)
+            if item.item_type.value == "FIREARM"
+        }
+        rounds["total"] = sum(rounds.values())
+
+        start = time.perf_counter()
+        repo.return_loadout(loadout_checkout.id, rounds, ammo_type="FMJ")
+        yield checkout_s, time.perf_counter() - start
+
+
+@benchmark("checkout_loadout")
+def bench_checkout_loadout(repo, workdir, repeat):
+    return [checkout_s for checkout_s, _ in _loadout_cycle(repo, repeat)]
+
+
+@benchmark("return_loadout")
+def bench_return_loadout(repo, workdir, repeat):
+    return [return_s for _, return_s in _loadout_cycle(repo, repeat)]
+
+
+@benchmark("export_complete_csv")
+def bench_export_complete_csv(repo, workdir, repeat):
+    output_path = workdir / "export.csv"
+    return [_timed(repo.export_complete_csv, output_path) for _ in range(repeat)]
+
+
+@benchmark("import_complete_csv")
+def bench_import_complete_csv(repo, workdir, repeat):
+    csv_path = workdir / "import.csv"
+    repo.export_complete_csv(csv_path)
+
+    durations = []
+    for i in range(repeat):
+        target = GearRepository(workdir / f"import_{i}.db")
+        result = None
+
+        def run_import():
+            nonlocal result
+            result = target.import_complete_csv(
+                csv_path, duplicate_callback=lambda *args: "skip"
+            )
+
+        durations.append(_timed(run_import))
+        target.close()
+        # success is True if any row imported; any error means a broken path
+        if result.errors:
+            raise ValueError(f"Import failed: {result.errors[:3]}")
+    return durations
+
+
+def run_benchmarks(
+    scale_name: str,
+    repeat: int = DEFAULT_REPEAT,
+    only: list[str] | None = None,
+    seed: int = 1,
+) -> dict:
+    if scale_name not in SCALES:
+        raise ValueError(
+            f"Unknown scale: {scale_name}. Valid scales: {', '.join(SCALES)}"
+        )
+    names = only or list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        raise ValueError(f"Unknown benchmark(s): {', '.join(unknown)}")
+
+    with tempfile.TemporaryDirectory(prefix="gear_tracker_bench_") as tmp:
+        tmp = Path(tmp)
+        master = tmp / "tracker.db"
+        start = time.perf_counter()
+        counts = generate(master, SCALES[scale_name], seed=seed)
+        generate_s = time.perf_counter() - start
+
+        results = {}
+        for name in names:
+            # Each benchmark gets its own copy, so mutating ones don't skew others
+            workdir = tmp / name
+            workdir.mkdir()
+            db_copy = workdir / "tracker.db"
+            shutil.copyfile(master, db_copy)
+            repo = GearRepository(db_copy)
+            try:
+                durations = BENCHMARKS[name](repo, workdir, repeat)
+            finally:
+                repo.close()
+
+            results[name] = {
+                "runs": len(durations),
+                "min_ms": round(min(durations) * 1000, 3),
+                "median_ms": round(statistics.median(durations) * 1000, 3),
+                "mean_ms": round(statistics.fmean(durations) * 1000, 3),
+            }
+            print(f"  {name:<28}{results[name]['median_ms']:>10.2f} ms (median)")
+
+    return {
+        "meta": {
+            "date": datetime.now().isoformat(timespec="seconds"),
+            "scale": scale_name,
+            "seed": seed,
+            "repeat": repeat,
+            "rows": counts,
+            "generate_s": round(generate_s, 3),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Print a comparison table; returns names of regressed benchmarks."""
+    if current["meta"]["scale"] != baseline["meta"]["scale"]:
+        print(
+            f"Warning: comparing scale '{current['meta']['scale']}' "
+            f"against baseline scale '{baseline['meta']['scale']}'"
+        )
+
+    regressions = []
+    print(f"\n  {'benchmark':<28}{'baseline':>10}{'current':>10}{'change':>9}")
+    for name, result in current["results"].items():
+        base = baseline["results"].get(name)
+        if not base:
+            print(f"  {name:<28}{'-':>10}{result['median_ms']:>10.2f}{'new':>9}")
+            continue
+        change = (result["median_ms"] - base["median_ms"]) / base["median_ms"]
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(
+            f"  {name:<28}{base['median_ms']:>10.2f}{result['median_ms']:>10.2f}"
+            f"{change:>+9.0%}{flag}"
+        )
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m benchmarks.run",
+        description="Time hot GearRepository paths on a synthetic database.",
+    )
+    parser.add_argument("--scale", choices=list(SCALES), default="medium")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--only", nargs="+", choices=list(BENCHMARKS), help="benchmarks to run"
+    )
+    parser.add_argument("--output", type=Path, help="write results JSON here")
+    parser.add_argument("--baseline", type=Path, help="results JSON to compare with")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="allowed median slowdown vs baseline (default 0.20 = 20%%)",
+    )
+    args = parser.parse_args(argv)
+
+    print(f"Running benchmarks (scale={args.scale}, repeat={args.repeat})")
+    results = run_benchmarks(args.scale, args.repeat, args.only, args.seed)
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s): {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Synthetic tracker.db generator for benchmarks and scale tests.
+
+Rows are bulk-inserted with executemany after GearRepository has created
+the schema, so triggers (usage rollups) run exactly as they do in the app.
+Generation is deterministic for a given seed.
+"""
+
+import random
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from gear_tracker import GearRepository
+
+CALIBERS = [".308 Win", "6.5 Creedmoor", "5.56 NATO", "9mm", ".45 ACP", "12 Gauge"]
+LOG_TYPES = ["FIRED_ROUNDS", "CLEANING", "LUBRICATION", "INSPECTION"]
+
+
+@dataclass
+class Scale:
+    firearms: int = 100
+    soft_gear: int = 50
+    consumables: int = 40
+    borrowers: int = 20
+    maintenance_logs: int = 5000
+    checkouts: int = 500
+    reload_batches: int = 100
+    transactions: int = 2000
+    loadouts: int = 10
+    history_days: int = 3 * 365
+
+
+SCALES = {
+    "small": Scale(
+        firearms=20,
+        soft_gear=10,
+        consumables=10,
+        borrowers=5,
+        maintenance_logs=500,
+        checkouts=50,
+        reload_batches=10,
+        transactions=200,
+        loadouts=3,
+    ),
+    "medium": Scale(),
+    "large": Scale(
+        firearms=1000,
+        soft_gear=500,
+        consumables=200,
+        borrowers=100,
+        maintenance_logs=100_000,
+        checkouts=10_000,
+        reload_batches=1000,
+        transactions=50_000,
+        loadouts=50,
+    ),
+}
+
+
+def _ids(n: int, rng: random.Random) -> list[str]:
+    return [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(n)]
+
+
+def generate(db_path: Path, scale: Scale, seed: int = 1) -> dict:
+    """
+    Create a new database at db_path populated at the given scale.
+    Returns row counts per table (also handy as benchmark metadata).
+    """
+    db_path = Path(db_path)
+    if db_path.exists():
+        raise ValueError(f"Refusing to overwrite existing database: {db_path}")
+
+    rng = random.Random(seed)
+    now = datetime.now()
+    now_ts = int(now.timestamp())
+    start_ts = int((now - timedelta(days=scale.history_days)).timestamp())
+
+    def past_ts() -> int:
+        return rng.randint(start_ts, now_ts)
+
+    repo = GearRepository(db_path)
+    conn = repo.connect()
+    cursor = conn.cursor()
+
+    firearm_ids = _ids(scale.firearms, rng)
+    # Loadouts use the first 2 * loadouts firearms. They start clean with a
+    # long cleaning interval so repeated benchmark checkout/return cycles
+    # never trip the needs-maintenance check.
+    loadout_count = 2 * scale.loadouts
+    cursor.executemany(
+        """
+        INSERT INTO firearms (
+            id, name, caliber, serial_number, purchase_date, notes, status,
+            rounds_fired, clean_interval_rounds, oil_interval_days,
+            needs_maintenance, transfer_status
+        ) VALUES (?, ?, ?, ?, ?, ?, 'AVAILABLE', ?, ?, ?, 0, 'OWNED')
+        """,
+        [
+            (
+                fid,
+                f"Firearm {i:05d}",
+                rng.choice(CALIBERS),
+                f"SN{i:08d}",
+                start_ts,
+                "",
+                0 if i < loadout_count else rng.randint(0, 2000),
+                100_000 if i < loadout_count else rng.choice([300, 500, 1000]),
+                rng.choice([30, 90, 180]),
+            )
+            for i, fid in enumerate(firearm_ids)
+        ],
+    )
+
+    soft_gear_ids = _ids(scale.soft_gear, rng)
+    cursor.executemany(
+        """
+        INSERT INTO soft_gear (id, name, category, brand, purchase_date, notes, status)
+        VALUES (?, ?, ?, ?, ?, '', 'AVAILABLE')
+        """,
+        [
+            (sid, f"Gear {i:05d}", rng.choice(["PACK", "VEST", "HOLSTER"]), "", start_ts)
+            for i, sid in enumerate(soft_gear_ids)
+        ],
+    )
+
+    consumable_ids = _ids(scale.consumables, rng)
+    cursor.executemany(
+        "INSERT INTO consumables VALUES (?, ?, ?, ?, ?, ?, '')",
+        [
+            (cid, f"Consumable {i:04d}", "AMMO", "rounds", 100_000, 100)
+            for i, cid in enumerate(consumable_ids)
+        ],
+    )
+
+    borrower_ids = _ids(scale.borrowers, rng)
+    cursor.executemany(
+        "INSERT INTO borrowers VALUES (?, ?, '', '', '')",
+        [(bid, f"Borrower {i:04d}") for i, bid in enumerate(borrower_ids)],
+    )
+
+    cursor.executemany(
+        "INSERT INTO maintenance_logs VALUES (?, ?, 'FIREARM', ?, ?, '', ?, NULL)",
+        [
+            (
+                lid,
+                rng.choice(firearm_ids),
+                log_type,
+                past_ts(),
+                rng.randint(10, 300) if log_type == "FIRED_ROUNDS" else None,
+            )
+            for lid, log_type in zip(
+                _ids(scale.maintenance_logs, rng),
+                (rng.choice(LOG_TYPES) for _ in range(scale.maintenance_logs)),
+            )
+        ],
+    )
+
+    # ~5% of the checkout history (on non-loadout firearms) is still out so
+    # active-checkout views have something to show.
+    loadout_firearms = firearm_ids[:loadout_count]
+    free_firearms = firearm_ids[loadout_count:]
+    active_count = min(scale.checkouts // 20, len(free_firearms))
+    active_firearms = rng.sample(free_firearms, active_count)
+
+    checkouts = []
+    for i, cid in enumerate(_ids(scale.checkouts, rng)):
+        out_ts = past_ts()
+        if i < active_count:
+            item_id, returned = active_firearms[i], None
+        else:
+            item_id = rng.choice(firearm_ids)
+            returned = out_ts + rng.randint(1, 5) * 86400
+        checkouts.append(
+            (
+                cid,
+                item_id,
+                "FIREARM",
+                rng.choice(borrower_ids),
+                out_ts,
+                out_ts + 3 * 86400,
+                returned,
+                "",
+            )
+        )
+    cursor.executemany(
+        "INSERT INTO checkouts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", checkouts
+    )
+    cursor.executemany(
+        "UPDATE firearms SET status = 'CHECKED_OUT' WHERE id = ?",
+        [(fid,) for fid in active_firearms],
+    )
+
+    cursor.executemany(
+        """
+        INSERT INTO reload_batches (
+            id, cartridge, firearm_id, date_created, bullet_maker, bullet_model,
+            bullet_weight_gr, powder_name, powder_charge_gr, status, notes
+        ) VALUES (?, ?, ?, ?, 'Sierra', 'MatchKing', ?, 'Varget', ?, 'WORKUP', '')
+        """,
+        [
+            (
+                bid,
+                rng.choice(CALIBERS),
+                rng.choice(firearm_ids),
+                past_ts(),
+                rng.choice([55, 77, 140, 168, 175]),
+                round(rng.uniform(20.0, 45.0), 1),
+            )
+            for bid in _ids(scale.reload_batches, rng)
+        ],
+    )
+
+    cursor.executemany(
+        "INSERT INTO consumable_transactions VALUES (?, ?, ?, ?, ?, '')",
+        [
+            (tid, rng.choice(consumable_ids), "USE", -rng.randint(1, 50), past_ts())
+            for tid in _ids(scale.transactions, rng)
+        ],
+    )
+
+    # Loadouts: two firearms, one soft gear item, two consumables each.
+    # Loadouts don't share firearms, so each can be checked out independently.
+    loadout_rows, item_rows, consumable_rows = [], [], []
+    for i, lid in enumerate(_ids(scale.loadouts, rng)):
+        loadout_rows.append((lid, f"Loadout {i:03d}", "", now_ts, ""))
+        for fid in loadout_firearms[2 * i : 2 * i + 2]:
+            item_rows.append((_ids(1, rng)[0], lid, fid, "FIREARM", ""))
+        if soft_gear_ids:
+            item_rows.append(
+                (_ids(1, rng)[0], lid, soft_gear_ids[i % len(soft_gear_ids)], "SOFT_GEAR", "")
+            )
+        for cid in rng.sample(consumable_ids, min(2, len(consumable_ids))):
+            consumable_rows.append((_ids(1, rng)[0], lid, cid, 50, ""))
+    cursor.executemany("INSERT INTO loadouts VALUES (?, ?, ?, ?, ?)", loadout_rows)
+    cursor.executemany("INSERT INTO loadout_items VALUES (?, ?, ?, ?, ?)", item_rows)
+    cursor.executemany(
+        "INSERT INTO loadout_consumables VALUES (?, ?, ?, ?, ?)", consumable_rows
+    )
+
+    conn.commit()
+    conn.close()
+    repo.close()
+
+    counts = asdict(scale)
+    counts.pop("history_days")
+    return counts
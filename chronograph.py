@@ -0,0 +1,246 @@
+"""
+Chronograph Module
+
+Compact storage and statistics for chronograph shot strings.
+
+Velocities are kept as packed float32 arrays (array('f')), stored as
+little-endian BLOBs in SQLite. Statistics are computed with C-level builtins
+(sum/min/max over map() iterators) so load-development comparisons over
+hundreds of strings never run per-shot Python bytecode.
+"""
+
+import re
+import sqlite3
+import sys
+from array import array
+from dataclasses import dataclass
+from itertools import repeat
+from math import sqrt
+from operator import mul, sub
+
+MAX_SHOTS_PER_STRING = 40
+
+# Bump whenever a formula below changes, and append a migration step that
+# calls recompute_stats() so stored stats are brought up to date. Each
+# string records the version its stats were computed with.
+STATS_VERSION = 1
+
+# ft-lbs = grains * fps^2 / (2 * 32.174 * 7000)
+ENERGY_CONSTANT = 450240.0
+# Taylor KO = grains * fps * diameter_in / 7000
+TKO_CONSTANT = 7000.0
+
+# Actual bullet diameters for cartridges whose name doesn't encode them
+_KNOWN_DIAMETERS = {
+    "22 lr": 0.223,
+    "22 wmr": 0.224,
+    "223": 0.224,
+    "5.56": 0.224,
+    "6mm": 0.243,
+    "6.5": 0.264,
+    "270": 0.277,
+    "7mm": 0.284,
+    "30-06": 0.308,
+    "30-30": 0.308,
+    "300": 0.308,
+    "308": 0.308,
+    "7.62x39": 0.311,
+    "7.62x51": 0.308,
+    "7.62 nato": 0.308,
+    "7.62x54": 0.311,
+    "303": 0.311,
+    "9mm": 0.355,
+    "380": 0.355,
+    "38": 0.357,
+    "357": 0.357,
+    "40": 0.400,
+    "10mm": 0.400,
+    "44": 0.429,
+    "45-70": 0.458,
+    "45": 0.452,
+    "12 ga": 0.729,
+    "20 ga": 0.615,
+}
+
+_INCH_RE = re.compile(r"^\.?(\d{2,3})\b")
+_METRIC_RE = re.compile(r"^(\d+(?:\.\d+)?)\s*(?:mm|x)")
+
+
+def bullet_diameter_in(cartridge: str) -> float | None:
+    """Best-effort bullet diameter (inches) from a cartridge/caliber name."""
+    name = (cartridge or "").strip().lower().lstrip(".")
+    if not name:
+        return None
+
+    # Longest known prefix wins ("7.62x39" before "7mm", "300" before "30-06")
+    for key in sorted(_KNOWN_DIAMETERS, key=len, reverse=True):
+        if name.startswith(key):
+            return _KNOWN_DIAMETERS[key]
+
+    match = _METRIC_RE.match(name)
+    if match:
+        return round(float(match.group(1)) / 25.4, 3)
+
+    match = _INCH_RE.match(name)
+    if match:
+        digits = match.group(1)
+        return int(digits) / (1000 if len(digits) == 3 else 100)
+
+    return None
+
+
+def pack_velocities(velocities: array) -> bytes:
+    """float32 array -> little-endian BLOB."""
+    if sys.byteorder == "big":
+        velocities = array("f", velocities)
+        velocities.byteswap()
+    return velocities.tobytes()
+
+
+def unpack_velocities(blob: bytes) -> array:
+    """Little-endian BLOB -> float32 array."""
+    velocities = array("f")
+    velocities.frombytes(blob)
+    if sys.byteorder == "big":
+        velocities.byteswap()
+    return velocities
+
+
+def to_velocity_array(values) -> array:
+    """Validate and pack an iterable of fps readings."""
+    velocities = array("f", values)
+    if not velocities:
+        raise ValueError("Shot string must contain at least one velocity")
+    if len(velocities) > MAX_SHOTS_PER_STRING:
+        raise ValueError(
+            f"Shot string has {len(velocities)} shots; maximum is {MAX_SHOTS_PER_STRING}"
+        )
+    if min(velocities) <= 0:
+        raise ValueError("Velocities must be positive")
+    return velocities
+
+
+def parse_velocities(text: str) -> array:
+    """Parse '2710, 2695 2702' style input into a velocity array."""
+    return to_velocity_array(float(v) for v in re.split(r"[\s,;]+", text.strip()) if v)
+
+
+@dataclass
+class StringStats:
+    shots: int
+    mean_fps: float
+    es_fps: float
+    sd_fps: float
+    ke_ftlb: float | None
+    tko: float | None
+
+
+def compute_stats(
+    velocities: array,
+    bullet_weight_gr: float | None = None,
+    bullet_diameter: float | None = None,
+) -> StringStats:
+    """Mean, extreme spread, sample SD, muzzle energy and TKO for one string."""
+    n = len(velocities)
+    mean = sum(velocities) / n
+    es = max(velocities) - min(velocities)
+    if n > 1:
+        deviations = array("d", map(sub, velocities, repeat(mean, n)))
+        sd = sqrt(sum(map(mul, deviations, deviations)) / (n - 1))
+    else:
+        sd = 0.0
+
+    ke = tko = None
+    if bullet_weight_gr:
+        ke = bullet_weight_gr * mean * mean / ENERGY_CONSTANT
+        if bullet_diameter:
+            tko = bullet_weight_gr * mean * bullet_diameter / TKO_CONSTANT
+
+    return StringStats(
+        shots=n, mean_fps=mean, es_fps=es, sd_fps=sd, ke_ftlb=ke, tko=tko
+    )
+
+
+def pooled_stats(
+    strings: list[array],
+    bullet_weight_gr: float | None = None,
+    bullet_diameter: float | None = None,
+) -> StringStats | None:
+    """Stats across several strings of the same load (concatenated in C)."""
+    combined = array("f")
+    for velocities in strings:
+        combined.extend(velocities)
+    if not combined:
+        return None
+    return compute_stats(combined, bullet_weight_gr, bullet_diameter)
+
+
+def recompute_stats(cursor: sqlite3.Cursor, batch_ids: list[str] | None = None) -> int:
+    """
+    Recompute per-string stats and the derived batch avg_velocity/es/sd.
+    Batches without strings keep their (hand-entered) stats. One
+    executemany per table; no per-shot Python work.
+    Returns the number of strings updated.
+    """
+    query = """
+        SELECT s.id, s.batch_id, s.velocities, b.bullet_weight_gr, b.cartridge
+        FROM shot_strings s
+        JOIN reload_batches b ON b.id = s.batch_id
+    """
+    params: list = []
+    if batch_ids:
+        query += f" WHERE s.batch_id IN ({', '.join('?' * len(batch_ids))})"
+        params.extend(batch_ids)
+    cursor.execute(query, params)
+
+    diameters: dict[str, float | None] = {}
+    per_batch: dict[str, tuple[list[array], int | None, float | None]] = {}
+    string_updates = []
+    for shot_id, batch_id, blob, weight, cartridge in cursor.fetchall():
+        if cartridge not in diameters:
+            diameters[cartridge] = bullet_diameter_in(cartridge)
+        diameter = diameters[cartridge]
+
+        velocities = unpack_velocities(blob)
+        stats = compute_stats(velocities, weight, diameter)
+        string_updates.append(
+            (
+                stats.mean_fps,
+                stats.es_fps,
+                stats.sd_fps,
+                stats.ke_ftlb,
+                stats.tko,
+                STATS_VERSION,
+                shot_id,
+            )
+        )
+        per_batch.setdefault(batch_id, ([], weight, diameter))[0].append(
+            velocities
+        )
+
+    cursor.executemany(
+        """
+        UPDATE shot_strings SET
+            mean_fps = ?, es_fps = ?, sd_fps = ?, ke_ftlb = ?, tko = ?,
+            stats_version = ?
+        WHERE id = ?
+        """,
+        string_updates,
+    )
+
+    batch_updates = []
+    for batch_id, (strings, weight, diameter) in per_batch.items():
+        pooled = pooled_stats(strings, weight, diameter)
+        batch_updates.append(
+            (
+                round(pooled.mean_fps),
+                round(pooled.es_fps),
+                round(pooled.sd_fps),
+                batch_id,
+            )
+        )
+    cursor.executemany(
+        "UPDATE reload_batches SET avg_velocity = ?, es = ?, sd = ? WHERE id = ?",
+        batch_updates,
+    )
+    return len(string_updates)
@@ -0,0 +1,248 @@
+"""
+Command-Line Interface
+
+Headless access to a GearTracker database for scripts, nightly cron jobs
+and machines without a display:
+
+    python cli.py export ~/backups/gear.csv
+    python cli.py import inventory.csv --on-duplicate overwrite
+    python cli.py report maintenance_due --format html -o due.html
+    python cli.py backup ~/backups/tracker.db
+    python cli.py check
+    python cli.py checkout --borrower "Range Club" --until 2026-11-01 SN123 SN456
+    python cli.py return --borrower "Range Club"
+
+Items are given by id or serial number, as when scanning a label. The
+database is the active profile's unless --profile or --db says otherwise.
+
+Only the repository layer is imported, never PyQt6, and each subcommand
+imports what it needs, so the CLI starts in a few tens of milliseconds.
+"""
+
+import argparse
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from gear_tracker import GearRepository
+from vault import ProfileRegistry
+
+DUPLICATE_ACTIONS = ("skip", "overwrite", "rename")
+
+
+def open_repository(args) -> GearRepository:
+    if args.db:
+        return GearRepository(Path(args.db).expanduser())
+    registry = ProfileRegistry()
+    return GearRepository(registry.get(args.profile or registry.active).db_path)
+
+
+def _read_codes(codes: list[str]) -> list[str]:
+    """Codes from the command line, or one per line on stdin for "-"."""
+    if codes == ["-"]:
+        return [line.strip() for line in sys.stdin if line.strip()]
+    return codes
+
+
+def resolve_items(repo: GearRepository, codes: list[str]) -> dict[str, str]:
+    """Item id -> the code it was given by, in the order given."""
+    items = {}
+    unknown = []
+    for code in codes:
+        resolved = repo.resolve_code(code)
+        if resolved is None:
+            unknown.append(code)
+        else:
+            items[resolved[1]] = code
+    if unknown:
+        raise ValueError(f"Unknown item(s): {', '.join(unknown)}")
+    return items
+
+
+def find_borrower(repo: GearRepository, name_or_id: str):
+    matches = [
+        b
+        for b in repo.get_all_borrowers()
+        if b.id == name_or_id or b.name.casefold() == name_or_id.casefold()
+    ]
+    if not matches:
+        raise ValueError(f"Unknown borrower: {name_or_id}")
+    if len(matches) > 1:
+        raise ValueError(f"Several borrowers are named {name_or_id}; use an id")
+    return matches[0]
+
+
+# -------- COMMANDS --------
+
+
+def cmd_export(repo: GearRepository, args) -> int:
+    repo.export_complete_csv(Path(args.output))
+    print(f"Exported to {args.output}")
+    return 0
+
+
+def cmd_import(repo: GearRepository, args) -> int:
+    result = repo.import_complete_csv(
+        Path(args.input),
+        dry_run=args.dry_run,
+        duplicate_callback=lambda *_: args.on_duplicate,
+    )
+    print(f"Total rows: {result.total_rows}")
+    print(f"Imported: {result.imported}")
+    print(f"Skipped: {result.skipped}")
+    print(f"Overwritten: {result.overwritten}")
+    for entity, count in result.entity_stats.items():
+        print(f"  {entity}: {count}")
+    for warning in result.warnings:
+        print(f"warning: {warning}", file=sys.stderr)
+    for error in result.errors:
+        print(f"error: {error}", file=sys.stderr)
+    return 1 if result.errors else 0
+
+
+def cmd_report(repo: GearRepository, args) -> int:
+    from reports import iter_report, write_report
+
+    params = {}
+    if args.year:
+        params["year"] = args.year
+    if args.manifest:
+        params["manifest_id"] = args.manifest
+    if args.output:
+        write_report(repo, args.name, args.format, Path(args.output), **params)
+        print(f"Report written to {args.output}")
+    else:
+        for chunk in iter_report(repo, args.name, args.format, **params):
+            sys.stdout.write(chunk)
+    return 0
+
+
+def cmd_backup(repo: GearRepository, args) -> int:
+    backup_path = Path(args.output).expanduser()
+    if backup_path.exists():
+        raise ValueError(f"Refusing to overwrite existing file: {backup_path}")
+    repo.backup_database(backup_path)
+    print(f"Backed up to {backup_path}")
+    return 0
+
+
+def cmd_check(repo: GearRepository, args) -> int:
+    problems = repo.check_integrity(quick=args.quick)
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"{len(problems)} problem(s) found", file=sys.stderr)
+        return 1
+    print("ok")
+    return 0
+
+
+def cmd_checkout(repo: GearRepository, args) -> int:
+    borrower = find_borrower(repo, args.borrower)
+    item_ids = list(resolve_items(repo, _read_codes(args.items)))
+    expected_return = (
+        datetime.strptime(args.until, "%Y-%m-%d") if args.until else None
+    )
+    checkout_ids = repo.checkout_items(
+        item_ids, borrower.id, expected_return, args.notes
+    )
+    print(f"Checked out {len(checkout_ids)} item(s) to {borrower.name}")
+    return 0
+
+
+def cmd_return(repo: GearRepository, args) -> int:
+    if not args.items and not args.borrower:
+        raise ValueError("Give the items to return, or --borrower")
+    active = repo.get_active_checkouts()
+    if args.borrower:
+        borrower_id = find_borrower(repo, args.borrower).id
+        active = [(c, b, name) for c, b, name in active if b.id == borrower_id]
+    active = [checkout for checkout, _, _ in active]
+    if args.items:
+        items = resolve_items(repo, _read_codes(args.items))
+        out = {c.item_id for c in active}
+        not_out = [code for item_id, code in items.items() if item_id not in out]
+        if not_out:
+            raise ValueError(f"Not checked out: {', '.join(not_out)}")
+        active = [c for c in active if c.item_id in items]
+    returned = repo.return_items([c.id for c in active])
+    print(f"Returned {returned} item(s)")
+    return 0
+
+
+# -------- ENTRY POINT --------
+
+
+def build_parser() -> argparse.ArgumentParser:
+    from reports import REPORT_FORMATS, REPORTS
+
+    parser = argparse.ArgumentParser(
+        prog="geartracker",
+        description="Headless GearTracker: import, export, reports and bulk ops.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help="database file (default: active profile)")
+    source.add_argument("--profile", help="profile name")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("export", help="export everything to one CSV file")
+    p.add_argument("output")
+    p.set_defaults(run=cmd_export)
+
+    p = commands.add_parser("import", help="import a CSV export or template")
+    p.add_argument("input")
+    p.add_argument(
+        "--on-duplicate",
+        choices=DUPLICATE_ACTIONS,
+        default="skip",
+        help="what to do with rows matching existing items (default: skip)",
+    )
+    p.add_argument("--dry-run", action="store_true", help="validate only")
+    p.set_defaults(run=cmd_import)
+
+    p = commands.add_parser("report", help="write a summary report")
+    p.add_argument("name", choices=list(REPORTS))
+    p.add_argument("--format", choices=REPORT_FORMATS, default="markdown")
+    p.add_argument("-o", "--output", help="file to write (default: stdout)")
+    p.add_argument("--year", type=int, help="season_recap: calendar year")
+    p.add_argument("--manifest", help="manifest: manifest id")
+    p.set_defaults(run=cmd_report)
+
+    p = commands.add_parser("backup", help="copy the database to a new file")
+    p.add_argument("output")
+    p.set_defaults(run=cmd_backup)
+
+    p = commands.add_parser("check", help="check database integrity")
+    p.add_argument("--quick", action="store_true", help="skip index contents")
+    p.set_defaults(run=cmd_check)
+
+    p = commands.add_parser("checkout", help="check out items to a borrower")
+    p.add_argument("items", nargs="+", help='ids or serials ("-": read stdin)')
+    p.add_argument("--borrower", required=True, help="borrower name or id")
+    p.add_argument("--until", help="expected return date, YYYY-MM-DD")
+    p.add_argument("--notes", default="")
+    p.set_defaults(run=cmd_checkout)
+
+    p = commands.add_parser("return", help="return checked-out items")
+    p.add_argument("items", nargs="*", help='ids or serials ("-": read stdin)')
+    p.add_argument("--borrower", help="return everything this borrower has out")
+    p.set_defaults(run=cmd_return)
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    repo = None
+    try:
+        repo = open_repository(args)
+        return args.run(repo, args)
+    except (ValueError, OSError) as e:
+        print(f"geartracker: error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if repo is not None:
+            repo.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -18,6 +18,7 @@ from PyQt6.QtWidgets import (
     QProgressBar,
     QFormLayout,
     QApplication,
+    QSpinBox,
 )
 from PyQt6.QtCore import Qt
 
@@ -25,6 +26,24 @@ from datetime import datetime
 from pathlib import Path
 import os
 
+REPORT_CHOICES = {
+    "Current Inventory": "inventory",
+    "Maintenance Due": "maintenance_due",
+    "Season Usage Recap": "season_recap",
+}
+
+FORMAT_CHOICES = {"Markdown": "markdown", "HTML": "html", "CSV": "csv"}
+
+# Label combo text -> labels.LABEL_SOURCES categories (None: all)
+LABEL_CHOICES = {
+    "All Items": None,
+    "Firearms": ["firearms"],
+    "NFA Items": ["nfa_items"],
+    "Attachments": ["attachments"],
+    "Soft Gear": ["soft_gear"],
+    "Consumables": ["consumables"],
+}
+
 
 class DuplicateResolutionDialog(QDialog):
     """Dialog for handling duplicate items during import."""
@@ -262,6 +281,69 @@ def create_import_export_tab(repo, message_box_class, qfiledialog_class):
     template_group.setLayout(template_layout)
     layout.addWidget(template_group)
 
+    report_group = QGroupBox("Summary Reports")
+    report_layout = QHBoxLayout()
+
+    report_combo = QComboBox()
+    report_combo.addItems(list(REPORT_CHOICES))
+    report_layout.addWidget(QLabel("Report:"))
+    report_layout.addWidget(report_combo)
+
+    format_combo = QComboBox()
+    format_combo.addItems(list(FORMAT_CHOICES))
+    report_layout.addWidget(QLabel("Format:"))
+    report_layout.addWidget(format_combo)
+
+    year_spin = QSpinBox()
+    year_spin.setRange(1900, 2200)
+    year_spin.setValue(datetime.now().year)
+    report_layout.addWidget(QLabel("Season:"))
+    report_layout.addWidget(year_spin)
+
+    report_btn = QPushButton("Generate Report")
+    report_btn.clicked.connect(
+        lambda: generate_summary_report(
+            repo,
+            message_box_class,
+            qfiledialog_class,
+            report_combo.currentText(),
+            format_combo.currentText(),
+            year_spin.value(),
+        )
+    )
+    report_layout.addWidget(report_btn)
+
+    report_group.setLayout(report_layout)
+    layout.addWidget(report_group)
+
+    labels_group = QGroupBox("QR Labels")
+    labels_layout = QHBoxLayout()
+
+    labels_combo = QComboBox()
+    labels_combo.addItems(list(LABEL_CHOICES))
+    labels_layout.addWidget(QLabel("Items:"))
+    labels_layout.addWidget(labels_combo)
+
+    labels_format_combo = QComboBox()
+    labels_format_combo.addItems(["PNG", "SVG"])
+    labels_layout.addWidget(QLabel("Format:"))
+    labels_layout.addWidget(labels_format_combo)
+
+    labels_btn = QPushButton("Generate Label Sheets")
+    labels_btn.clicked.connect(
+        lambda: generate_label_sheets(
+            repo,
+            message_box_class,
+            qfiledialog_class,
+            labels_combo.currentText(),
+            labels_format_combo.currentText(),
+        )
+    )
+    labels_layout.addWidget(labels_btn)
+
+    labels_group.setLayout(labels_layout)
+    layout.addWidget(labels_group)
+
     results_group = QGroupBox("Import Results")
     results_group.setVisible(False)
     results_layout = QVBoxLayout()
@@ -469,6 +551,81 @@ def generate_single_template(
             )
 
 
+def generate_summary_report(
+    repo,
+    message_box_class,
+    qfiledialog_class,
+    report_label: str,
+    format_label: str,
+    year: int,
+):
+    """Generate a summary report into a user-chosen file."""
+    from reports import FORMAT_EXTENSIONS, write_report
+
+    report_name = REPORT_CHOICES[report_label]
+    fmt = FORMAT_CHOICES[format_label]
+    params = {"year": year} if report_name == "season_recap" else {}
+
+    suffix = f"_{year}" if params else ""
+    default_name = (
+        f"geartracker_{report_name}{suffix}_{datetime.now().strftime('%Y%m%d')}"
+        f"{FORMAT_EXTENSIONS[fmt]}"
+    )
+    file_path, _ = qfiledialog_class.getSaveFileName(
+        None,
+        "Save Report",
+        str(Path.home() / "Documents" / default_name),
+        f"{format_label} Files (*{FORMAT_EXTENSIONS[fmt]})",
+    )
+
+    if file_path:
+        try:
+            write_report(repo, report_name, fmt, Path(file_path), **params)
+            message_box_class.information(
+                None, "Report Created", f"{report_label} saved to:\n{file_path}"
+            )
+        except Exception as e:
+            message_box_class.critical(
+                None, "Report Error", f"Failed to generate report:\n{str(e)}"
+            )
+
+
+def generate_label_sheets(
+    repo,
+    message_box_class,
+    qfiledialog_class,
+    items_label: str,
+    format_label: str,
+):
+    """Write QR label sheet pages into a user-chosen folder."""
+    from labels import collect_label_items, write_label_sheets
+
+    output_dir = qfiledialog_class.getExistingDirectory(
+        None, "Save Label Sheets To", str(Path.home() / "Documents")
+    )
+    if not output_dir:
+        return
+
+    try:
+        items = collect_label_items(repo, LABEL_CHOICES[items_label])
+        QApplication.setOverrideCursor(Qt.CursorShape.WaitCursor)
+        try:
+            result = write_label_sheets(items, Path(output_dir), format_label.lower())
+        finally:
+            QApplication.restoreOverrideCursor()
+        message_box_class.information(
+            None,
+            "Labels Created",
+            f"{result.labels} labels on {len(result.pages)} page(s) saved to:\n"
+            f"{output_dir}\n\n"
+            f"Newly encoded: {result.encoded}, from cache: {result.cached}",
+        )
+    except Exception as e:
+        message_box_class.critical(
+            None, "Label Error", f"Failed to generate labels:\n{str(e)}"
+        )
+
+
 def _show_import_results(message_box_class, title: str, result):
     """Show import results in a message box."""
     summary = f"Total rows: {result.total_rows}\n"
@@ -1,11 +1,25 @@
-from dataclasses import dataclass, field
+from array import array
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import MISSING, dataclass, field, fields
 from datetime import datetime
 from os import curdir, name
 from pathlib import Path
+from typing import Callable
 from enum import Enum
+import functools
+import json
+import random
 import sqlite3
+import threading
+import time
 import uuid
 
+import audit
+import chronograph
+import migrations
+import rollups
+
 # ============== ENUMS ==============
 
 
@@ -55,10 +69,63 @@ class TransferStatus(Enum):
     TRANSFERRED = "TRANSFERRED"
 
 
+class ManifestStatus(Enum):
+    PLANNED = "PLANNED"
+    IN_PROGRESS = "IN_PROGRESS"
+    COMPLETE = "COMPLETE"
+
+
 # ============== DATA CLASSES ==============
 
 
-@dataclass
+class _LazyDatetime:
+    """
+    Replaces a datetime slot: the slot may hold raw epoch seconds (as read
+    from SQLite) and is converted to a datetime on first read, then cached.
+    Listings of thousands of rows only pay for the dates actually shown.
+    """
+
+    __slots__ = ("_slot",)
+
+    def __init__(self, slot):
+        self._slot = slot
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = self._slot.__get__(obj, objtype)
+        if value.__class__ is int or value.__class__ is float:
+            value = datetime.fromtimestamp(value)
+            self._slot.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        self._slot.__set__(obj, value)
+
+
+def _lazy_datetimes(*names: str):
+    """Class decorator for slotted dataclasses: make datetime fields lazy."""
+
+    def decorate(cls):
+        for name in names:
+            setattr(cls, name, _LazyDatetime(cls.__dict__[name]))
+        return cls
+
+    return decorate
+
+
+def epoch(entity, name: str) -> int | float | None:
+    """
+    Raw value of a date field without materializing a datetime: epoch
+    seconds if it has not been read yet, otherwise the timestamp.
+    Handy for sorting or comparing many rows.
+    """
+    value = type(entity).__dict__[name]._slot.__get__(entity)
+    return value.timestamp() if isinstance(value, datetime) else value
+
+
+@_lazy_datetimes("purchase_date")
+@dataclass(slots=True, frozen=True)
 class Firearm:
     id: str
     name: str
@@ -84,7 +151,8 @@ class Firearm:
     maintenance_conditions: str = ""
 
 
-@dataclass
+@_lazy_datetimes("purchase_date")
+@dataclass(slots=True, frozen=True)
 class NFAItem:
     id: str
     name: str
@@ -100,7 +168,8 @@ class NFAItem:
     status: CheckoutStatus = CheckoutStatus.AVAILABLE
 
 
-@dataclass
+@_lazy_datetimes("purchase_date")
+@dataclass(slots=True, frozen=True)
 class SoftGear:
     id: str
     name: str
@@ -111,7 +180,7 @@ class SoftGear:
     status: CheckoutStatus = CheckoutStatus.AVAILABLE
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Consumable:
     id: str
     name: str
@@ -122,7 +191,8 @@ class Consumable:
     notes: str = ""
 
 
-@dataclass
+@_lazy_datetimes("date")
+@dataclass(slots=True, frozen=True)
 class MaintenanceLog:
     id: str
     item_id: str
@@ -134,7 +204,8 @@ class MaintenanceLog:
     photo_path: str | None = None
 
 
-@dataclass
+@_lazy_datetimes("date")
+@dataclass(slots=True, frozen=True)
 class ConsumableTransaction:
     id: str
     consumable_id: str
@@ -144,7 +215,8 @@ class ConsumableTransaction:
     notes: str = ""
 
 
-@dataclass
+@_lazy_datetimes("checkout_date", "expected_return", "actual_return")
+@dataclass(slots=True, frozen=True)
 class Checkout:
     id: str
     item_id: str
@@ -156,7 +228,7 @@ class Checkout:
     notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Borrower:
     id: str
     name: str
@@ -165,7 +237,8 @@ class Borrower:
     notes: str = ""
 
 
-@dataclass
+@_lazy_datetimes("transfer_date")
+@dataclass(slots=True, frozen=True)
 class Transfer:
     id: str
     firearm_id: str
@@ -180,7 +253,8 @@ class Transfer:
     notes: str = ""
 
 
-@dataclass
+@_lazy_datetimes("purchase_date")
+@dataclass(slots=True, frozen=True)
 class Attachment:
     id: str
     name: str
@@ -196,7 +270,62 @@ class Attachment:
     notes: str = ""
 
 
+@_lazy_datetimes("mounted_date", "removed_date")
+@dataclass(slots=True, frozen=True)
+class AttachmentMount:
+    """A period an attachment spent on a firearm (open while removed_date is None)"""
+
+    id: str
+    attachment_id: str
+    firearm_id: str
+    mount_position: str
+    mounted_date: datetime
+    removed_date: datetime | None = None
+
+
 @dataclass
+class MountIndex:
+    """
+    In-memory mount graph: what is on each firearm now, and where each
+    attachment has been. Built from two queries; see get_mount_index().
+    """
+
+    # firearm id -> mounted attachments (category, name order)
+    by_firearm: dict[str, list[Attachment]]
+    # attachment id -> mounts, oldest first
+    history: dict[str, list[AttachmentMount]]
+    # firearm id -> every mount onto it, oldest first
+    history_by_firearm: dict[str, list[AttachmentMount]]
+
+    @classmethod
+    def build(
+        cls, attachments: list[Attachment], mounts: list[AttachmentMount]
+    ) -> "MountIndex":
+        by_firearm: dict[str, list[Attachment]] = {}
+        for attachment in attachments:
+            if attachment.mounted_on_firearm_id:
+                by_firearm.setdefault(attachment.mounted_on_firearm_id, []).append(
+                    attachment
+                )
+        history: dict[str, list[AttachmentMount]] = {}
+        history_by_firearm: dict[str, list[AttachmentMount]] = {}
+        for mount in mounts:
+            history.setdefault(mount.attachment_id, []).append(mount)
+            history_by_firearm.setdefault(mount.firearm_id, []).append(mount)
+        return cls(by_firearm, history, history_by_firearm)
+
+    def attachments_on(self, firearm_id: str) -> list[Attachment]:
+        return list(self.by_firearm.get(firearm_id, ()))
+
+    def history_of(self, attachment_id: str) -> list[AttachmentMount]:
+        return list(self.history.get(attachment_id, ()))
+
+    def history_on(self, firearm_id: str) -> list[AttachmentMount]:
+        return list(self.history_by_firearm.get(firearm_id, ()))
+
+
+@_lazy_datetimes("date_created", "test_date")
+@dataclass(slots=True, frozen=True)
 class ReloadBatch:
     id: str
     cartridge: str
@@ -233,7 +362,27 @@ class ReloadBatch:
     notes: str = ""
 
 
-@dataclass
+@_lazy_datetimes("recorded_date")
+@dataclass(slots=True, frozen=True)
+class ShotString:
+    id: str
+    batch_id: str
+    recorded_date: datetime
+    velocities: array  # float32 fps readings, see chronograph module
+    firearm_id: str | None = None
+    temperature_f: int | None = None
+    notes: str = ""
+
+    # Derived by chronograph.compute_stats (filled in when read back)
+    mean_fps: float | None = None
+    es_fps: float | None = None
+    sd_fps: float | None = None
+    ke_ftlb: float | None = None
+    tko: float | None = None
+
+
+@_lazy_datetimes("created_date")
+@dataclass(slots=True, frozen=True)
 class Loadout:
     id: str
     name: str
@@ -242,7 +391,7 @@ class Loadout:
     notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoadoutItem:
     id: str
     loadout_id: str
@@ -251,7 +400,7 @@ class LoadoutItem:
     notes: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoadoutConsumable:
     id: str
     loadout_id: str
@@ -260,7 +409,8 @@ class LoadoutConsumable:
     notes: str = ""
 
 
-@dataclass
+@_lazy_datetimes("return_date")
+@dataclass(slots=True, frozen=True)
 class LoadoutCheckout:
     id: str
     loadout_id: str
@@ -272,6 +422,64 @@ class LoadoutCheckout:
     notes: str = ""
 
 
+@_lazy_datetimes("created_date", "start_date", "end_date", "expected_return")
+@dataclass(slots=True, frozen=True)
+class Manifest:
+    id: str
+    name: str
+    borrower_id: str
+    status: ManifestStatus = ManifestStatus.PLANNED
+    loadout_id: str | None = None
+    location: str = ""
+    created_date: datetime | None = None
+    start_date: datetime | None = None
+    end_date: datetime | None = None
+    expected_return: datetime | None = None
+    notes: str = ""
+
+
+@dataclass(slots=True, frozen=True)
+class ManifestLine:
+    id: str
+    manifest_id: str
+    item_id: str
+    item_type: GearCategory
+    quantity: int = 1
+    # Consumables: how much came back; set when the trip completes
+    quantity_returned: int | None = None
+    # Gear: the checkout opened when the trip started
+    checkout_id: str | None = None
+    notes: str = ""
+
+
+class AuditOperation(Enum):
+    INSERT = "I"
+    UPDATE = "U"
+    DELETE = "D"
+
+
+@_lazy_datetimes("timestamp")
+@dataclass(slots=True, frozen=True)
+class AuditEntry:
+    id: int
+    table_name: str
+    row_id: str
+    operation: AuditOperation
+    timestamp: datetime
+    # UPDATE: column -> [old, new] for changed columns only;
+    # DELETE: column -> value of the removed row; INSERT: empty
+    changes: dict
+
+
+@dataclass
+class HistoryPage:
+    """One keyset page of a history listing, newest first."""
+
+    items: list
+    # Pass back as `after` for the next (older) page; None on the last page
+    next_cursor: tuple[int, str] | None
+
+
 @dataclass
 class ImportResult:
     success: bool
@@ -305,328 +513,784 @@ class ImportRowResult:
 # ============== REPOSITORY ==============
 
 
-class GearRepository:
-    def __init__(self, db_path: Path = Path.home() / ".gear_tracker" / "tracker.db"):
-        self.db_path = db_path
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_db()
+# ============== ROW DECODERS ==============
+
+# Field conversions, as templates over the column value {v}. Fields without
+# an entry take the column value as-is. Date fields keep the raw epoch
+# value; _LazyDatetime converts it when the field is first read.
+_TEXT = "{v} or ''"
+_DATETIME = "{v}"
+_OPT_DATETIME = "{v} or None"
+_BOOL = "bool({v})"
+
+
+def _enum(enum_cls: type[Enum], default: Enum | None = None) -> str:
+    # Member lookup by value skips EnumType.__call__; unknown values still
+    # fall through to the constructor and raise ValueError
+    name = enum_cls.__name__
+    lookup = f"({name}._value2member_map_.get({{v}}) or {name}({{v}}))"
+    if default is None:
+        return lookup
+    return f"{lookup} if {{v}} else {name}.{default.name}"
+
+
+def _opt_enum(enum_cls: type[Enum]) -> str:
+    return f"{_enum(enum_cls)} if {{v}} else None"
+
+
+# table -> (entity class, field conversions)
+_ROW_SPECS: dict[str, tuple[type, dict[str, str]]] = {
+    "firearms": (
+        Firearm,
+        {
+            "serial_number": _TEXT,
+            "purchase_date": _DATETIME,
+            "notes": _TEXT,
+            "status": _enum(CheckoutStatus, CheckoutStatus.AVAILABLE),
+            "is_nfa": _BOOL,
+            "nfa_type": _opt_enum(NFAFirearmType),
+            "tax_stamp_id": _TEXT,
+            "form_type": _TEXT,
+            "barrel_length": _TEXT,
+            "trust_name": _TEXT,
+            "transfer_status": _enum(TransferStatus, TransferStatus.OWNED),
+            "needs_maintenance": _BOOL,
+            "maintenance_conditions": _TEXT,
+        },
+    ),
+    "nfa_items": (
+        NFAItem,
+        {
+            "nfa_type": _enum(NFAItemType),
+            "manufacturer": _TEXT,
+            "serial_number": _TEXT,
+            "tax_stamp_id": _TEXT,
+            "caliber_bore": _TEXT,
+            "purchase_date": _DATETIME,
+            "form_type": _TEXT,
+            "trust_name": _TEXT,
+            "notes": _TEXT,
+            "status": _enum(CheckoutStatus, CheckoutStatus.AVAILABLE),
+        },
+    ),
+    "soft_gear": (
+        SoftGear,
+        {
+            "purchase_date": _DATETIME,
+            "notes": _TEXT,
+            "status": _enum(CheckoutStatus, CheckoutStatus.AVAILABLE),
+        },
+    ),
+    "consumables": (Consumable, {"notes": _TEXT}),
+    "consumable_transactions": (
+        ConsumableTransaction,
+        {"date": _DATETIME, "notes": _TEXT},
+    ),
+    "maintenance_logs": (
+        MaintenanceLog,
+        {
+            "item_type": _enum(GearCategory),
+            "log_type": _enum(MaintenanceType),
+            "date": _DATETIME,
+        },
+    ),
+    # Queried as c.* plus the joined borrower name
+    "checkouts": (
+        Checkout,
+        {
+            "item_type": _enum(GearCategory),
+            "checkout_date": _DATETIME,
+            "expected_return": _OPT_DATETIME,
+            "actual_return": _OPT_DATETIME,
+            "notes": _TEXT,
+        },
+    ),
+    "borrowers": (
+        Borrower,
+        {"phone": _TEXT, "email": _TEXT, "notes": _TEXT},
+    ),
+    "transfers": (
+        Transfer,
+        {
+            "transfer_date": _DATETIME,
+            "buyer_ltc_number": _TEXT,
+            "sale_price": "{v} or 0.0",
+            "ffl_dealer": _TEXT,
+            "ffl_license": _TEXT,
+            "notes": _TEXT,
+        },
+    ),
+    "attachments": (
+        Attachment,
+        {
+            "brand": _TEXT,
+            "model": _TEXT,
+            "serial_number": _TEXT,
+            "purchase_date": _OPT_DATETIME,
+            "mount_position": _TEXT,
+            "zero_notes": _TEXT,
+            "notes": _TEXT,
+        },
+    ),
+    "audit_log": (
+        AuditEntry,
+        {
+            "operation": _enum(AuditOperation),
+            "changes": "json.loads({v}) if {v} else dict()",
+        },
+    ),
+    "attachment_mounts": (
+        AttachmentMount,
+        {
+            "mount_position": _TEXT,
+            "mounted_date": _DATETIME,
+            "removed_date": _OPT_DATETIME,
+        },
+    ),
+    "reload_batches": (
+        ReloadBatch,
+        {
+            "cartridge": _TEXT,
+            "date_created": _DATETIME,
+            "bullet_maker": _TEXT,
+            "bullet_model": _TEXT,
+            "powder_name": _TEXT,
+            "powder_lot": _TEXT,
+            "primer_maker": _TEXT,
+            "primer_type": _TEXT,
+            "case_brand": _TEXT,
+            "case_prep_notes": _TEXT,
+            "crimp_style": _TEXT,
+            "test_date": _OPT_DATETIME,
+            "intended_use": _TEXT,
+            "status": "{v} or 'WORKUP'",
+            "notes": _TEXT,
+        },
+    ),
+    "loadouts": (
+        Loadout,
+        {"description": _TEXT, "created_date": _OPT_DATETIME, "notes": _TEXT},
+    ),
+    "loadout_items": (
+        LoadoutItem,
+        {"item_type": _enum(GearCategory), "notes": _TEXT},
+    ),
+    "loadout_consumables": (LoadoutConsumable, {"notes": _TEXT}),
+    "loadout_checkouts": (
+        LoadoutCheckout,
+        {
+            "return_date": _OPT_DATETIME,
+            "rain_exposure": _BOOL,
+            "ammo_type": _TEXT,
+            "notes": _TEXT,
+        },
+    ),
+    "manifests": (
+        Manifest,
+        {
+            "status": _enum(ManifestStatus, ManifestStatus.PLANNED),
+            "location": _TEXT,
+            "created_date": _OPT_DATETIME,
+            "start_date": _OPT_DATETIME,
+            "end_date": _OPT_DATETIME,
+            "expected_return": _OPT_DATETIME,
+            "notes": _TEXT,
+        },
+    ),
+    # Queried as l.* plus the item name
+    "manifest_lines": (
+        ManifestLine,
+        {"item_type": _enum(GearCategory), "notes": _TEXT},
+    ),
+}
+
+# (table, columns) -> compiled decoder, shared by every repository
+_decoder_cache: dict[tuple[str, tuple[str, ...]], Callable[[tuple], object]] = {}
+
+
+def _build_row_decoder(table: str, columns: tuple[str, ...]):
+    """
+    Compile row -> entity for one column layout. Each field reads its
+    column by position and converts inline; fields whose column is absent
+    keep their dataclass default.
+    """
+    key = (table, columns)
+    decoder = _decoder_cache.get(key)
+    if decoder is not None:
+        return decoder
+
+    cls, conversions = _ROW_SPECS[table]
+    index = {name: i for i, name in enumerate(columns)}
+    args = []
+    for f in fields(cls):
+        if f.name not in index:
+            if f.default is MISSING and f.default_factory is MISSING:
+                raise ValueError(
+                    f"Table {table} has no column for {cls.__name__}.{f.name}"
+                )
+            continue
+        value = conversions.get(f.name, "{v}").format(v=f"row[{index[f.name]}]")
+        args.append(f"{f.name}={value}")
 
-    def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+    source = f"def decode(row):\n    return {cls.__name__}({', '.join(args)})\n"
+    namespace: dict = {}
+    exec(compile(source, f"<decoder {table}>", "exec"), globals(), namespace)
+    decoder = _decoder_cache[key] = namespace["decode"]
+    return decoder
 
-        # Firearms table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS firearms (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                caliber TEXT NOT NULL,
-                serial_number TEXT UNIQUE,
-                purchase_date INTEGER NOT NULL,
-                notes TEXT,
-                status TEXT DEFAULT 'AVAILABLE'
-            )
-        """)
 
-        # Soft gear table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS soft_gear (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                category TEXT NOT NULL,
-                brand TEXT,
-                purchase_date INTEGER NOT NULL,
-                notes TEXT,
-                status TEXT DEFAULT 'AVAILABLE'
-            )
-        """)
+def _add_date_range(
+    clauses: list[str],
+    params: list,
+    column: str,
+    start: datetime | None,
+    end: datetime | None,
+) -> None:
+    """Append [start, end) filters on an epoch column to a WHERE clause list."""
+    if start:
+        clauses.append(f"{column} >= ?")
+        params.append(int(start.timestamp()))
+    if end:
+        clauses.append(f"{column} < ?")
+        params.append(int(end.timestamp()))
 
-        # Consumables table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS consumables (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                category TEXT NOT NULL,
-                unit TEXT NOT NULL,
-                quantity INTEGER NOT NULL DEFAULT 0,
-                min_quantity INTEGER NOT NULL DEFAULT 0,
-                notes TEXT
-            )
-        """)
 
-        # Consumable transactions (for history)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS consumable_transactions (
-                id TEXT PRIMARY KEY,
-                consumable_id TEXT NOT NULL,
-                transaction_type TEXT NOT NULL,
-                quantity INTEGER NOT NULL,
-                date INTEGER NOT NULL,
-                notes TEXT,
-                FOREIGN KEY(consumable_id) REFERENCES consumables(id)
-            )
-        """)
+def _sql_uuid4() -> str:
+    return str(uuid.uuid4())
 
-        # Maintenance logs (polymorphic - works for firearms and soft gear)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS maintenance_logs (
-                id TEXT PRIMARY KEY,
-                item_id TEXT NOT NULL,
-                item_type TEXT NOT NULL,
-                log_type TEXT NOT NULL,
-                date INTEGER NOT NULL,
-                details TEXT,
-                ammo_count INTEGER,
-                photo_path TEXT
-            )
-        """)
 
-        # Borrowers
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS borrowers (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                phone TEXT,
-                email TEXT,
-                notes TEXT
-            )
-        """)
+# Seconds a statement waits for another connection (possibly another
+# process) to release the database lock before failing
+BUSY_TIMEOUT_S = 5.0
 
-        # Checkouts (polymorphic - works for firearms and soft gear)
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS checkouts (
-                id TEXT PRIMARY KEY,
-                item_id TEXT NOT NULL,
-                item_type TEXT NOT NULL,
-                borrower_id TEXT NOT NULL,
-                checkout_date INTEGER NOT NULL,
-                expected_return INTEGER,
-                actual_return INTEGER,
-                notes TEXT,
-                FOREIGN KEY(borrower_id) REFERENCES borrowers(id)
-            )
-        """)
-        # NFA_ITEM table creation
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS nfa_items (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                nfa_type TEXT NOT NULL,
-                manufacturer TEXT,
-                serial_number TEXT,
-                tax_stamp_id TEXT NOT NULL,
-                caliber_bore TEXT,
-                purchase_date INTEGER NOT NULL,
-                form_type TEXT,
-                trust_name TEXT,
-                notes TEXT,
-                status TEXT DEFAULT 'AVAILABLE'
-            )
-        """)
-        # Transfers table creation
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS transfers (
-               id TEXT PRIMARY KEY,
-                firearm_id TEXT NOT NULL,
-                transfer_date INTEGER NOT NULL,
-                buyer_name TEXT NOT NULL,
-                buyer_address TEXT NOT NULL,
-                buyer_dl_number TEXT NOT NULL,
-                buyer_ltc_number TEXT,
-                sale_price REAL,
-                ffl_dealer TEXT,
-                ffl_license TEXT,
-                notes TEXT,
-                FOREIGN KEY(firearm_id) REFERENCES firearms(id)
-            )
-        """)
+# Top-level writes that still find the database locked are retried this
+# many times, backing off exponentially from RETRY_BACKOFF_S
+WRITE_RETRIES = 4
+RETRY_BACKOFF_S = 0.05
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS attachments (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                category TEXT NOT NULL,
-                brand TEXT,
-                model TEXT,
-                serial_number TEXT,
-                purchase_date INTEGER,
-                mounted_on_firearm_id TEXT,
-                mount_position TEXT,
-                zero_distance_yards INTEGER,
-                zero_notes TEXT,
-                notes TEXT,
-                FOREIGN KEY(mounted_on_firearm_id) REFERENCES firearms(id)
-            )
-        """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS reload_batches (
-                id TEXT PRIMARY KEY,
-                cartridge TEXT NOT NULL,
-                firearm_id TEXT,
-                date_created INTEGER NOT NULL,
-
-                bullet_maker TEXT,
-                bullet_model TEXT,
-                bullet_weight_gr INTEGER,
-
-                powder_name TEXT,
-                powder_charge_gr REAL,
-                powder_lot TEXT,
-
-                primer_maker TEXT,
-                primer_type TEXT,
-
-                case_brand TEXT,
-                case_times_fired INTEGER,
-                case_prep_notes TEXT,
-
-                coal_in REAL,
-                crimp_style TEXT,
-
-                test_date INTEGER,
-                avg_velocity INTEGER,
-                es INTEGER,
-                sd INTEGER,
-                group_size_inches REAL,
-                group_distance_yards INTEGER,
-
-                intended_use TEXT,
-                status TEXT,
-                notes TEXT,
-
-                FOREIGN KEY(firearm_id) REFERENCES firearms(id)
-            )
-        """)
+def _is_busy(error: sqlite3.OperationalError) -> bool:
+    """True for "database is locked" style errors, which are worth retrying."""
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is None:
+        return "locked" in str(error)
+    # Extended codes (e.g. SQLITE_BUSY_SNAPSHOT) keep the primary in the low byte
+    return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS loadouts (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                description TEXT,
-                created_date INTEGER NOT NULL,
-                notes TEXT
-            )
-        """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS loadout_items (
-                id TEXT PRIMARY KEY,
-                loadout_id TEXT NOT NULL,
-                item_id TEXT NOT NULL,
-                item_type TEXT NOT NULL,
-                notes TEXT,
-                FOREIGN KEY(loadout_id) REFERENCES loadouts(id)
-            )
-        """)
+@dataclass
+class LockStats:
+    """Write-lock contention seen by a repository's connections."""
+
+    # Write transactions begun (or attempted), and the time spent waiting
+    # for the lock to begin them
+    transactions: int = 0
+    wait_s: float = 0.0
+    max_wait_s: float = 0.0
+    # Top-level writes run again after finding the database locked, and
+    # writes that gave up
+    retries: int = 0
+    failures: int = 0
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False, compare=False
+    )
+
+    def record_wait(self, seconds: float) -> None:
+        with self._lock:
+            self.transactions += 1
+            self.wait_s += seconds
+            self.max_wait_s = max(self.max_wait_s, seconds)
+
+    def record_retry(self, failed: bool) -> None:
+        with self._lock:
+            if failed:
+                self.failures += 1
+            else:
+                self.retries += 1
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS loadout_consumables (
-                id TEXT PRIMARY KEY,
-                loadout_id TEXT NOT NULL,
-                consumable_id TEXT NOT NULL,
-                quantity INTEGER NOT NULL,
-                notes TEXT,
-                FOREIGN KEY(loadout_id) REFERENCES loadouts(id),
-                FOREIGN KEY(consumable_id) REFERENCES consumables(id)
-            )
-        """)
 
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS loadout_checkouts (
-                id TEXT PRIMARY KEY,
-                loadout_id TEXT NOT NULL,
-                checkout_id TEXT NOT NULL,
-                return_date INTEGER,
-                rounds_fired INTEGER DEFAULT 0,
-                rain_exposure INTEGER DEFAULT 0,
-                ammo_type TEXT,
-                notes TEXT,
-                FOREIGN KEY(loadout_id) REFERENCES loadouts(id),
-                FOREIGN KEY(checkout_id) REFERENCES checkouts(id)
+# Statements that make Python's sqlite3 open a transaction first
+_WRITE_STATEMENTS = ("INSERT", "UPDATE", "DELETE", "REPLACE")
+
+
+class _PooledCursor(sqlite3.Cursor):
+    """
+    Cursor that begins write transactions itself, as sqlite3 would, so the
+    wait for the write lock can be timed on its own.
+    """
+
+    def _begin_write(self, sql: str) -> None:
+        conn = self.connection
+        if not conn.in_transaction and sql.lstrip()[:7].upper().startswith(
+            _WRITE_STATEMENTS
+        ):
+            conn.begin()
+
+    def execute(self, sql, parameters=()):
+        self._begin_write(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin_write(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+
+class _PooledConnection(sqlite3.Connection):
+    """sqlite3 connection whose close() hands it back to its pool."""
+
+    _pool: "_ConnectionPool | None" = None
+    # PRAGMA data_version when this connection last checked for writes by
+    # other connections (None: never checked)
+    _data_version: int | None = None
+    # Set by instrumentation.QueryInstrumentation.attach()
+    _instrumentation = None
+
+    def cursor(self, factory=sqlite3.Cursor):
+        if factory is sqlite3.Cursor:
+            # Instrumented cursors still begin IMMEDIATE (isolation_level),
+            # but their lock waits count as statement time instead
+            if self._instrumentation is not None:
+                factory = self._instrumentation.cursor_factory
+            else:
+                factory = _PooledCursor
+        return super().cursor(factory)
+
+    def begin(self) -> None:
+        """BEGIN IMMEDIATE, timing the wait for the write lock."""
+        start = time.perf_counter()
+        try:
+            self.execute("BEGIN IMMEDIATE")
+        finally:
+            self._pool.lock_stats.record_wait(time.perf_counter() - start)
+
+    def commit(self):
+        pool = self._pool
+        if pool is not None and self.in_transaction:
+            if pool.before_commit is not None:
+                pool.before_commit(self)
+            if pool.pinned() is self:
+                # Part of a batch, committed when the batch ends
+                return
+        super().commit()
+
+    def close(self):
+        pool = self._pool
+        if pool is not None and pool.release(self):
+            return
+        super().close()
+
+
+class _ConnectionPool:
+    """
+    Keeps warm connections per thread for a database file. Nested acquires
+    (a method calling another while holding a connection) take the next
+    idle connection, so they also skip opening the file and parsing the
+    schema, which grows with every trigger the migrations add.
+
+    Connections begin write transactions with BEGIN IMMEDIATE, taking the
+    write lock before the first statement rather than upgrading to it
+    mid-transaction, and wait up to busy_timeout seconds for it.
+    """
+
+    # Deepest nesting of repository calls that keeps every level warm
+    MAX_IDLE = 4
+
+    def __init__(self, db_path: Path, busy_timeout: float = BUSY_TIMEOUT_S):
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._closed = False
+        # Opt-in QueryInstrumentation hooked onto connections as they leave
+        self.instrumentation = None
+        self.lock_stats = LockStats()
+        # Called with a connection about to commit, inside its transaction
+        self.before_commit: Callable[[sqlite3.Connection], None] | None = None
+        # Called with each newly opened connection
+        self.on_connect: Callable[[sqlite3.Connection], None] | None = None
+
+    def _idle(self) -> list[sqlite3.Connection]:
+        idle = getattr(self._local, "idle", None)
+        if idle is None:
+            idle = self._local.idle = []
+        return idle
+
+    def pinned(self) -> sqlite3.Connection | None:
+        """The connection every acquire on this thread gets, if pinned."""
+        return getattr(self._local, "pinned", None)
+
+    def pin(self) -> sqlite3.Connection:
+        """Hand one connection to every acquire on this thread until unpin()."""
+        conn = self.acquire()
+        self._local.pinned = conn
+        return conn
+
+    def unpin(self) -> None:
+        self._local.pinned = None
+
+    def acquire(self) -> sqlite3.Connection:
+        pinned = self.pinned()
+        if pinned is not None:
+            return pinned
+        idle = self._idle()
+        if idle:
+            conn = idle.pop()
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=self.busy_timeout,
+                isolation_level="IMMEDIATE",
+                factory=_PooledConnection,
             )
-        """)
+            conn._pool = self
+            # Fresh ids for set-based INSERT ... SELECT
+            conn.create_function("uuid4", 0, _sql_uuid4)
+            if self.on_connect is not None:
+                self.on_connect(conn)
+        if (
+            self.instrumentation is not None
+            and conn._instrumentation is not self.instrumentation
+        ):
+            self.instrumentation.attach(conn)
+        return conn
+
+    def release(self, conn: sqlite3.Connection) -> bool:
+        """Returns True if the connection was kept for reuse."""
+        if conn is self.pinned():
+            return True
+        idle = self._idle()
+        if self._closed or len(idle) >= self.MAX_IDLE:
+            return False
+        if conn.in_transaction:
+            conn.rollback()
+        idle.append(conn)
+        return True
 
-        # fixing maintenance_logs table
-        cursor.execute("PRAGMA table_info(maintenance_logs)")
-        maint_columns = {row[1] for row in cursor.fetchall()}
-
-        # if table exists but doesn't have item_id, drop and recreate
-        if maint_columns and "item_id" not in maint_columns:
-            cursor.execute("DROP TABLE maintenance_logs")
-            print("✓ Dropped old maintenance_logs table (incompatible schema)")
-
-            cursor.execute("""
-            CREATE TABLE maintenance_logs (
-                id TEXT PRIMARY KEY,
-                item_id TEXT NOT NULL,
-                item_type TEXT NOT NULL,
-                log_type TEXT NOT NULL,
-                date INTEGER NOT NULL,
-                details TEXT,
-                ammo_count INTEGER,
-                photo_path TEXT
-                )
-            """)
-            print("✓ Recreated maintenance_logs table with correct schema")
-
-        # migration logic
-        desired_schema = {
-            "firearms": [
-                ("status", "TEXT", "AVAILABLE"),
-                ("is_nfa", "INTEGER", 0),
-                ("nfa_type", "TEXT", None),
-                ("tax_stamp_id", "TEXT", ""),
-                ("form_type", "TEXT", ""),
-                ("barrel_length", "TEXT", ""),
-                ("trust_name", "TEXT", ""),
-                ("transfer_status", "TEXT", "OWNED"),
-                ("rounds_fired", "INTEGER", 0),
-                ("clean_interval_rounds", "INTEGER", 500),
-                ("oil_interval_days", "INTEGER", 90),
-                ("needs_maintenance", "INTEGER", 0),
-                ("maintenance_conditions", "TEXT", ""),
-            ],
-            "soft_gear": [
-                ("status", "TEXT", "AVAILABLE"),
-            ],
-            "maintenance_logs": [
-                ("item_id", "TEXT", None),
-                ("item_type", "TEXT", None),
-                ("log_type", "TEXT", None),
-                ("date", "INTEGER", None),
-                ("details", "TEXT", None),
-                ("ammo_count", "INTEGER", None),
-                ("photo_path", "TEXT", None),
-            ],
-        }
-        # Auto migration loop to add missing columns during development
-        for table_name, columns_to_add in desired_schema.items():
-            # Get list of existing columns for this table
-            cursor.execute(f"PRAGMA table_info({table_name})")
-            existing_columns = {row[1] for row in cursor.fetchall()}
-
-            # Check each desired column
-            for col_name, col_type, default_value in columns_to_add:
-                if col_name not in existing_columns:
-                    # Column is missing, add it
-                    if default_value is not None:
-                        cursor.execute(
-                            f"ALTER TABLE {table_name} ADD COLUMN {col_name} {col_type} DEFAULT '{default_value}'"
-                        )
-                    else:
-                        cursor.execute(
-                            f"ALTER TABLE {table_name} ADD COLUMN {col_name} {col_type}"
-                        )
-                    print(f"✓ Migrated '{table_name}': added '{col_name}' column")
+    def close(self) -> None:
+        """Stop pooling and close this thread's idle connections."""
+        self._closed = True
+        idle = self._idle()
+        while idle:
+            idle.pop().close()
 
-        conn.commit()
+
+# ============== ENTITY CACHE ==============
+
+# Rows per page for the keyset-paginated history methods
+HISTORY_PAGE_SIZE = 100
+
+# Cached rows across all entries; least recently used entries beyond this
+# are evicted
+ENTITY_CACHE_MAX_ROWS = 50_000
+
+
+class _EntityCache:
+    """
+    LRU of read results keyed by (method, args). Each entry remembers the
+    versions of the tables it was read from and is served only while
+    those versions are unchanged; write methods bump them.
+    """
+
+    def __init__(self, max_rows: int = ENTITY_CACHE_MAX_ROWS):
+        self.max_rows = max_rows
+        self._entries: OrderedDict[tuple, tuple[tuple[int, ...], tuple]] = (
+            OrderedDict()
+        )
+        self._rows = 0
+        self._versions: dict[str, int] = {}
+        # Bumped by invalidate() with no tables; part of every version key
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def versions(self, tables: tuple[str, ...]) -> tuple[int, ...]:
+        return (self._generation,) + tuple(self._versions.get(t, 0) for t in tables)
+
+    def get(self, key: tuple, tables: tuple[str, ...]) -> tuple | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == self.versions(tables):
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+
+    def put(self, key: tuple, versions: tuple[int, ...], value: tuple) -> None:
+        """Store a result read at `versions` (taken before the query ran)."""
+        if len(value) > self.max_rows:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._rows -= len(old[1])
+            self._entries[key] = (versions, value)
+            self._rows += len(value)
+            while self._rows > self.max_rows:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._rows -= len(evicted)
+
+    def invalidate(self, tables: tuple[str, ...] = ()) -> None:
+        """Bump table versions; no tables means everything."""
+        with self._lock:
+            if not tables:
+                self._generation += 1
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._rows = 0
+
+
+def _cached_read(*tables: str):
+    """
+    Serve a list-returning read method from the entity cache while the
+    given tables are unchanged. Entities are frozen, so cached snapshots are
+    shared; each caller gets its own list.
+    """
+
+    def decorate(method):
+        name = method.__name__
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache = self._cache
+            if cache is None:
+                return method(self, *args, **kwargs)
+            self._check_external_writes()
+            key = (name, args, tuple(sorted(kwargs.items())))
+            snapshot = cache.get(key, tables)
+            if snapshot is not None:
+                return list(snapshot)
+            # Versions are taken first so a concurrent write leaves the
+            # entry stale rather than caching pre-write rows as current
+            versions = cache.versions(tables)
+            result = method(self, *args, **kwargs)
+            cache.put(key, versions, tuple(result))
+            return result
+
+        return wrapper
+
+    return decorate
+
+
+def _invalidates(*tables: str):
+    """
+    Bump the given tables' cache versions after a write (no tables: all).
+    The write is also one undo step, unless it runs inside a larger one,
+    and is retried if another connection holds the database lock.
+    """
+
+    def decorate(method):
+        label = method.__name__.replace("_", " ").capitalize()
+
+        def write(self, *args, **kwargs):
+            with self.user_action(label):
+                try:
+                    return method(self, *args, **kwargs)
+                finally:
+                    if self._cache is not None:
+                        self._cache.invalidate(tables)
+                        batched = getattr(self._actions, "batch_tables", None)
+                        if batched is not None:
+                            batched.add(tables)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if getattr(self._actions, "depth", 0) or self._pool.pinned():
+                # Part of a larger write; only the outermost one retries
+                return write(self, *args, **kwargs)
+            return self._retry_locked(write, self, *args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+# item_registry tables of items that are checked out and maintained, and
+# their item_type
+ITEM_TABLE_CATEGORIES = {
+    "firearms": GearCategory.FIREARM,
+    "soft_gear": GearCategory.SOFT_GEAR,
+    "nfa_items": GearCategory.NFA_ITEM,
+}
+
+
+class GearRepository:
+    def __init__(
+        self,
+        db_path: Path = Path.home() / ".gear_tracker" / "tracker.db",
+        cache_rows: int = ENTITY_CACHE_MAX_ROWS,
+        busy_timeout: float = BUSY_TIMEOUT_S,
+        write_retries: int = WRITE_RETRIES,
+    ):
+        self.db_path = db_path
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._pool = _ConnectionPool(self.db_path, busy_timeout)
+        self.write_retries = write_retries
+        # Write-lock waits and retries, e.g. for benchmarks.contention
+        self.lock_stats = self._pool.lock_stats
+        # Read-through cache of listings; cache_rows=0 disables it
+        self._cache = _EntityCache(cache_rows) if cache_rows else None
+        # (table, extra columns) -> row decoder for this database's layout
+        self._decoders: dict[tuple[str, tuple[str, ...]], Callable] = {}
+        # (cache versions, index) from get_mount_index()
+        self._mount_index: tuple[tuple, MountIndex] | None = None
+        # Per-thread open user_action(): depth, [label, journal id] and
+        # commits made by this thread (so a retry never repeats one)
+        self._actions = threading.local()
+        self._init_db()
+
+    def connect(self) -> sqlite3.Connection:
+        """
+        Warm connection to this repository's database.
+        Use like sqlite3.connect(): close() returns it to the pool.
+        """
+        return self._pool.acquire()
+
+    def close(self) -> None:
+        """Release pooled connections (the repository must not be used after)."""
+        self._pool.close()
+        if self._cache is not None:
+            self._cache.clear()
+
+    def invalidate_cache(self, *tables: str) -> None:
+        """
+        Drop cached reads for tables (all if none given). Writes by other
+        processes or repositories are picked up without it, on the next read.
+        """
+        if self._cache is not None:
+            self._cache.invalidate(tables)
+
+    def _check_external_writes(self) -> None:
+        """
+        Drop the whole cache if another connection has committed since this
+        thread's connection last looked: another process, another
+        repository or another thread. PRAGMA data_version ignores commits
+        made on the connection itself, whose writes invalidate precisely.
+        """
+        conn = self.connect()
+        version = conn.execute("PRAGMA data_version").fetchone()[0]
+        if conn._data_version != version:
+            # A new connection has no baseline, so anything may have changed
+            self._cache.invalidate()
+            conn._data_version = version
+        conn.close()
+
+    def _init_db(self):
+        conn = self.connect()
+        # Readers and the writer no longer block each other, so other
+        # windows and scripts can share the file (the mode is persistent)
+        conn.execute("PRAGMA journal_mode = WAL")
+        migrations.migrate(conn)
+        audit.track_written_entries(conn)
+        conn.close()
+        self._pool.on_connect = audit.track_written_entries
+        self._pool.before_commit = self._journal_commit
+
+    @staticmethod
+    def _lock_for_write(conn: sqlite3.Connection) -> None:
+        """
+        Take the write lock before a write's checks rather than at its first
+        INSERT, so what they read (e.g. item availability) cannot change in
+        another process before the write commits.
+        """
+        if not conn.in_transaction:
+            conn.begin()
+
+    def _retry_locked(self, write: Callable, *args, **kwargs):
+        """
+        Run a top-level write, retrying with exponential backoff while the
+        database is locked by another connection. A write that has already
+        committed part of its work is not retried, as that would repeat it.
+        """
+        for attempt in range(self.write_retries + 1):
+            commits = getattr(self._actions, "commits", 0)
+            try:
+                return write(*args, **kwargs)
+            except sqlite3.OperationalError as e:
+                if not _is_busy(e):
+                    raise
+                if (
+                    attempt == self.write_retries
+                    or getattr(self._actions, "commits", 0) != commits
+                ):
+                    self.lock_stats.record_retry(failed=True)
+                    raise
+            self.lock_stats.record_retry(failed=False)
+            # Jittered, so writers that collided do not collide again
+            time.sleep(RETRY_BACKOFF_S * 2**attempt * random.uniform(0.5, 1.5))
+
+    def _row_decoder(
+        self, cursor: sqlite3.Cursor, table: str, extra: tuple[str, ...] = ()
+    ) -> Callable[[tuple], object]:
+        """
+        Decoder for rows of SELECT * FROM table, optionally followed by
+        joined `extra` columns. Column positions come from PRAGMA table_info
+        once per repository, since migrated databases can order added
+        columns differently.
+        """
+        key = (table, extra)
+        decoder = self._decoders.get(key)
+        if decoder is None:
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = tuple(row[1] for row in cursor.fetchall()) + extra
+            decoder = self._decoders[key] = _build_row_decoder(table, columns)
+        return decoder
+
+    def _history_page(
+        self,
+        query: str,
+        clauses: list[str],
+        params: list,
+        table: str,
+        date_column: str,
+        date_field: str,
+        after: tuple[int, str] | None,
+        limit: int,
+        extra: tuple[str, ...] = (),
+    ) -> HistoryPage:
+        """
+        Keyset page of `query` ordered by (date, id) descending. Seeks past
+        `after` with a row-value comparison instead of OFFSET, so every page
+        costs the same however deep it is.
+        """
+        if limit < 1:
+            raise ValueError("Page limit must be at least 1")
+        alias = date_column.rpartition(".")[0]
+        id_column = f"{alias}.id" if alias else "id"
+        clauses = list(clauses)
+        params = list(params)
+        if after is not None:
+            clauses.append(f"({date_column}, {id_column}) < (?, ?)")
+            params.extend(after)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += f" ORDER BY {date_column} DESC, {id_column} DESC LIMIT ?"
+        # One extra row tells us whether another page exists
+        params.append(limit + 1)
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, table, extra)
         conn.close()
 
+        items = list(map(decode, rows[:limit]))
+        next_cursor = None
+        if len(rows) > limit:
+            last = items[-1]
+            next_cursor = (epoch(last, date_field), last.id)
+        return HistoryPage(items=items, next_cursor=next_cursor)
+
     # -------- FIREARM METHODS --------
 
+    @_invalidates("firearms")
     def add_firearm(self, firearm: Firearm) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO firearms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
@@ -655,44 +1319,22 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("firearms")
     def get_all_firearms(self) -> list[Firearm]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT * FROM firearms WHERE transfer_status = 'OWNED' or transfer_status IS NULL ORDER BY name"
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "firearms")
         conn.close()
 
-        return [
-            Firearm(
-                id=row[0],
-                name=row[1],
-                caliber=row[2],
-                serial_number=row[3],
-                purchase_date=datetime.fromtimestamp(row[4]),
-                notes=row[5] or "",
-                status=CheckoutStatus(row[6]) if row[6] else CheckoutStatus.AVAILABLE,
-                is_nfa=bool(row[7]) if len(row) > 7 else False,
-                nfa_type=NFAFirearmType(row[8]) if len(row) > 8 and row[8] else None,
-                tax_stamp_id=row[9] if len(row) > 9 else "",
-                form_type=row[10] if len(row) > 10 else "",
-                barrel_length=row[11] if len(row) > 11 else "",
-                trust_name=row[12] if len(row) > 12 else "",
-                transfer_status=TransferStatus(row[13])
-                if len(row) > 13 and row[13]
-                else TransferStatus.OWNED,
-                rounds_fired=row[14] if len(row) > 14 else 0,
-                clean_interval_rounds=row[15] if len(row) > 15 else 500,
-                oil_interval_days=row[16] if len(row) > 16 else 90,
-                needs_maintenance=bool(row[17]) if len(row) > 17 else False,
-                maintenance_conditions=row[18] if len(row) > 18 else "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("firearms")
     def update_firearm_status(self, firearm_id: str, status: CheckoutStatus) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE firearms SET status = ? WHERE id = ?", (status.value, firearm_id)
@@ -700,8 +1342,9 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("maintenance_logs", "checkouts", "firearms")
     def delete_firearm(self, firearm_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM maintenance_logs WHERE item_id = ?", (firearm_id,))
         cursor.execute("DELETE FROM checkouts WHERE item_id = ?", (firearm_id,))
@@ -709,10 +1352,17 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("firearms")
     def update_firearm_rounds(self, firearm_id: str, rounds: int) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
+        self._add_firearm_rounds(cursor, firearm_id, rounds)
+        conn.commit()
+        conn.close()
 
+    def _add_firearm_rounds(
+        self, cursor: sqlite3.Cursor, firearm_id: str, rounds: int
+    ) -> None:
         cursor.execute(
             "SELECT rounds_fired, clean_interval_rounds FROM firearms WHERE id = ?",
             (firearm_id,),
@@ -720,7 +1370,6 @@ class GearRepository:
         result = cursor.fetchone()
 
         if not result:
-            conn.close()
             return
 
         current_rounds, clean_interval = result
@@ -737,11 +1386,8 @@ class GearRepository:
                 (firearm_id,),
             )
 
-        conn.commit()
-        conn.close()
-
     def get_maintenance_status(self, firearm_id: str) -> dict:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -804,10 +1450,11 @@ class GearRepository:
             "reasons": reasons,
         }
 
+    @_invalidates("maintenance_logs", "firearms")
     def mark_maintenance_done(
         self, firearm_id: str, maintenance_type: MaintenanceType, details: str = ""
     ) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -856,8 +1503,9 @@ class GearRepository:
         conn.close()
 
     # -------- ATTACHMENT METHODS --------
+    @_invalidates("attachments")
     def add_attachment(self, attachment: Attachment) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO attachments VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
@@ -881,65 +1529,100 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("attachments")
     def get_all_attachments(self) -> list[Attachment]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM attachments ORDER BY category, name")
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "attachments")
         conn.close()
-        return [
-            Attachment(
-                id=row[0],
-                name=row[1],
-                category=row[2],
-                brand=row[3] or "",
-                model=row[4] or "",
-                serial_number=row[5] or "",
-                purchase_date=datetime.fromtimestamp(row[6]) if row[6] else None,
-                mounted_on_firearm_id=row[7],
-                mount_position=row[8] or "",
-                zero_distance_yards=row[9],
-                zero_notes=row[10] or "",
-                notes=row[11] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
     def get_attachments_for_firearm(self, firearm_id: str) -> list[Attachment]:
-        conn = sqlite3.connect(self.db_path)
+        return self.get_mount_index().attachments_on(firearm_id)
+
+    # attachment_mounts is only written by triggers on attachments, so
+    # reads of it are cached under the attachments table
+
+    @_cached_read("attachments")
+    def get_all_attachment_mounts(self) -> list[AttachmentMount]:
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT * FROM attachments WHERE mounted_on_firearm_id = ? ORDER BY category, name",
-            (firearm_id,),
+            "SELECT * FROM attachment_mounts ORDER BY mounted_date, id"
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "attachment_mounts")
         conn.close()
-        return [
-            Attachment(
-                id=row[0],
-                name=row[1],
-                category=row[2],
-                brand=row[3] or "",
-                model=row[4] or "",
-                serial_number=row[5] or "",
-                purchase_date=datetime.fromtimestamp(row[6]) if row[6] else None,
-                mounted_on_firearm_id=row[7],
-                mount_position=row[8] or "",
-                zero_distance_yards=row[9],
-                zero_notes=row[10] or "",
-                notes=row[11] or "",
+        return list(map(decode, rows))
+
+    def get_mount_index(self) -> MountIndex:
+        """
+        Mount graph over all attachments, rebuilt only after attachments
+        change; per-firearm lookups are then dictionary reads.
+        """
+        cache = self._cache
+        versions = cache.versions(("attachments",)) if cache is not None else None
+        index = self._mount_index
+        if index is None or versions is None or index[0] != versions:
+            built = MountIndex.build(
+                self.get_all_attachments(), self.get_all_attachment_mounts()
             )
-            for row in rows
-        ]
+            index = self._mount_index = (versions, built)
+        return index[1]
 
-    def update_attachment(self, attachment: Attachment) -> None:
-        conn = sqlite3.connect(self.db_path)
+    @_invalidates("attachments")
+    def remount_attachments(self, moves: dict[str, str | None]) -> None:
+        """
+        Move attachments between firearms in one transaction.
+
+        Args:
+            moves: attachment id -> firearm id to mount it on (None unmounts)
+        """
+        if not moves:
+            return
+        conn = self.connect()
         cursor = conn.cursor()
-        cursor.execute(
+
+        firearm_ids = sorted({fid for fid in moves.values() if fid})
+        if firearm_ids:
+            cursor.execute(
+                f"""
+                SELECT COUNT(*) FROM firearms
+                WHERE id IN ({", ".join("?" * len(firearm_ids))})
+            """,
+                firearm_ids,
+            )
+            if cursor.fetchone()[0] != len(firearm_ids):
+                conn.close()
+                raise ValueError("Cannot mount on a firearm that does not exist")
+
+        # Mount history is recorded by the attachment_mounts triggers
+        cursor.executemany(
             """
-        UPDATE attachments
-        SET name = ?, category = ?, brand = ?, model = ?, serial_number = ?, purchase_date = ?, mounted_on_firearm_id = ?, mount_position = ?, zero_distance_yards = ?, zero_notes = ?, notes = ?
-        WHERE id = ?
+            UPDATE attachments
+            SET mounted_on_firearm_id = ?,
+                mount_position = CASE WHEN ? IS NULL THEN '' ELSE mount_position END
+            WHERE id = ?
+        """,
+            [
+                (firearm_id, firearm_id, attachment_id)
+                for attachment_id, firearm_id in moves.items()
+            ],
+        )
+        conn.commit()
+        conn.close()
+
+    @_invalidates("attachments")
+    def update_attachment(self, attachment: Attachment) -> None:
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+        UPDATE attachments
+        SET name = ?, category = ?, brand = ?, model = ?, serial_number = ?, purchase_date = ?, mounted_on_firearm_id = ?, mount_position = ?, zero_distance_yards = ?, zero_notes = ?, notes = ?
+        WHERE id = ?
         """,
             (
                 attachment.name,
@@ -961,16 +1644,18 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("attachments")
     def delete_attachment(self, attachment_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM attachments WHERE id = ?", (attachment_id,))
         conn.commit()
         conn.close()
 
     # -------- TRANSFER METHODS --------
+    @_invalidates("transfers", "firearms")
     def transfer_firearm(self, transfer: Transfer) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         # Add transfer record
@@ -999,9 +1684,10 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("transfers", "firearms")
     def get_all_transfers(self) -> list[tuple[Transfer, Firearm]]:
         """Returns list of (transfer, firearm) tuples"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -1011,29 +1697,20 @@ class GearRepository:
             ORDER BY t.transfer_date DESC
         """)
         rows = cursor.fetchall()
+        decode = self._row_decoder(
+            cursor, "transfers", ("firearm_name", "caliber", "serial_number")
+        )
         conn.close()
 
         results = []
         for row in rows:
-            transfer = Transfer(
-                id=row[0],
-                firearm_id=row[1],
-                transfer_date=datetime.fromtimestamp(row[2]),
-                buyer_name=row[3],
-                buyer_address=row[4],
-                buyer_dl_number=row[5],
-                buyer_ltc_number=row[6] or "",
-                sale_price=row[7] or 0.0,
-                ffl_dealer=row[8] or "",
-                ffl_license=row[9] or "",
-                notes=row[10] or "",
-            )
+            transfer = decode(row)
 
             firearm = Firearm(
-                id=row[1],
-                name=row[11],
-                caliber=row[12],
-                serial_number=row[13],
+                id=transfer.firearm_id,
+                name=row[-3],
+                caliber=row[-2],
+                serial_number=row[-1],
                 purchase_date=datetime.now(),
             )
 
@@ -1043,8 +1720,9 @@ class GearRepository:
 
     # -------- NFA ITEM METHODS --------
 
+    @_invalidates("nfa_items")
     def add_nfa_item(self, item: NFAItem) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO nfa_items VALUES (?,?,?,?,?,?,?,?,?,?,?,?)",
@@ -1066,33 +1744,20 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("nfa_items")
     def get_all_nfa_items(self) -> list[NFAItem]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM nfa_items ORDER BY name")
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "nfa_items")
         conn.close()
 
-        return [
-            NFAItem(
-                id=row[0],
-                name=row[1],
-                nfa_type=NFAItemType(row[2]),
-                manufacturer=row[3] or "",
-                serial_number=row[4] or "",
-                tax_stamp_id=row[5] or "",
-                caliber_bore=row[6] or "",
-                purchase_date=datetime.fromtimestamp(row[7]),
-                form_type=row[8] or "",
-                trust_name=row[9] or "",
-                notes=row[10] or "",
-                status=CheckoutStatus(row[11]) if row[11] else CheckoutStatus.AVAILABLE,
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("nfa_items")
     def update_nfa_item_status(self, item_id: str, status: CheckoutStatus) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE nfa_items SET status = ? WHERE id = ?", (status.value, item_id)
@@ -1100,8 +1765,9 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("maintenance_logs", "checkouts", "nfa_items")
     def delete_nfa_item(self, item_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM maintenance_logs WHERE item_id = ?", (item_id,))
         cursor.execute("DELETE FROM checkouts WHERE item_id = ?", (item_id,))
@@ -1111,8 +1777,9 @@ class GearRepository:
 
     # -------- SOFT GEAR METHODS --------
 
+    @_invalidates("soft_gear")
     def add_soft_gear(self, gear: SoftGear) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO soft_gear VALUES (?, ?, ?, ?, ?, ?, ?)",
@@ -1129,28 +1796,20 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("soft_gear")
     def get_all_soft_gear(self) -> list[SoftGear]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM soft_gear ORDER BY category, name")
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "soft_gear")
         conn.close()
 
-        return [
-            SoftGear(
-                id=row[0],
-                name=row[1],
-                category=row[2],
-                brand=row[3],
-                purchase_date=datetime.fromtimestamp(row[4]),
-                notes=row[5] or "",
-                status=CheckoutStatus(row[6]) if row[6] else CheckoutStatus.AVAILABLE,
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("soft_gear")
     def update_soft_gear_status(self, gear_id: str, status: CheckoutStatus) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE soft_gear SET status = ? WHERE id = ?", (status.value, gear_id)
@@ -1158,8 +1817,9 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("maintenance_logs", "checkouts", "soft_gear")
     def delete_soft_gear(self, gear_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM maintenance_logs WHERE item_id = ?", (gear_id))
         cursor.execute("DELETE FROM checkouts WHERE item_id = ?", (gear_id))
@@ -1169,8 +1829,9 @@ class GearRepository:
 
     # -------- CONSUMABLE METHODS --------
 
+    @_invalidates("consumables")
     def add_consumable(self, consumable: Consumable) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO consumables VALUES (?, ?, ?, ?, ?, ?, ?)",
@@ -1187,52 +1848,35 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("consumables")
     def get_all_consumables(self) -> list[Consumable]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM consumables ORDER BY category, name")
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "consumables")
         conn.close()
 
-        return [
-            Consumable(
-                id=row[0],
-                name=row[1],
-                category=row[2],
-                unit=row[3],
-                quantity=row[4],
-                min_quantity=row[5],
-                notes=row[6] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_cached_read("consumables")
     def get_low_stock_consumables(self) -> list[Consumable]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT * FROM consumables WHERE quantity <= min_quantity ORDER BY category, name"
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "consumables")
         conn.close()
 
-        return [
-            Consumable(
-                id=row[0],
-                name=row[1],
-                category=row[2],
-                unit=row[3],
-                quantity=row[4],
-                min_quantity=row[5],
-                notes=row[6] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("consumables", "consumable_transactions")
     def update_consumable_quantity(
         self, consumable_id: str, delta: int, transaction_type: str, notes: str = ""
     ) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         # Update quantity
@@ -1258,30 +1902,49 @@ class GearRepository:
         conn.commit()
         conn.close()
 
-    def get_consumable_history(self, consumable_id: str) -> list[ConsumableTransaction]:
-        conn = sqlite3.connect(self.db_path)
+    @_cached_read("consumable_transactions")
+    def get_consumable_history(
+        self,
+        consumable_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[ConsumableTransaction]:
+        conn = self.connect()
         cursor = conn.cursor()
+        clauses = ["consumable_id = ?"]
+        params: list = [consumable_id]
+        _add_date_range(clauses, params, "date", start, end)
         cursor.execute(
-            "SELECT * FROM consumable_transactions WHERE consumable_id = ? ORDER BY date DESC",
-            (consumable_id,),
+            f"SELECT * FROM consumable_transactions WHERE {' AND '.join(clauses)} ORDER BY date DESC",
+            params,
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "consumable_transactions")
         conn.close()
 
-        return [
-            ConsumableTransaction(
-                id=row[0],
-                consumable_id=row[1],
-                transaction_type=row[2],
-                quantity=row[3],
-                date=datetime.fromtimestamp(row[4]),
-                notes=row[5] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
+
+    def get_consumable_history_page(
+        self,
+        consumable_id: str,
+        after: tuple[int, str] | None = None,
+        limit: int = HISTORY_PAGE_SIZE,
+    ) -> HistoryPage:
+        """Keyset-paginated get_consumable_history (newest first)."""
+        return self._history_page(
+            "SELECT * FROM consumable_transactions",
+            ["consumable_id = ?"],
+            [consumable_id],
+            "consumable_transactions",
+            "date",
+            "date",
+            after,
+            limit,
+        )
 
+    @_invalidates("consumable_transactions", "consumables")
     def delete_consumable(self, consumable_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "DELETE FROM consumable_transactions WHERE consumable_id = ?",
@@ -1293,8 +1956,9 @@ class GearRepository:
 
     # -------- BORROWER METHODS --------
 
+    @_invalidates("borrowers")
     def add_borrower(self, borrower: Borrower) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO borrowers VALUES (?, ?, ?, ?, ?)",
@@ -1309,26 +1973,20 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("borrowers")
     def get_all_borrowers(self) -> list[Borrower]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM borrowers ORDER BY name")
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "borrowers")
         conn.close()
 
-        return [
-            Borrower(
-                id=row[0],
-                name=row[1],
-                phone=row[2] or "",
-                email=row[3] or "",
-                notes=row[4] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("checkouts", "borrowers")
     def delete_borrower(self, borrower_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         # Check if borrower has active checkouts
         cursor.execute(
@@ -1341,15 +1999,65 @@ class GearRepository:
         if count > 0:
             raise ValueError("Cannot delete borrower with active checkouts")
 
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM checkouts WHERE borrower_id = ?", (borrower_id,))
         cursor.execute("DELETE FROM borrowers WHERE id = ?", (borrower_id,))
         conn.commit()
         conn.close()
 
+    # -------- ITEM REGISTRY METHODS --------
+
+    def resolve_code(self, code: str) -> tuple[str, str] | None:
+        """
+        Resolve a scanned item id or serial number to (item_table, item_id)
+        through item_registry (one index lookup). An exact id match wins
+        over a serial; serials match case-insensitively.
+        """
+        code = code.strip()
+        if not code:
+            return None
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT item_table, id FROM item_registry WHERE id = ?1
+            UNION ALL
+            SELECT item_table, id FROM item_registry WHERE code = ?1
+            LIMIT 1
+            """,
+            (code,),
+        )
+        row = cursor.fetchone()
+        conn.close()
+        return (row[0], row[1]) if row else None
+
+    @staticmethod
+    def _set_item_status(
+        cursor: sqlite3.Cursor, item_ids: list[str], status: CheckoutStatus
+    ) -> None:
+        """
+        Set the checkout status of any mix of firearms, soft gear and NFA
+        items in one statement; item_registry triggers update each item's
+        own table. Items without a status (e.g. consumables) are skipped.
+        """
+        if not item_ids:
+            return
+        # Ids are passed as one JSON array so the statement text is the same
+        # for any number of items and stays in the statement cache; it fans
+        # out through the registry and audit triggers, which makes it
+        # expensive to re-prepare
+        cursor.execute(
+            """
+            UPDATE item_registry SET status = ?
+            WHERE status IS NOT NULL AND id IN (SELECT value FROM json_each(?))
+            """,
+            (status.value, json.dumps(item_ids)),
+        )
+
     # -------- CHECKOUT METHODS --------
 
+    @_invalidates("checkouts", "firearms", "soft_gear", "nfa_items")
     def checkout_item(
         self,
         item_id: str,
@@ -1359,7 +2067,7 @@ class GearRepository:
         notes: str = "",
     ) -> str:
         checkout_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -1375,124 +2083,196 @@ class GearRepository:
                 notes,
             ),
         )
-
-        # Update item status
-        if item_type == GearCategory.FIREARM:
-            cursor.execute(
-                "UPDATE firearms SET status = ? WHERE id = ?",
-                (CheckoutStatus.CHECKED_OUT.value, item_id),
-            )
-        elif item_type == GearCategory.SOFT_GEAR:
-            cursor.execute(
-                "UPDATE soft_gear SET status = ? WHERE id = ?",
-                (CheckoutStatus.CHECKED_OUT.value, item_id),
-            )
-        elif item_type == GearCategory.NFA_ITEM:
-            cursor.execute(
-                "UPDATE nfa_items SET status = ? WHERE id = ?",
-                (CheckoutStatus.CHECKED_OUT.value, item_id),
-            )
+        self._set_item_status(cursor, [item_id], CheckoutStatus.CHECKED_OUT)
 
         conn.commit()
         conn.close()
         return checkout_id
 
+    @_invalidates("checkouts", "firearms", "soft_gear", "nfa_items")
     def return_item(self, checkout_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         # Get checkout info
-        cursor.execute(
-            "SELECT item_id, item_type FROM checkouts WHERE id = ?", (checkout_id,)
-        )
+        cursor.execute("SELECT item_id FROM checkouts WHERE id = ?", (checkout_id,))
         row = cursor.fetchone()
         if not row:
             conn.close()
             return
 
-        item_id, item_type = row[0], GearCategory(row[1])
-
         # Mark returned
         cursor.execute(
             "UPDATE checkouts SET actual_return = ? WHERE id = ?",
             (int(datetime.now().timestamp()), checkout_id),
         )
+        self._set_item_status(cursor, [row[0]], CheckoutStatus.AVAILABLE)
 
-        # Update item status
-        if item_type == GearCategory.FIREARM:
-            cursor.execute(
-                "UPDATE firearms SET status = ? WHERE id = ?",
-                (CheckoutStatus.AVAILABLE.value, item_id),
-            )
-        elif item_type == GearCategory.SOFT_GEAR:
-            cursor.execute(
-                "UPDATE soft_gear SET status = ? WHERE id = ?",
-                (CheckoutStatus.AVAILABLE.value, item_id),
-            )
-        elif item_type == GearCategory.NFA_ITEM:
-            cursor.execute(
-                "UPDATE nfa_items SET status = ? WHERE id = ?",
-                (CheckoutStatus.AVAILABLE.value, item_id),
-            )
+        conn.commit()
+        conn.close()
+
+    @_invalidates("checkouts", "firearms", "soft_gear", "nfa_items")
+    def checkout_items(
+        self,
+        item_ids: list[str],
+        borrower_id: str,
+        expected_return: datetime | None = None,
+        notes: str = "",
+    ) -> list[str]:
+        """
+        Check out several firearms, soft gear and NFA items to one borrower
+        in one transaction. Raises ValueError, checking out nothing, if any
+        item is unknown or not available. Returns the checkout ids in
+        item_ids order.
+        """
+        item_ids = list(dict.fromkeys(item_ids))
+        conn = self.connect()
+        self._lock_for_write(conn)
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT id, item_table, status, name FROM item_registry
+            WHERE id IN (SELECT value FROM json_each(?))
+            """,
+            (json.dumps(item_ids),),
+        )
+        found = {row[0]: row[1:] for row in cursor.fetchall()}
+
+        rows = []
+        problems = []
+        now = int(datetime.now().timestamp())
+        for item_id in item_ids:
+            item_table, status, name = found.get(item_id, (None, None, item_id))
+            if item_table not in ITEM_TABLE_CATEGORIES:
+                problems.append(f"{name} is not an item that can be checked out")
+            elif status != CheckoutStatus.AVAILABLE.value:
+                problems.append(f"{name} is {status}")
+            else:
+                rows.append(
+                    (
+                        str(uuid.uuid4()),
+                        item_id,
+                        ITEM_TABLE_CATEGORIES[item_table].value,
+                        borrower_id,
+                        now,
+                        int(expected_return.timestamp()) if expected_return else None,
+                        None,
+                        notes,
+                    )
+                )
+        if problems:
+            conn.close()
+            raise ValueError("Cannot check out: " + "; ".join(problems))
 
+        cursor.executemany(
+            "INSERT INTO checkouts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows
+        )
+        self._set_item_status(cursor, item_ids, CheckoutStatus.CHECKED_OUT)
         conn.commit()
         conn.close()
+        return [row[0] for row in rows]
 
-    def get_active_checkouts(self) -> list[tuple[Checkout, Borrower, str]]:
-        """Returns list of (checkout, borrower, item_name) for active checkouts"""
-        conn = sqlite3.connect(self.db_path)
+    @_invalidates("checkouts", "firearms", "soft_gear", "nfa_items")
+    def return_items(self, checkout_ids: list[str]) -> int:
+        """
+        Mark several checkouts returned in one transaction; ones already
+        returned or unknown are ignored. Returns the number returned.
+        """
+        ids = json.dumps(list(checkout_ids))
+        conn = self.connect()
         cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT item_id FROM checkouts
+            WHERE actual_return IS NULL AND id IN (SELECT value FROM json_each(?))
+            """,
+            (ids,),
+        )
+        item_ids = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            """
+            UPDATE checkouts SET actual_return = ?
+            WHERE actual_return IS NULL AND id IN (SELECT value FROM json_each(?))
+            """,
+            (int(datetime.now().timestamp()), ids),
+        )
+        self._set_item_status(cursor, item_ids, CheckoutStatus.AVAILABLE)
+        conn.commit()
+        conn.close()
+        return len(item_ids)
 
-        cursor.execute("""
-            SELECT c.*, b.name as borrower_name, b.phone, b.email
-            FROM checkouts c
-            JOIN borrowers b ON c.borrower_id = b.id
-            WHERE c.actual_return IS NULL
-            ORDER BY c.checkout_date DESC
-        """)
+    def _query_active_checkouts(
+        self, where: str = "", params: tuple = (), order: str = "checkout_date DESC"
+    ) -> list[tuple[Checkout, Borrower, str]]:
+        """(checkout, borrower, item_name) rows of the active_checkouts view."""
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        cursor.execute(
+            f"SELECT * FROM active_checkouts {where} ORDER BY {order}", params
+        )
         rows = cursor.fetchall()
+        decode = self._row_decoder(
+            cursor,
+            "checkouts",
+            ("borrower_name", "borrower_phone", "borrower_email", "item_name"),
+        )
+        conn.close()
 
         results = []
         for row in rows:
-            checkout = Checkout(
-                id=row[0],
-                item_id=row[1],
-                item_type=GearCategory(row[2]),
-                borrower_name=row[8],
-                checkout_date=datetime.fromtimestamp(row[4]),
-                expected_return=datetime.fromtimestamp(row[5]) if row[5] else None,
-                actual_return=None,
-                notes=row[7] or "",
+            checkout = decode(row)
+            borrower = Borrower(
+                id=row[3],
+                name=checkout.borrower_name,
+                phone=row[-3] or "",
+                email=row[-2] or "",
             )
+            results.append((checkout, borrower, row[-1]))
+        return results
 
-            # Get item name
-            if checkout.item_type == GearCategory.FIREARM:
-                cursor.execute(
-                    "SELECT name FROM firearms WHERE id = ?", (checkout.item_id,)
-                )
-            elif checkout.item_type == GearCategory.SOFT_GEAR:
-                cursor.execute(
-                    "SELECT name FROM soft_gear WHERE id = ?", (checkout.item_id,)
-                )
-            elif checkout.item_type == GearCategory.NFA_ITEM:
-                cursor.execute(
-                    "SELECT name FROM nfa_items where id = ?", (checkout.item_id,)
-                )
+    @_cached_read("checkouts", "borrowers", "firearms", "soft_gear", "nfa_items")
+    def get_active_checkouts(self) -> list[tuple[Checkout, Borrower, str]]:
+        """Returns list of (checkout, borrower, item_name) for active checkouts"""
+        return self._query_active_checkouts()
 
-            item_row = cursor.fetchone()
-            item_name = item_row[0] if item_row else "Unknown"
+    # Not cached: whether a checkout is overdue changes with the clock, not
+    # only with writes
 
-            borrower = Borrower(
-                id=row[3], name=row[8], phone=row[9] or "", email=row[10] or ""
-            )
-            results.append((checkout, borrower, item_name))
+    def get_overdue_checkouts(
+        self, as_of: datetime | None = None
+    ) -> list[tuple[Checkout, Borrower, str]]:
+        """
+        Returns (checkout, borrower, item_name) for active checkouts whose
+        expected return is before as_of (default now), most overdue first.
+        """
+        as_of = as_of or datetime.now()
+        return self._query_active_checkouts(
+            "WHERE expected_return < ?",
+            (int(as_of.timestamp()),),
+            order="expected_return, id",
+        )
 
+    def count_overdue_checkouts(self, as_of: datetime | None = None) -> int:
+        """Number of active checkouts due back before as_of (default now)."""
+        as_of = as_of or datetime.now()
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT COUNT(*) FROM checkouts
+            WHERE actual_return IS NULL AND expected_return < ?
+        """,
+            (int(as_of.timestamp()),),
+        )
+        count = cursor.fetchone()[0]
         conn.close()
-        return results
+        return count
 
+    @_cached_read("checkouts", "borrowers")
     def get_checkout_history(self, item_id: str) -> list[tuple[Checkout, str]]:
         """Returns checkout history for an item with borrower names"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -1506,59 +2286,65 @@ class GearRepository:
             (item_id,),
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "checkouts", ("borrower_name",))
         conn.close()
 
-        return [
-            (
-                Checkout(
-                    id=row[0],
-                    item_id=row[1],
-                    item_type=GearCategory(row[2]),
-                    borrower_name=row[8],
-                    checkout_date=datetime.fromtimestamp(row[4]),
-                    expected_return=datetime.fromtimestamp(row[5]) if row[5] else None,
-                    actual_return=datetime.fromtimestamp(row[6]) if row[6] else None,
-                    notes=row[7],
-                ),
-                row[8],
-            )
-            for row in rows
-        ]
+        return [(decode(row), row[-1]) for row in rows]
 
-    def get_all_checkout_history(self) -> list[Checkout]:
-        """Returns all checkout history with borrower names"""
-        conn = sqlite3.connect(self.db_path)
+    @_cached_read("checkouts", "borrowers")
+    def get_all_checkout_history(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> list[Checkout]:
+        """Returns all checkout history with borrower names, optionally
+        limited to checkouts made in [start, end)"""
+        conn = self.connect()
         cursor = conn.cursor()
 
+        clauses: list[str] = []
+        params: list = []
+        _add_date_range(clauses, params, "c.checkout_date", start, end)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
         cursor.execute(
-            """
+            f"""
             SELECT c.*, b.name as borrower_name
             FROM checkouts c
             JOIN borrowers b ON c.borrower_id = b.id
+            {where}
             ORDER BY c.checkout_date DESC
-        """
+        """,
+            params,
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "checkouts", ("borrower_name",))
         conn.close()
 
-        return [
-            Checkout(
-                id=row[0],
-                item_id=row[1],
-                item_type=GearCategory(row[2]),
-                borrower_name=row[8],
-                checkout_date=datetime.fromtimestamp(row[4]),
-                expected_return=datetime.fromtimestamp(row[5]) if row[5] else None,
-                actual_return=datetime.fromtimestamp(row[6]) if row[6] else None,
-                notes=row[7],
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
+
+    def get_checkout_history_page(
+        self, after: tuple[int, str] | None = None, limit: int = HISTORY_PAGE_SIZE
+    ) -> HistoryPage:
+        """Keyset-paginated get_all_checkout_history (newest first)."""
+        return self._history_page(
+            """
+            SELECT c.*, b.name as borrower_name
+            FROM checkouts c
+            JOIN borrowers b ON c.borrower_id = b.id
+            """,
+            [],
+            [],
+            "checkouts",
+            "c.checkout_date",
+            "checkout_date",
+            after,
+            limit,
+            ("borrower_name",),
+        )
 
     # -------- MAINTENANCE LOG METHODS --------
 
+    @_invalidates("maintenance_logs")
     def log_maintenance(self, log: MaintenanceLog) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
@@ -1576,53 +2362,101 @@ class GearRepository:
         conn.commit()
         conn.close()
 
-    def get_logs_for_item(self, item_id: str) -> list[MaintenanceLog]:
-        conn = sqlite3.connect(self.db_path)
+    @_cached_read("maintenance_logs")
+    def get_logs_for_item(
+        self,
+        item_id: str,
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[MaintenanceLog]:
+        conn = self.connect()
+        cursor = conn.cursor()
+        clauses = ["item_id = ?"]
+        params: list = [item_id]
+        _add_date_range(clauses, params, "date", start, end)
+        cursor.execute(
+            f"SELECT * FROM maintenance_logs WHERE {' AND '.join(clauses)} ORDER BY date DESC",
+            params,
+        )
+        rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "maintenance_logs")
+        conn.close()
+
+        return list(map(decode, rows))
+
+    @_cached_read("maintenance_logs")
+    def get_photo_logs(self, item_id: str) -> list[MaintenanceLog]:
+        """An item's maintenance logs that have photos, newest first"""
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
-            "SELECT * FROM maintenance_logs WHERE item_id = ? ORDER BY date DESC",
+            """
+            SELECT * FROM maintenance_logs
+            WHERE item_id = ? AND photo_path IS NOT NULL AND photo_path != ''
+            ORDER BY date DESC, id DESC
+        """,
             (item_id,),
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "maintenance_logs")
         conn.close()
 
-        return [
-            MaintenanceLog(
-                id=row[0],
-                item_id=row[1],
-                item_type=GearCategory(row[2]),
-                log_type=MaintenanceType(row[3]),
-                date=datetime.fromtimestamp(row[4]),
-                details=row[5],
-                ammo_count=row[6],
-                photo_path=row[7],
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
+
+    def get_logs_for_item_page(
+        self,
+        item_id: str,
+        after: tuple[int, str] | None = None,
+        limit: int = HISTORY_PAGE_SIZE,
+    ) -> HistoryPage:
+        """Keyset-paginated get_logs_for_item (newest first)."""
+        return self._history_page(
+            "SELECT * FROM maintenance_logs",
+            ["item_id = ?"],
+            [item_id],
+            "maintenance_logs",
+            "date",
+            "date",
+            after,
+            limit,
+        )
 
-    def get_all_maintenance_logs(self) -> list[MaintenanceLog]:
-        conn = sqlite3.connect(self.db_path)
+    @_cached_read("maintenance_logs")
+    def get_all_maintenance_logs(
+        self, start: datetime | None = None, end: datetime | None = None
+    ) -> list[MaintenanceLog]:
+        conn = self.connect()
         cursor = conn.cursor()
-        cursor.execute("SELECT * FROM maintenance_logs ORDER BY date DESC")
+        clauses: list[str] = []
+        params: list = []
+        _add_date_range(clauses, params, "date", start, end)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        cursor.execute(
+            f"SELECT * FROM maintenance_logs{where} ORDER BY date DESC", params
+        )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "maintenance_logs")
         conn.close()
 
-        return [
-            MaintenanceLog(
-                id=row[0],
-                item_id=row[1],
-                item_type=GearCategory(row[2]),
-                log_type=MaintenanceType(row[3]),
-                date=datetime.fromtimestamp(row[4]),
-                details=row[5],
-                ammo_count=row[6],
-                photo_path=row[7],
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
+
+    def get_maintenance_logs_page(
+        self, after: tuple[int, str] | None = None, limit: int = HISTORY_PAGE_SIZE
+    ) -> HistoryPage:
+        """Keyset-paginated get_all_maintenance_logs (newest first)."""
+        return self._history_page(
+            "SELECT * FROM maintenance_logs",
+            [],
+            [],
+            "maintenance_logs",
+            "date",
+            "date",
+            after,
+            limit,
+        )
 
     def last_cleaning_date(self, item_id: str) -> datetime | None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT date FROM maintenance_logs WHERE item_id = ? AND log_type = 'CLEANING' ORDER BY date DESC LIMIT 1",
@@ -1632,10 +2466,43 @@ class GearRepository:
         conn.close()
         return datetime.fromtimestamp(result[0]) if result else None
 
+    # -------- USAGE ROLLUP METHODS --------
+
+    def rebuild_usage_rollups(self) -> None:
+        """Recompute all daily/weekly/monthly rollups from the history tables."""
+        conn = self.connect()
+        cursor = conn.cursor()
+        rollups.rebuild_rollups(cursor)
+        conn.commit()
+        conn.close()
+
+    def get_usage_series(
+        self,
+        subject_type: str,
+        metric: str,
+        subject_id: str = rollups.ALL_SUBJECTS,
+        granularity: str = "MONTH",
+        start: datetime | None = None,
+        end: datetime | None = None,
+    ) -> list[tuple[str, int, int]]:
+        """
+        Chart series from the rollup table: [(bucket_start, value, count), ...].
+        subject_type is FIREARM, CONSUMABLE, LOADOUT (or a gear category for
+        maintenance events); subject_id defaults to the total across subjects.
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        series = rollups.get_usage_series(
+            cursor, subject_type, metric, subject_id, granularity, start, end
+        )
+        conn.close()
+        return series
+
     # -------- RELOAD BATCH METHODS --------
 
+    @_invalidates("reload_batches")
     def add_reload_batch(self, batch: ReloadBatch) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -1682,8 +2549,9 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("reload_batches", "shot_strings")
     def update_reload_batch(self, batch: ReloadBatch) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -1728,15 +2596,20 @@ class GearRepository:
                 batch.id,
             ),
         )
+        # Strings are the source of truth for velocity stats once recorded
+        chronograph.recompute_stats(cursor, [batch.id])
         conn.commit()
         conn.close()
 
+    @_cached_read("reload_batches")
     def get_all_reload_batches(
         self,
         cartridge: str | None = None,
         firearm_id: str | None = None,
+        start: datetime | None = None,
+        end: datetime | None = None,
     ) -> list[ReloadBatch]:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         query = "SELECT * FROM reload_batches"
@@ -1749,93 +2622,168 @@ class GearRepository:
         if firearm_id:
             clauses.append("firearm_id = ?")
             params.append(firearm_id)
+        _add_date_range(clauses, params, "date_created", start, end)
         if clauses:
             query += " WHERE " + " AND ".join(clauses)
         query += " ORDER BY date_created DESC"
 
         cursor.execute(query, params)
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "reload_batches")
         conn.close()
 
-        batches: list[ReloadBatch] = []
-        for row in rows:
-            (
-                id_,
-                cartridge,
-                firearm_id,
-                date_created,
-                bullet_maker,
-                bullet_model,
-                bullet_weight_gr,
-                powder_name,
-                powder_charge_gr,
-                powder_lot,
-                primer_maker,
-                primer_type,
-                case_brand,
-                case_times_fired,
-                case_prep_notes,
-                coal_in,
-                crimp_style,
-                test_date,
-                avg_velocity,
-                es,
-                sd,
-                group_size_inches,
-                group_distance_yards,
-                intended_use,
-                status,
-                notes,
-            ) = row
-
-            batches.append(
-                ReloadBatch(
-                    id=id_,
-                    cartridge=cartridge or "",
-                    firearm_id=firearm_id,
-                    date_created=datetime.fromtimestamp(date_created),
-                    bullet_maker=bullet_maker or "",
-                    bullet_model=bullet_model or "",
-                    bullet_weight_gr=bullet_weight_gr,
-                    powder_name=powder_name or "",
-                    powder_charge_gr=powder_charge_gr,
-                    powder_lot=powder_lot or "",
-                    primer_maker=primer_maker or "",
-                    primer_type=primer_type or "",
-                    case_brand=case_brand or "",
-                    case_times_fired=case_times_fired,
-                    case_prep_notes=case_prep_notes or "",
-                    coal_in=coal_in,
-                    crimp_style=crimp_style or "",
-                    test_date=datetime.fromtimestamp(test_date) if test_date else None,
-                    avg_velocity=avg_velocity,
-                    es=es,
-                    sd=sd,
-                    group_size_inches=group_size_inches,
-                    group_distance_yards=group_distance_yards,
-                    intended_use=intended_use or "",
-                    status=status or "WORKUP",
-                    notes=notes or "",
-                )
-            )
-        return batches
+        return list(map(decode, rows))
 
+    @_invalidates("shot_strings", "reload_batches")
     def delete_reload_batch(self, batch_id: str) -> None:
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
+        cursor.execute("DELETE FROM shot_strings WHERE batch_id = ?", (batch_id,))
         cursor.execute("DELETE FROM reload_batches WHERE id = ?", (batch_id,))
         conn.commit()
         conn.close()
 
-    # -------- LOADOUT METHODS --------
+    # -------- SHOT STRING METHODS --------
 
-    def create_loadout(self, loadout: Loadout) -> None:
-        """Create new loadout profile"""
-        conn = sqlite3.connect(self.db_path)
+    @_invalidates("shot_strings", "reload_batches")
+    def add_shot_string(self, shot: ShotString) -> None:
+        """Store a chronograph string and refresh its batch's velocity stats."""
+        velocities = chronograph.to_velocity_array(shot.velocities)
+
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
-            "INSERT INTO loadouts VALUES (?, ?, ?, ?, ?)",
-            (
+            """
+            INSERT INTO shot_strings (
+                id, batch_id, recorded_date, firearm_id, temperature_f, notes,
+                shot_count, velocities
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                shot.id,
+                shot.batch_id,
+                int(shot.recorded_date.timestamp()),
+                shot.firearm_id,
+                shot.temperature_f,
+                shot.notes,
+                len(velocities),
+                chronograph.pack_velocities(velocities),
+            ),
+        )
+        chronograph.recompute_stats(cursor, [shot.batch_id])
+        conn.commit()
+        conn.close()
+
+    def get_shot_strings(self, batch_id: str) -> list[ShotString]:
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT id, batch_id, recorded_date, velocities, firearm_id,
+                   temperature_f, notes, mean_fps, es_fps, sd_fps, ke_ftlb, tko
+            FROM shot_strings
+            WHERE batch_id = ?
+            ORDER BY recorded_date
+            """,
+            (batch_id,),
+        )
+        rows = cursor.fetchall()
+        conn.close()
+
+        return [
+            ShotString(
+                id=row[0],
+                batch_id=row[1],
+                recorded_date=datetime.fromtimestamp(row[2]),
+                velocities=chronograph.unpack_velocities(row[3]),
+                firearm_id=row[4],
+                temperature_f=row[5],
+                notes=row[6] or "",
+                mean_fps=row[7],
+                es_fps=row[8],
+                sd_fps=row[9],
+                ke_ftlb=row[10],
+                tko=row[11],
+            )
+            for row in rows
+        ]
+
+    @_invalidates("shot_strings", "reload_batches")
+    def delete_shot_string(self, shot_id: str) -> None:
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT batch_id FROM shot_strings WHERE id = ?", (shot_id,))
+        row = cursor.fetchone()
+        cursor.execute("DELETE FROM shot_strings WHERE id = ?", (shot_id,))
+        if row:
+            chronograph.recompute_stats(cursor, [row[0]])
+            # The stats came from the strings; with the last one gone they
+            # describe nothing
+            cursor.execute(
+                """
+                UPDATE reload_batches SET avg_velocity = NULL, es = NULL, sd = NULL
+                WHERE id = ?1
+                  AND NOT EXISTS (SELECT 1 FROM shot_strings WHERE batch_id = ?1)
+                """,
+                (row[0],),
+            )
+        conn.commit()
+        conn.close()
+
+    @_invalidates("shot_strings", "reload_batches")
+    def recompute_shot_string_stats(self) -> int:
+        """Bulk-recompute every string and batch (e.g. after a formula change)."""
+        conn = self.connect()
+        cursor = conn.cursor()
+        count = chronograph.recompute_stats(cursor)
+        conn.commit()
+        conn.close()
+        return count
+
+    def compare_reload_batches(
+        self, batch_ids: list[str]
+    ) -> dict[str, chronograph.StringStats]:
+        """Pooled velocity/energy stats per batch for load-development comparison."""
+        if not batch_ids:
+            return {}
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT s.batch_id, s.velocities, b.bullet_weight_gr, b.cartridge
+            FROM shot_strings s
+            JOIN reload_batches b ON b.id = s.batch_id
+            WHERE s.batch_id IN ({', '.join('?' * len(batch_ids))})
+            """,
+            batch_ids,
+        )
+        rows = cursor.fetchall()
+        conn.close()
+
+        per_batch: dict[str, tuple[list[array], int | None, str]] = {}
+        for batch_id, blob, weight, cartridge in rows:
+            per_batch.setdefault(batch_id, ([], weight, cartridge))[0].append(
+                chronograph.unpack_velocities(blob)
+            )
+
+        return {
+            batch_id: chronograph.pooled_stats(
+                strings, weight, chronograph.bullet_diameter_in(cartridge)
+            )
+            for batch_id, (strings, weight, cartridge) in per_batch.items()
+        }
+
+    # -------- LOADOUT METHODS --------
+
+    @_invalidates("loadouts")
+    def create_loadout(self, loadout: Loadout) -> None:
+        """Create new loadout profile"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO loadouts VALUES (?, ?, ?, ?, ?)",
+            (
                 loadout.id,
                 loadout.name,
                 loadout.description,
@@ -1848,28 +2796,22 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("loadouts")
     def get_all_loadouts(self) -> list[Loadout]:
         """Get all loadout profiles"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM loadouts ORDER BY name")
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "loadouts")
         conn.close()
 
-        return [
-            Loadout(
-                id=row[0],
-                name=row[1],
-                description=row[2] or "",
-                created_date=datetime.fromtimestamp(row[3]) if row[3] else None,
-                notes=row[4] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("loadouts")
     def update_loadout(self, loadout: Loadout) -> None:
         """Update loadout details"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE loadouts SET name = ?, description = ?, created_date = ?, notes = ? WHERE id = ?",
@@ -1886,9 +2828,10 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("loadout_items", "loadout_consumables", "loadout_checkouts", "loadouts")
     def delete_loadout(self, loadout_id: str) -> None:
         """Delete loadout and all associated items/consumables"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM loadout_items WHERE loadout_id = ?", (loadout_id,))
         cursor.execute(
@@ -1901,9 +2844,10 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("loadout_items")
     def add_loadout_item(self, item: LoadoutItem) -> None:
         """Add item to loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO loadout_items VALUES (?, ?, ?, ?, ?)",
@@ -1912,38 +2856,33 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("loadout_items")
     def get_loadout_items(self, loadout_id: str) -> list[LoadoutItem]:
         """Get all items in loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT * FROM loadout_items WHERE loadout_id = ?", (loadout_id,)
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "loadout_items")
         conn.close()
 
-        return [
-            LoadoutItem(
-                id=row[0],
-                loadout_id=row[1],
-                item_id=row[2],
-                item_type=GearCategory(row[3]),
-                notes=row[4] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("loadout_items")
     def remove_loadout_item(self, item_id: str) -> None:
         """Remove item from loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM loadout_items WHERE id = ?", (item_id,))
         conn.commit()
         conn.close()
 
+    @_invalidates("loadout_consumables")
     def add_loadout_consumable(self, item: LoadoutConsumable) -> None:
         """Add consumable to loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO loadout_consumables VALUES (?, ?, ?, ?, ?)",
@@ -1952,30 +2891,24 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_cached_read("loadout_consumables")
     def get_loadout_consumables(self, loadout_id: str) -> list[LoadoutConsumable]:
         """Get all consumables in loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "SELECT * FROM loadout_consumables WHERE loadout_id = ?", (loadout_id,)
         )
         rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "loadout_consumables")
         conn.close()
 
-        return [
-            LoadoutConsumable(
-                id=row[0],
-                loadout_id=row[1],
-                consumable_id=row[2],
-                quantity=row[3],
-                notes=row[4] or "",
-            )
-            for row in rows
-        ]
+        return list(map(decode, rows))
 
+    @_invalidates("loadout_consumables")
     def update_loadout_consumable_qty(self, item_id: str, qty: int) -> None:
         """Update consumable quantity in loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute(
             "UPDATE loadout_consumables SET quantity = ? WHERE id = ?", (qty, item_id)
@@ -1983,9 +2916,10 @@ class GearRepository:
         conn.commit()
         conn.close()
 
+    @_invalidates("loadout_consumables")
     def remove_loadout_consumable(self, item_id: str) -> None:
         """Remove consumable from loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
         cursor.execute("DELETE FROM loadout_consumables WHERE id = ?", (item_id,))
         conn.commit()
@@ -1993,7 +2927,7 @@ class GearRepository:
 
     def validate_loadout_checkout(self, loadout_id: str) -> dict:
         """Validate loadout before checkout - returns warnings and critical issues"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         loadout_items = self.get_loadout_items(loadout_id)
@@ -2063,14 +2997,16 @@ class GearRepository:
             "critical_issues": critical_issues,
         }
 
+    @_invalidates()
     def checkout_loadout(
         self, loadout_id: str, borrower_id: str, expected_return: datetime
     ) -> tuple[str, list[str]]:
         """One-click checkout of entire loadout"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
+        self._lock_for_write(conn)
         cursor = conn.cursor()
 
-        # Validate first
+        # Validate first (under the lock, so nothing changes before commit)
         validation = self.validate_loadout_checkout(loadout_id)
         if not validation["can_checkout"]:
             conn.close()
@@ -2080,80 +3016,57 @@ class GearRepository:
         loadout_items = self.get_loadout_items(loadout_id)
         loadout_consumables = self.get_loadout_consumables(loadout_id)
 
-        checkout_ids = []
-
         # Create checkouts for each item
-        for item in loadout_items:
-            checkout_id = str(uuid.uuid4())
-            cursor.execute(
-                "INSERT INTO checkouts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        checkout_ids = [str(uuid.uuid4()) for _ in loadout_items]
+        checkout_date = int(datetime.now().timestamp())
+        expected = int(expected_return.timestamp()) if expected_return else None
+        cursor.executemany(
+            "INSERT INTO checkouts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            [
                 (
                     checkout_id,
                     item.item_id,
                     item.item_type.value,
                     borrower_id,
-                    int(datetime.now().timestamp()),
-                    int(expected_return.timestamp()) if expected_return else None,
+                    checkout_date,
+                    expected,
                     None,
                     "",
-                ),
-            )
-
-            # Update item status
-            if item.item_type == GearCategory.FIREARM:
-                cursor.execute(
-                    "UPDATE firearms SET status = ? WHERE id = ?",
-                    (CheckoutStatus.CHECKED_OUT.value, item.item_id),
                 )
-            elif item.item_type == GearCategory.SOFT_GEAR:
-                cursor.execute(
-                    "UPDATE soft_gear SET status = ? WHERE id = ?",
-                    (CheckoutStatus.CHECKED_OUT.value, item.item_id),
-                )
-            elif item.item_type == GearCategory.NFA_ITEM:
-                cursor.execute(
-                    "UPDATE nfa_items SET status = ? WHERE id = ?",
-                    (CheckoutStatus.CHECKED_OUT.value, item.item_id),
-                )
-
-            checkout_ids.append(checkout_id)
-
-        # Deduct consumables
-        all_consumables = self.get_all_consumables()
-        consumable_dict = {c.id: c for c in all_consumables}
+                for checkout_id, item in zip(checkout_ids, loadout_items)
+            ],
+        )
+        self._set_item_status(
+            cursor, [item.item_id for item in loadout_items], CheckoutStatus.CHECKED_OUT
+        )
 
+        # Deduct consumables relative to the stored stock, so a concurrent
+        # change by another window or process is not overwritten
         for item in loadout_consumables:
-            if item.consumable_id in consumable_dict:
-                current_qty = consumable_dict[item.consumable_id].quantity
-                new_qty = current_qty - item.quantity
-                cursor.execute(
-                    "UPDATE consumables SET quantity = ? WHERE id = ?",
-                    (new_qty, item.consumable_id),
-                )
-
+            cursor.execute(
+                "UPDATE consumables SET quantity = quantity - ? WHERE id = ?",
+                (item.quantity, item.consumable_id),
+            )
+            if cursor.rowcount:
                 # Record transaction
                 tx_id = str(uuid.uuid4())
                 cursor.execute(
-                    "INSERT INTO consumable_transactions VALUES (?, ?, ?, ?, ?)",
+                    "INSERT INTO consumable_transactions VALUES (?, ?, ?, ?, ?, ?)",
                     (
                         tx_id,
                         item.consumable_id,
                         "USE",
                         -item.quantity,
                         int(datetime.now().timestamp()),
+                        "",
                     ),
                 )
 
         all_messages = validation["warnings"]
-        conn.commit()
-        conn.close()
-
         main_checkout_id = checkout_ids[0] if checkout_ids else ""
 
-        # Create loadout_checkout record
+        # Create loadout_checkout record, in the same transaction
         loadout_checkout_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
         cursor.execute(
             "INSERT INTO loadout_checkouts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
             (
@@ -2174,7 +3087,7 @@ class GearRepository:
 
     def get_loadout_checkout(self, checkout_id: str) -> LoadoutCheckout | None:
         """Get loadout checkout record"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         cursor.execute(
@@ -2182,22 +3095,12 @@ class GearRepository:
             (checkout_id,),
         )
         row = cursor.fetchone()
+        decode = self._row_decoder(cursor, "loadout_checkouts")
         conn.close()
 
-        if not row:
-            return None
-
-        return LoadoutCheckout(
-            id=row[0],
-            loadout_id=row[1],
-            checkout_id=row[2],
-            return_date=datetime.fromtimestamp(row[3]) if row[3] else None,
-            rounds_fired=row[4],
-            rain_exposure=bool(row[5]),
-            ammo_type=row[6] or "",
-            notes=row[7] or "",
-        )
+        return decode(row) if row else None
 
+    @_invalidates()
     def return_loadout(
         self,
         loadout_checkout_id: str,
@@ -2207,7 +3110,7 @@ class GearRepository:
         notes: str = "",
     ) -> None:
         """Return loadout with usage data - updates round counts and creates maintenance logs"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self.connect()
         cursor = conn.cursor()
 
         # Get loadout info
@@ -2236,232 +3139,884 @@ class GearRepository:
             ),
         )
 
-        # Get items and update status
+        # Close the items' open checkouts and mark them available
         loadout_items = self.get_loadout_items(loadout_id)
+        item_ids = [item.item_id for item in loadout_items]
+        if item_ids:
+            cursor.execute(
+                """
+                UPDATE checkouts SET actual_return = ?
+                WHERE actual_return IS NULL
+                  AND item_id IN (SELECT value FROM json_each(?))
+                """,
+                (int(datetime.now().timestamp()), json.dumps(item_ids)),
+            )
+        self._set_item_status(cursor, item_ids, CheckoutStatus.AVAILABLE)
 
+        # Update round counts per firearm (same transaction: a second
+        # connection would block on this one's write lock)
+        for item in loadout_items:
+            if (
+                item.item_type == GearCategory.FIREARM
+                and item.item_id in rounds_fired_dict
+            ):
+                self._add_firearm_rounds(
+                    cursor, item.item_id, rounds_fired_dict[item.item_id]
+                )
+
+        # Create maintenance logs for each firearm in loadout
         for item in loadout_items:
-            # Get the checkout_id for this specific item
+            if (
+                item.item_type == GearCategory.FIREARM
+                and item.item_id in rounds_fired_dict
+            ):
+                rounds = rounds_fired_dict[item.item_id]
+                firearm_id = item.item_id
+
+                # FIRED_ROUNDS log
+                if rounds > 0:
+                    log = MaintenanceLog(
+                        id=str(uuid.uuid4()),
+                        item_id=firearm_id,
+                        item_type=GearCategory.FIREARM,
+                        log_type=MaintenanceType.FIRED_ROUNDS,
+                        date=datetime.now(),
+                        details=f"Rounds fired: {rounds}",
+                        ammo_count=rounds,
+                    )
+                    cursor.execute(
+                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            log.id,
+                            log.item_id,
+                            log.item_type.value,
+                            log.log_type.value,
+                            int(log.date.timestamp()),
+                            log.details,
+                            log.ammo_count,
+                            log.photo_path,
+                        ),
+                    )
+
+                # RAIN_EXPOSURE log
+                if rain_exposure:
+                    log = MaintenanceLog(
+                        id=str(uuid.uuid4()),
+                        item_id=firearm_id,
+                        item_type=GearCategory.FIREARM,
+                        log_type=MaintenanceType.RAIN_EXPOSURE,
+                        date=datetime.now(),
+                        details="Exposed to rain during use",
+                    )
+                    cursor.execute(
+                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            log.id,
+                            log.item_id,
+                            log.item_type.value,
+                            log.log_type.value,
+                            int(log.date.timestamp()),
+                            log.details,
+                            log.ammo_count,
+                            log.photo_path,
+                        ),
+                    )
+
+                # CORROSIVE_AMMO log
+                if "corrosive" in ammo_type.lower():
+                    log = MaintenanceLog(
+                        id=str(uuid.uuid4()),
+                        item_id=firearm_id,
+                        item_type=GearCategory.FIREARM,
+                        log_type=MaintenanceType.CORROSIVE_AMMO,
+                        date=datetime.now(),
+                        details=f"Fired corrosive ammo ({ammo_type})",
+                    )
+                    cursor.execute(
+                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            log.id,
+                            log.item_id,
+                            log.item_type.value,
+                            log.log_type.value,
+                            int(log.date.timestamp()),
+                            log.details,
+                            log.ammo_count,
+                            log.photo_path,
+                        ),
+                    )
+
+                # LEAD_AMMO log
+                if "lead" in ammo_type.lower():
+                    log = MaintenanceLog(
+                        id=str(uuid.uuid4()),
+                        item_id=firearm_id,
+                        item_type=GearCategory.FIREARM,
+                        log_type=MaintenanceType.LEAD_AMMO,
+                        date=datetime.now(),
+                        details=f"Fired lead ammo ({ammo_type})",
+                    )
+                    cursor.execute(
+                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            log.id,
+                            log.item_id,
+                            log.item_type.value,
+                            log.log_type.value,
+                            int(log.date.timestamp()),
+                            log.details,
+                            log.ammo_count,
+                            log.photo_path,
+                        ),
+                    )
+
+        conn.commit()
+        conn.close()
+
+    # -------- MANIFEST METHODS --------
+
+    @staticmethod
+    def _insert_manifest(cursor: sqlite3.Cursor, manifest: Manifest) -> None:
+        cursor.execute(
+            "INSERT INTO manifests VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                manifest.id,
+                manifest.name,
+                manifest.borrower_id,
+                manifest.status.value,
+                manifest.loadout_id,
+                manifest.location,
+                int(manifest.created_date.timestamp())
+                if manifest.created_date
+                else int(datetime.now().timestamp()),
+                int(manifest.start_date.timestamp()) if manifest.start_date else None,
+                int(manifest.end_date.timestamp()) if manifest.end_date else None,
+                int(manifest.expected_return.timestamp())
+                if manifest.expected_return
+                else None,
+                manifest.notes,
+            ),
+        )
+
+    @_invalidates("manifests")
+    def create_manifest(self, manifest: Manifest) -> None:
+        """Create a planned trip manifest"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        self._insert_manifest(cursor, manifest)
+        conn.commit()
+        conn.close()
+
+    @_invalidates("manifests", "manifest_lines")
+    def create_manifest_from_loadout(
+        self,
+        loadout_id: str,
+        name: str,
+        borrower_id: str,
+        expected_return: datetime | None = None,
+        location: str = "",
+        notes: str = "",
+    ) -> Manifest:
+        """Plan a trip with a copy of a loadout's items and consumables"""
+        manifest = Manifest(
+            id=str(uuid.uuid4()),
+            name=name,
+            borrower_id=borrower_id,
+            loadout_id=loadout_id,
+            location=location,
+            created_date=datetime.now(),
+            expected_return=expected_return,
+            notes=notes,
+        )
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        self._insert_manifest(cursor, manifest)
+        cursor.execute(
+            """
+            INSERT INTO manifest_lines
+                (id, manifest_id, item_id, item_type, quantity, notes)
+            SELECT uuid4(), ?1, item_id, item_type, 1, notes
+            FROM loadout_items WHERE loadout_id = ?2
+            UNION ALL
+            SELECT uuid4(), ?1, consumable_id, 'CONSUMABLE', quantity, notes
+            FROM loadout_consumables WHERE loadout_id = ?2
+        """,
+            (manifest.id, loadout_id),
+        )
+        conn.commit()
+        conn.close()
+        return manifest
+
+    @_cached_read("manifests")
+    def get_all_manifests(self) -> list[Manifest]:
+        """Get all trip manifests, newest first"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM manifests ORDER BY created_date DESC")
+        rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "manifests")
+        conn.close()
+
+        return list(map(decode, rows))
+
+    def get_manifest(self, manifest_id: str) -> Manifest | None:
+        """Get one trip manifest"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT * FROM manifests WHERE id = ?", (manifest_id,))
+        row = cursor.fetchone()
+        decode = self._row_decoder(cursor, "manifests")
+        conn.close()
+
+        return decode(row) if row else None
+
+    @_invalidates("manifests")
+    def update_manifest(self, manifest: Manifest) -> None:
+        """Update trip details; status only changes through start/complete"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            UPDATE manifests
+            SET name = ?, borrower_id = ?, location = ?, expected_return = ?, notes = ?
+            WHERE id = ?
+        """,
+            (
+                manifest.name,
+                manifest.borrower_id,
+                manifest.location,
+                int(manifest.expected_return.timestamp())
+                if manifest.expected_return
+                else None,
+                manifest.notes,
+                manifest.id,
+            ),
+        )
+        conn.commit()
+        conn.close()
+
+    @_invalidates("manifests", "manifest_lines")
+    def delete_manifest(self, manifest_id: str) -> None:
+        """Delete a manifest and its lines (not while the trip is underway)"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("SELECT status FROM manifests WHERE id = ?", (manifest_id,))
+        row = cursor.fetchone()
+        if row and row[0] == ManifestStatus.IN_PROGRESS.value:
+            conn.close()
+            raise ValueError("Complete the trip before deleting its manifest")
+
+        cursor.execute(
+            "DELETE FROM manifest_lines WHERE manifest_id = ?", (manifest_id,)
+        )
+        cursor.execute("DELETE FROM manifests WHERE id = ?", (manifest_id,))
+        conn.commit()
+        conn.close()
+
+    @_invalidates("manifest_lines")
+    def add_manifest_lines(self, lines: list[ManifestLine]) -> None:
+        """Add gear or consumable lines to planned manifests"""
+        if not lines:
+            return
+        conn = self.connect()
+        cursor = conn.cursor()
+
+        manifest_ids = sorted({line.manifest_id for line in lines})
+        cursor.execute(
+            f"""
+            SELECT COUNT(*) FROM manifests
+            WHERE status = 'PLANNED'
+              AND id IN ({", ".join("?" * len(manifest_ids))})
+        """,
+            manifest_ids,
+        )
+        if cursor.fetchone()[0] != len(manifest_ids):
+            conn.close()
+            raise ValueError("Lines can only be added to a planned manifest")
+
+        try:
+            cursor.executemany(
+                "INSERT INTO manifest_lines VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        line.id,
+                        line.manifest_id,
+                        line.item_id,
+                        line.item_type.value,
+                        line.quantity,
+                        None,
+                        None,
+                        line.notes,
+                    )
+                    for line in lines
+                ],
+            )
+        except sqlite3.IntegrityError:
+            conn.close()
+            raise ValueError("An item can only be listed once per manifest")
+        conn.commit()
+        conn.close()
+
+    @_cached_read(
+        "manifest_lines", "firearms", "soft_gear", "nfa_items", "consumables"
+    )
+    def get_manifest_lines(self, manifest_id: str) -> list[tuple[ManifestLine, str]]:
+        """Returns (line, item_name) for a manifest, gear before consumables"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            SELECT l.*, COALESCE(r.name, 'Unknown') as item_name
+            FROM manifest_lines l
+            LEFT JOIN item_registry r ON r.id = l.item_id
+            WHERE l.manifest_id = ?
+            ORDER BY l.item_type = 'CONSUMABLE', l.item_type, item_name
+        """,
+            (manifest_id,),
+        )
+        rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "manifest_lines", ("item_name",))
+        conn.close()
+
+        return [(decode(row), row[-1]) for row in rows]
+
+    @_invalidates("manifest_lines")
+    def remove_manifest_line(self, line_id: str) -> None:
+        """Remove a line from a planned manifest"""
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            """
+            DELETE FROM manifest_lines
+            WHERE id = ? AND manifest_id IN (
+                SELECT id FROM manifests WHERE status = 'PLANNED'
+            )
+        """,
+            (line_id,),
+        )
+        removed = cursor.rowcount
+        conn.commit()
+        conn.close()
+        if not removed:
+            raise ValueError("Lines can only be removed from a planned manifest")
+
+    def _manifest_for_transition(
+        self, cursor: sqlite3.Cursor, manifest_id: str, expected: ManifestStatus
+    ) -> tuple[str, str]:
+        """
+        (name, borrower_id) of a manifest, if it is in the expected state.
+        Takes the write lock first, so the transition's checks hold until
+        it commits.
+        """
+        self._lock_for_write(cursor.connection)
+        cursor.execute(
+            "SELECT name, borrower_id, status FROM manifests WHERE id = ?",
+            (manifest_id,),
+        )
+        row = cursor.fetchone()
+        if row is None:
+            raise ValueError(f"Manifest not found: {manifest_id}")
+        if row[2] != expected.value:
+            status = ManifestStatus(row[2]).value.replace("_", " ").lower()
+            raise ValueError(f"Trip '{row[0]}' is {status}")
+        return row[0], row[1]
+
+    # Starting and completing a trip are a fixed number of set-based
+    # statements in one transaction, however many lines the manifest has
+
+    @_invalidates()
+    def start_manifest(
+        self, manifest_id: str, expected_return: datetime | None = None
+    ) -> None:
+        """
+        Planned -> In Progress: check out every gear line to the manifest's
+        borrower and deduct every consumable line from stock. Raises
+        ValueError, changing nothing, if any item is unavailable.
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        try:
+            name, borrower_id = self._manifest_for_transition(
+                cursor, manifest_id, ManifestStatus.PLANNED
+            )
+
+            cursor.execute(
+                """
+                SELECT r.name, r.status, f.needs_maintenance
+                FROM manifest_lines l
+                LEFT JOIN item_registry r ON r.id = l.item_id
+                LEFT JOIN firearms f ON f.id = l.item_id
+                WHERE l.manifest_id = ?
+                  AND (r.id IS NULL OR r.status != 'AVAILABLE' OR f.needs_maintenance)
+            """,
+                (manifest_id,),
+            )
+            issues = []
+            for item_name, status, needs_maintenance in cursor.fetchall():
+                if item_name is None:
+                    issues.append("An item on the manifest no longer exists")
+                elif status != CheckoutStatus.AVAILABLE.value:
+                    issues.append(
+                        f"'{item_name}' is not available (status: {status})"
+                    )
+                else:
+                    issues.append(f"'{item_name}' needs maintenance before checkout")
+            if issues:
+                raise ValueError("\n".join(issues))
+
+            now = int(datetime.now().timestamp())
+            params = {
+                "manifest": manifest_id,
+                "borrower": borrower_id,
+                "now": now,
+                "expected": int(expected_return.timestamp())
+                if expected_return
+                else None,
+                "notes": f"Trip: {name}",
+            }
+            cursor.execute(
+                """
+                UPDATE manifest_lines SET checkout_id = uuid4()
+                WHERE manifest_id = :manifest AND item_type != 'CONSUMABLE'
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                INSERT INTO checkouts (id, item_id, item_type, borrower_id,
+                    checkout_date, expected_return, actual_return, notes)
+                SELECT l.checkout_id, l.item_id, l.item_type, :borrower, :now,
+                       COALESCE(:expected, m.expected_return), NULL, :notes
+                FROM manifest_lines l
+                JOIN manifests m ON m.id = l.manifest_id
+                WHERE l.manifest_id = :manifest AND l.checkout_id IS NOT NULL
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                UPDATE item_registry SET status = 'CHECKED_OUT'
+                WHERE status IS NOT NULL AND id IN (
+                    SELECT item_id FROM manifest_lines
+                    WHERE manifest_id = :manifest AND item_type != 'CONSUMABLE'
+                )
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                UPDATE consumables SET quantity = quantity - (
+                    SELECT l.quantity FROM manifest_lines l
+                    WHERE l.manifest_id = :manifest AND l.item_id = consumables.id
+                )
+                WHERE id IN (
+                    SELECT item_id FROM manifest_lines
+                    WHERE manifest_id = :manifest AND item_type = 'CONSUMABLE'
+                )
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                INSERT INTO consumable_transactions
+                SELECT uuid4(), item_id, 'USE', -quantity, :now, :notes
+                FROM manifest_lines
+                WHERE manifest_id = :manifest AND item_type = 'CONSUMABLE'
+                  AND quantity > 0
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                UPDATE manifests
+                SET status = 'IN_PROGRESS', start_date = :now,
+                    expected_return = COALESCE(:expected, expected_return)
+                WHERE id = :manifest
+            """,
+                params,
+            )
+            conn.commit()
+        finally:
+            # Rolls back on error
+            conn.close()
+
+    @_invalidates()
+    def complete_manifest(
+        self, manifest_id: str, returned: dict[str, int] | None = None
+    ) -> None:
+        """
+        In Progress -> Complete: return every gear line still out and put
+        returned consumables back in stock.
+
+        Args:
+            returned: consumable line id -> quantity that came back
+                (lines not listed came back empty)
+        """
+        returned = returned or {}
+        if any(qty < 0 for qty in returned.values()):
+            raise ValueError("Returned quantities cannot be negative")
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        try:
+            name, _ = self._manifest_for_transition(
+                cursor, manifest_id, ManifestStatus.IN_PROGRESS
+            )
+            now = int(datetime.now().timestamp())
+            params = {"manifest": manifest_id, "now": now, "notes": f"Trip: {name}"}
+
+            if returned:
+                cursor.executemany(
+                    """
+                    UPDATE manifest_lines SET quantity_returned = ?
+                    WHERE id = ? AND manifest_id = ? AND item_type = 'CONSUMABLE'
+                """,
+                    [(qty, line_id, manifest_id) for line_id, qty in returned.items()],
+                )
+            cursor.execute(
+                """
+                UPDATE manifest_lines SET quantity_returned = 0
+                WHERE manifest_id = :manifest AND item_type = 'CONSUMABLE'
+                  AND quantity_returned IS NULL
+            """,
+                params,
+            )
             cursor.execute(
-                "SELECT id FROM checkouts WHERE item_id = ? AND actual_return IS NULL",
-                (item.item_id,),
+                """
+                SELECT COUNT(*) FROM manifest_lines
+                WHERE manifest_id = :manifest AND quantity_returned > quantity
+            """,
+                params,
             )
-            result = cursor.fetchone()
+            if cursor.fetchone()[0]:
+                raise ValueError("More came back than was packed")
 
-            if result:
-                item_checkout_id = result[0]
-                # Update checkout return date
-                cursor.execute(
-                    "UPDATE checkouts SET actual_return = ? WHERE id = ?",
-                    (int(datetime.now().timestamp()), item_checkout_id),
+            # Items returned on their own mid-trip are left as they are
+            cursor.execute(
+                """
+                UPDATE item_registry SET status = 'AVAILABLE'
+                WHERE status IS NOT NULL AND id IN (
+                    SELECT l.item_id FROM manifest_lines l
+                    JOIN checkouts c ON c.id = l.checkout_id
+                    WHERE l.manifest_id = :manifest AND c.actual_return IS NULL
                 )
-
-            # Update item status back to AVAILABLE
-            if item.item_type == GearCategory.FIREARM:
-                cursor.execute(
-                    "UPDATE firearms SET status = ? WHERE id = ?",
-                    (CheckoutStatus.AVAILABLE.value, item.item_id),
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                UPDATE checkouts SET actual_return = :now
+                WHERE actual_return IS NULL AND id IN (
+                    SELECT checkout_id FROM manifest_lines
+                    WHERE manifest_id = :manifest
                 )
-            elif item.item_type == GearCategory.SOFT_GEAR:
-                cursor.execute(
-                    "UPDATE soft_gear SET status = ? WHERE id = ?",
-                    (CheckoutStatus.AVAILABLE.value, item.item_id),
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                UPDATE consumables SET quantity = quantity + (
+                    SELECT l.quantity_returned FROM manifest_lines l
+                    WHERE l.manifest_id = :manifest AND l.item_id = consumables.id
                 )
-            elif item.item_type == GearCategory.NFA_ITEM:
-                cursor.execute(
-                    "UPDATE nfa_items SET status = ? WHERE id = ?",
-                    (CheckoutStatus.AVAILABLE.value, item.item_id),
+                WHERE id IN (
+                    SELECT item_id FROM manifest_lines
+                    WHERE manifest_id = :manifest AND item_type = 'CONSUMABLE'
+                      AND quantity_returned > 0
                 )
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                INSERT INTO consumable_transactions
+                SELECT uuid4(), item_id, 'RESTOCK', quantity_returned, :now, :notes
+                FROM manifest_lines
+                WHERE manifest_id = :manifest AND item_type = 'CONSUMABLE'
+                  AND quantity_returned > 0
+            """,
+                params,
+            )
+            cursor.execute(
+                """
+                UPDATE manifests SET status = 'COMPLETE', end_date = :now
+                WHERE id = :manifest
+            """,
+                params,
+            )
+            conn.commit()
+        finally:
+            conn.close()
 
-        # Update round counts per firearm
-        for item in loadout_items:
-            if (
-                item.item_type == GearCategory.FIREARM
-                and item.item_id in rounds_fired_dict
-            ):
-                self.update_firearm_rounds(
-                    item.item_id, rounds_fired_dict[item.item_id]
-                )
+    # -------- AUDIT METHODS --------
 
-        # Create maintenance logs for each firearm in loadout
-        for item in loadout_items:
-            if (
-                item.item_type == GearCategory.FIREARM
-                and item.item_id in rounds_fired_dict
-            ):
-                rounds = rounds_fired_dict[item.item_id]
-                firearm_id = item.item_id
+    def get_audit_log(
+        self,
+        table_name: str | None = None,
+        row_id: str | None = None,
+        before_id: int | None = None,
+        limit: int = 100,
+    ) -> list[AuditEntry]:
+        """
+        Audit entries newest first, optionally for one table or one row.
+        Pass the last entry's id as before_id for the next page.
+        """
+        clauses = []
+        params: list = []
+        if table_name:
+            clauses.append("table_name = ?")
+            params.append(table_name)
+        if row_id:
+            clauses.append("row_id = ?")
+            params.append(row_id)
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute(
+            f"SELECT * FROM audit_log {where} ORDER BY id DESC LIMIT ?",
+            params + [limit],
+        )
+        rows = cursor.fetchall()
+        decode = self._row_decoder(cursor, "audit_log")
+        conn.close()
+        return list(map(decode, rows))
 
-                # FIRED_ROUNDS log
-                if rounds > 0:
-                    log = MaintenanceLog(
-                        id=str(uuid.uuid4()),
-                        item_id=firearm_id,
-                        item_type=GearCategory.FIREARM,
-                        log_type=MaintenanceType.FIRED_ROUNDS,
-                        date=datetime.now(),
-                        details=f"Rounds fired: {rounds}",
-                        ammo_count=rounds,
-                    )
-                    cursor.execute(
-                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            log.id,
-                            log.item_id,
-                            log.item_type.value,
-                            log.log_type.value,
-                            int(log.date.timestamp()),
-                            log.details,
-                            log.ammo_count,
-                            log.photo_path,
-                        ),
-                    )
+    def prune_audit_log(
+        self,
+        retention_days: int = audit.RETENTION_DAYS,
+        compact_after_days: int = audit.COMPACT_AFTER_DAYS,
+    ) -> tuple[int, int]:
+        """
+        Merge repeated updates older than compact_after_days and delete
+        entries older than retention_days. Both steps only visit the entries
+        they remove or merge. Returns (merged away, deleted).
+        """
+        now = int(datetime.now().timestamp())
+        conn = self.connect()
+        cursor = conn.cursor()
+        merged = audit.compact_audit_log(cursor, now - compact_after_days * 86400)
+        deleted = audit.prune_audit_log(cursor, now - retention_days * 86400)
+        conn.commit()
+        conn.close()
+        return merged, deleted
 
-                # RAIN_EXPOSURE log
-                if rain_exposure:
-                    log = MaintenanceLog(
-                        id=str(uuid.uuid4()),
-                        item_id=firearm_id,
-                        item_type=GearCategory.FIREARM,
-                        log_type=MaintenanceType.RAIN_EXPOSURE,
-                        date=datetime.now(),
-                        details="Exposed to rain during use",
-                    )
-                    cursor.execute(
-                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            log.id,
-                            log.item_id,
-                            log.item_type.value,
-                            log.log_type.value,
-                            int(log.date.timestamp()),
-                            log.details,
-                            log.ammo_count,
-                            log.photo_path,
-                        ),
-                    )
+    # -------- UNDO METHODS --------
 
-                # CORROSIVE_AMMO log
-                if "corrosive" in ammo_type.lower():
-                    log = MaintenanceLog(
-                        id=str(uuid.uuid4()),
-                        item_id=firearm_id,
-                        item_type=GearCategory.FIREARM,
-                        log_type=MaintenanceType.CORROSIVE_AMMO,
-                        date=datetime.now(),
-                        details=f"Fired corrosive ammo ({ammo_type})",
-                    )
-                    cursor.execute(
-                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            log.id,
-                            log.item_id,
-                            log.item_type.value,
-                            log.log_type.value,
-                            int(log.date.timestamp()),
-                            log.details,
-                            log.ammo_count,
-                            log.photo_path,
-                        ),
-                    )
+    @contextmanager
+    def user_action(self, label: str):
+        """
+        Make every write inside the block one undo step named label. Each
+        repository write is already a step of its own; this groups several,
+        e.g. a dialog that saves an item and then logs maintenance on it.
+        """
+        depth = getattr(self._actions, "depth", 0)
+        if depth:
+            self._actions.depth = depth + 1
+            try:
+                yield
+            finally:
+                self._actions.depth = depth
+            return
 
-                # LEAD_AMMO log
-                if "lead" in ammo_type.lower():
-                    log = MaintenanceLog(
-                        id=str(uuid.uuid4()),
-                        item_id=firearm_id,
-                        item_type=GearCategory.FIREARM,
-                        log_type=MaintenanceType.LEAD_AMMO,
-                        date=datetime.now(),
-                        details=f"Fired lead ammo ({ammo_type})",
-                    )
-                    cursor.execute(
-                        "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
-                        (
-                            log.id,
-                            log.item_id,
-                            log.item_type.value,
-                            log.log_type.value,
-                            int(log.date.timestamp()),
-                            log.details,
-                            log.ammo_count,
-                            log.photo_path,
-                        ),
-                    )
+        self._actions.depth = 1
+        self._actions.current = [label, None]
+        try:
+            yield
+        finally:
+            self._actions.depth = 0
+            self._actions.current = None
 
-        conn.commit()
+    def _journal_commit(self, conn: sqlite3.Connection) -> None:
+        """
+        Journal the open user action's entries in the transaction that wrote
+        them, so a step costs no commit of its own and can never be lost
+        apart from its writes.
+        """
+        self._actions.commits = getattr(self._actions, "commits", 0) + 1
+        cursor = conn.cursor()
+        # Always taken, so entries written outside an action are not
+        # counted towards the next one
+        first = audit.take_written_entries(cursor)
+        action = getattr(self._actions, "current", None)
+        if action is None or first is None:
+            return
+        label, journal_id = action
+        if journal_id is None or not audit.extend_action(cursor, journal_id, first):
+            # Later commits in the same step (e.g. checkout_loadout) extend
+            # it, unless another connection wrote in between
+            action[1] = audit.record_action(cursor, label, first - 1)
+
+    def get_undo_labels(self) -> tuple[str | None, str | None]:
+        """Labels of the steps undo() and redo() would apply (None: nothing)."""
+        conn = self.connect()
+        cursor = conn.cursor()
+        labels = []
+        for state, order in ((audit.DONE, "DESC"), (audit.UNDONE, "ASC")):
+            cursor.execute(
+                f"""
+                SELECT label FROM undo_journal
+                WHERE kind = '{audit.ACTION}' AND state = ?
+                ORDER BY id {order} LIMIT 1
+            """,
+                (state,),
+            )
+            row = cursor.fetchone()
+            labels.append(row[0] if row else None)
         conn.close()
+        return labels[0], labels[1]
 
-    # -------- EXPORT METHODS --------
+    def undo(self) -> str | None:
+        """
+        Revert the most recent undo step in one transaction. Returns its
+        label, or None if there is nothing to undo. Raises ValueError (and
+        changes nothing) if its rows were changed outside the journal.
+        """
+        return self._replay(audit.UNDO)
 
-    def export_full_inventory_csv(self, output_path: Path) -> None:
-        import csv
+    def redo(self) -> str | None:
+        """Re-apply the most recently undone step; see undo()."""
+        return self._replay(audit.REDO)
 
-        with open(output_path, "w", newline="") as f:
-            writer = csv.writer(f)
+    def _replay(self, kind: str) -> str | None:
+        conn = self.connect()
+        cursor = conn.cursor()
+        # Locked from the start, so no other connection can replay the same
+        # step or write entries that would land in this one's range
+        cursor.execute("BEGIN IMMEDIATE")
+        if kind == audit.UNDO:
+            # Undo reverts the action's own entries...
+            cursor.execute(f"""
+                SELECT id, label, first_entry, last_entry FROM undo_journal
+                WHERE kind = '{audit.ACTION}' AND state = '{audit.DONE}'
+                ORDER BY id DESC LIMIT 1
+            """)
+        else:
+            # ...and redo reverts the entries of the action's latest undo
+            cursor.execute(f"""
+                SELECT a.id, a.label, u.first_entry, u.last_entry
+                FROM undo_journal a
+                JOIN undo_journal u ON u.id = (
+                    SELECT MAX(id) FROM undo_journal
+                    WHERE kind = '{audit.UNDO}' AND target = a.id
+                )
+                WHERE a.kind = '{audit.ACTION}' AND a.state = '{audit.UNDONE}'
+                ORDER BY a.id ASC LIMIT 1
+            """)
+        row = cursor.fetchone()
+        if row is None:
+            conn.close()
+            return None
+        action_id, label, first, last = row
 
-            # Firearms section
-            writer.writerow(["=== FIREARMS ==="])
-            writer.writerow(
-                ["Name", "Caliber", "Serial", "Status", "Last Cleaned", "Notes"]
+        try:
+            after = audit.last_entry_id(cursor)
+            audit.revert_entries(cursor, first, last)
+            audit.record_action(cursor, label, after, kind, action_id)
+            cursor.execute(
+                "UPDATE undo_journal SET state = ? WHERE id = ?",
+                (audit.UNDONE if kind == audit.UNDO else audit.DONE, action_id),
             )
-            for fw in self.get_all_firearms():
-                last_clean = self.last_cleaning_date(fw.id)
-                writer.writerow(
-                    [
-                        fw.name,
-                        fw.caliber,
-                        fw.serial_number,
-                        fw.status.value,
-                        last_clean.strftime("%Y-%m-%d") if last_clean else "Never",
-                        fw.notes,
-                    ]
-                )
+        except (ValueError, sqlite3.Error):
+            # Closing hands the connection back, rolling the replay back
+            conn.close()
+            raise
+        conn.commit()
+        conn.close()
+        self.invalidate_cache()
+        return label
 
-            writer.writerow([])
+    # -------- BATCH METHODS --------
 
-            # Soft gear section
-            writer.writerow(["=== SOFT GEAR ==="])
-            writer.writerow(["Name", "Category", "Brand", "Status", "Notes"])
-            for gear in self.get_all_soft_gear():
-                writer.writerow(
-                    [
-                        gear.name,
-                        gear.category,
-                        gear.brand,
-                        gear.status.value,
-                        gear.notes,
-                    ]
-                )
+    @contextmanager
+    def batch(self):
+        """
+        Run every repository call in the block on one connection and commit
+        them together when it exits (all are rolled back if it raises), so
+        a burst of small writes costs one commit. Wrap each call in
+        batch_step() to keep one that fails from taking the rest with it.
+        Each write is still its own undo step.
+        """
+        if self._pool.pinned() is not None:
+            raise ValueError("Batches cannot be nested")
+        conn = self._pool.pin()
+        batched = self._actions.batch_tables = set()
+        try:
+            conn.begin()
+            yield
+            self._pool.unpin()
+            conn.commit()
+        finally:
+            self._pool.unpin()
+            self._actions.batch_tables = None
+            # Rolls back unless committed above
+            conn.close()
+            # Reads on other threads may have cached rows from before the
+            # commit under the versions the writes bumped
+            if self._cache is not None and batched:
+                if () in batched:
+                    self._cache.invalidate()
+                else:
+                    self._cache.invalidate(tuple(set().union(*batched)))
+
+    @contextmanager
+    def batch_step(self):
+        """Savepoint inside batch(): if the block raises, only it is undone."""
+        conn = self._pool.pinned()
+        if conn is None:
+            raise ValueError("batch_step() must be used inside batch()")
+        conn.execute("SAVEPOINT batch_step")
+        try:
+            yield
+        except BaseException:
+            conn.execute("ROLLBACK TO batch_step")
+            conn.execute("RELEASE batch_step")
+            raise
+        conn.execute("RELEASE batch_step")
 
-            writer.writerow([])
+    # -------- DATABASE METHODS --------
 
-            # Consumables section
-            writer.writerow(["=== CONSUMABLES ==="])
-            writer.writerow(
-                ["Name", "Category", "Quantity", "Unit", "Min Qty", "Low Stock?"]
-            )
-            for c in self.get_all_consumables():
-                low = "YES" if c.quantity <= c.min_quantity else ""
-                writer.writerow(
-                    [c.name, c.category, c.quantity, c.unit, c.min_quantity, low]
-                )
+    def backup_database(self, backup_path: Path) -> None:
+        """
+        Copy the database to backup_path. Uses SQLite's online backup, which
+        also copies commits still in the WAL and is safe while other
+        windows or scripts have the database open.
+        """
+        conn = self.connect()
+        backup = sqlite3.connect(backup_path)
+        conn.backup(backup)
+        backup.close()
+        conn.close()
 
-            writer.writerow([])
+    def check_integrity(self, quick: bool = False) -> list[str]:
+        """
+        Problems found by SQLite's integrity check (quick_check if quick,
+        which skips index contents) and by the foreign key check; empty if
+        the database is sound.
+        """
+        conn = self.connect()
+        cursor = conn.cursor()
+        cursor.execute("PRAGMA quick_check" if quick else "PRAGMA integrity_check")
+        problems = [row[0] for row in cursor.fetchall() if row[0] != "ok"]
+        cursor.execute("PRAGMA foreign_key_check")
+        problems += [
+            f"{table} row {rowid}: no {parent} row for foreign key {fk}"
+            for table, rowid, parent, fk in cursor.fetchall()
+        ]
+        conn.close()
+        return problems
 
-            # Active checkouts
-            writer.writerow(["=== ACTIVE CHECKOUTS ==="])
-            writer.writerow(["Item", "Borrower", "Checkout Date", "Expected Return"])
-            for checkout, borrower, item_name in self.get_active_checkouts():
-                writer.writerow(
-                    [
-                        item_name,
-                        borrower.name,
-                        checkout.checkout_date.strftime("%Y-%m-%d"),
-                        checkout.expected_return.strftime("%Y-%m-%d")
-                        if checkout.expected_return
-                        else "TBD",
-                    ]
-                )
+    # -------- EXPORT METHODS --------
+
+    def export_full_inventory_csv(self, output_path: Path) -> None:
+        """Inventory summary as sectioned CSV (see reports.py)."""
+        from reports import write_report
+
+        write_report(self, "inventory", "csv", output_path)
 
     def parse_sectioned_csv(self, input_path: Path) -> dict[str, list[dict[str, str]]]:
         """
@@ -3613,6 +5168,8 @@ class GearRepository:
                     "sd",
                     "group_size_inches",
                     "group_distance_yards",
+                    "intended_use",
+                    "status",
                     "notes",
                 ]
             )
@@ -3642,6 +5199,8 @@ class GearRepository:
                         batch.sd or "",
                         batch.group_size_inches or "",
                         batch.group_distance_yards or "",
+                        batch.intended_use,
+                        batch.status,
                         batch.notes,
                     ]
                 )
@@ -3945,7 +5504,7 @@ class GearRepository:
                 "bullet_weight_gr,powder_name,powder_charge_gr,powder_lot",
                 "primer_maker,primer_type,case_brand,case_times_fired,case_prep_notes",
                 "coal_in,crimp_style,test_date,avg_velocity,es,sd",
-                "group_size_inches,group_distance_yards,notes",
+                "group_size_inches,group_distance_yards,intended_use,status,notes",
             ]
         )
         writer.writerow(
@@ -4181,7 +5740,7 @@ class GearRepository:
                 "bullet_weight_gr,powder_name,powder_charge_gr,powder_lot",
                 "primer_maker,primer_type,case_brand,case_times_fired,case_prep_notes",
                 "coal_in,crimp_style,test_date,avg_velocity,es,sd",
-                "group_size_inches,group_distance_yards,notes",
+                "group_size_inches,group_distance_yards,intended_use,status,notes",
             ]
         )
         writer.writerow(
@@ -4222,10 +5781,14 @@ class GearRepository:
             ]
         )
 
-    def _parse_date_str(self, date_str: str) -> datetime | None:
+    def _parse_date_str(
+        self, date_str: str, allow_empty: bool = False
+    ) -> datetime | None:
         """Parse ISO date string (YYYY-MM-DD) to datetime."""
         if not date_str:
-            return None
+            if allow_empty:
+                return None
+            raise ValueError("Missing required date. Use YYYY-MM-DD format.")
         try:
             return datetime.fromisoformat(date_str)
         except ValueError:
@@ -4274,12 +5837,6 @@ class GearRepository:
             )
         return enum_str
 
-    def _backup_database(self, backup_path: Path) -> None:
-        """Create backup of database before import."""
-        import shutil
-
-        shutil.copy2(self.db_path, backup_path)
-
     def preview_import(self, input_path: Path) -> tuple[dict, ImportResult]:
         """
         Preview import without modifying database.
@@ -4324,6 +5881,7 @@ class GearRepository:
             )
             return ({}, result)
 
+    @_invalidates()
     def import_complete_csv(
         self,
         input_path: Path,
@@ -4367,7 +5925,7 @@ class GearRepository:
                     progress_callback(
                         0, 100, "BACKUP", f"Creating backup: {backup_path.name}"
                     )
-                self._backup_database(backup_path)
+                self.backup_database(backup_path)
                 result.warnings.append(f"Database backed up to: {backup_path.name}")
 
             # Step 2: Parse and validate CSV
@@ -4502,7 +6060,7 @@ class GearRepository:
 
         conn = None
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self.connect()
             cursor = conn.cursor()
 
             for row_idx, row in enumerate(rows):
@@ -4642,6 +6200,12 @@ class GearRepository:
             self._create_loadout_item(row, cursor, entity_id)
         elif entity_type_upper == "LOADOUT_CONSUMABLES":
             self._create_loadout_consumable(row, cursor, entity_id)
+        elif entity_type_upper == "CHECKOUT_HISTORY":
+            self._create_checkout(row, cursor, entity_id)
+        elif entity_type_upper == "MAINTENANCE_LOGS":
+            self._create_maintenance_log(row, cursor, entity_id)
+        elif entity_type_upper == "TRANSFERS":
+            self._create_transfer(row, cursor, entity_id)
         else:
             raise ValueError(f"Unknown entity type: {entity_type}")
 
@@ -4680,7 +6244,7 @@ class GearRepository:
         maintenance_conditions = row.get("maintenance_conditions", "")
 
         cursor.execute(
-            "INSERT INTO firearms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO firearms VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 entity_id,
                 name,
@@ -4783,8 +6347,8 @@ class GearRepository:
                 category,
                 brand,
                 model,
-                int(purchase_date.timestamp()) if purchase_date else None,
                 serial_number,
+                int(purchase_date.timestamp()) if purchase_date else None,
                 mounted_on_firearm_id if mounted_on_firearm_id else None,
                 mount_position,
                 zero_distance_yards,
@@ -4841,10 +6405,12 @@ class GearRepository:
         group_distance_yards = self._parse_int_str(
             row.get("group_distance_yards", ""), allow_empty=True
         )
+        intended_use = row.get("intended_use", "")
+        status = row.get("status", "") or "WORKUP"
         notes = row.get("notes", "")
 
         cursor.execute(
-            "INSERT INTO reload_batches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO reload_batches VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 entity_id,
                 cartridge,
@@ -4869,6 +6435,8 @@ class GearRepository:
                 sd,
                 group_size_inches,
                 group_distance_yards,
+                intended_use,
+                status,
                 notes,
             ),
         )
@@ -4898,7 +6466,7 @@ class GearRepository:
                 entity_id,
                 name,
                 description,
-                int(created_date.timestamp()) if created_date else None,
+                int((created_date or datetime.now()).timestamp()),
                 notes,
             ),
         )
@@ -5207,7 +6775,7 @@ class GearRepository:
         borrower_id = borrower_result[0]
 
         cursor.execute(
-            "INSERT INTO checkouts VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO checkouts VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 entity_id,
                 item_id,
@@ -5232,7 +6800,7 @@ class GearRepository:
         photo_path = row.get("photo_path", "")
 
         cursor.execute(
-            "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO maintenance_logs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 entity_id,
                 item_id,
@@ -5258,7 +6826,7 @@ class GearRepository:
         notes = row.get("notes", "")
 
         cursor.execute(
-            "INSERT INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            "INSERT INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
             (
                 entity_id,
                 firearm_id,
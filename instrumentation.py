@@ -0,0 +1,348 @@
+"""
+SQL Instrumentation Module
+
+Opt-in query tracing for GearRepository. Instrumenting a repository wraps
+each of its public methods in a timer and hooks every pooled connection:
+a SQLite trace callback counts the statements actually run (including
+implicit BEGIN/COMMIT and trigger bodies) and a timing cursor measures
+each statement's execute + fetch time.
+
+Per method call it records the statement count, total SQL time and the
+slowest statements; nested calls roll up into their caller, so an action
+that issues one query per row (N+1) shows up as a child method called N
+times per call. Statements slower than the threshold go to a rotating
+slow-query log. Nothing is hooked until instrument() is called.
+"""
+
+import functools
+import heapq
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+
+SLOW_QUERY_MS = 50.0
+SLOWEST_PER_CALL = 3
+RECENT_CALLS = 200
+
+# A child method called at least this many times in one parent call is
+# reported as a likely N+1 pattern
+N_PLUS_ONE_CALLS = 10
+
+LOG_MAX_BYTES = 1_000_000
+LOG_BACKUPS = 3
+
+# Label for statements run outside any instrumented method
+UNTRACKED = "(untracked)"
+
+# Connection plumbing, not queries worth attributing
+_UNWRAPPED = {"connect", "close"}
+
+
+@dataclass
+class CallRecord:
+    """One instrumented method call (inclusive of nested calls)."""
+
+    method: str
+    parent: str | None = None
+    statements: int = 0
+    sql_s: float = 0.0
+    wall_s: float = 0.0
+    # [(seconds, sql)], slowest first
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    # Nested instrumented calls made directly by this call
+    children: dict[str, int] = field(default_factory=dict)
+    # [seconds, sql] per statement this call ran itself; fetches add time
+    _timed: list[list] = field(default_factory=list, repr=False)
+
+
+@dataclass
+class MethodStats:
+    """Aggregate of every recorded call to one method."""
+
+    method: str
+    calls: int = 0
+    statements: int = 0
+    sql_s: float = 0.0
+    wall_s: float = 0.0
+    max_statements: int = 0
+    slowest: list[tuple[float, str]] = field(default_factory=list)
+    # child method -> most calls made to it within a single call of this one
+    max_child_calls: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def statements_per_call(self) -> float:
+        return self.statements / self.calls if self.calls else 0.0
+
+
+class _TimedCursor(sqlite3.Cursor):
+    """Cursor that charges execute and fetch time to the current statement."""
+
+    _statement: list | None = None
+
+    def _run(self, fn, *args):
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            if self._statement is not None:
+                self._statement[0] += elapsed
+
+    def _begin(self, sql: str) -> None:
+        self._statement = self.connection._instrumentation._begin_statement(sql)
+
+    def execute(self, sql, parameters=()):
+        self._begin(sql)
+        return self._run(super().execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self._begin(sql)
+        return self._run(super().executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        self._begin(sql_script)
+        return self._run(super().executescript, sql_script)
+
+    def fetchone(self):
+        return self._run(super().fetchone)
+
+    def fetchmany(self, size=None):
+        if size is None:
+            size = self.arraysize
+        return self._run(super().fetchmany, size)
+
+    def fetchall(self):
+        return self._run(super().fetchall)
+
+    def __next__(self):
+        return self._run(super().__next__)
+
+
+def _one_line(sql: str, limit: int = 300) -> str:
+    text = " ".join(sql.split())
+    return text if len(text) <= limit else text[: limit - 3] + "..."
+
+
+class QueryInstrumentation:
+    """Collects per-method query statistics for instrumented repositories."""
+
+    cursor_factory = _TimedCursor
+
+    def __init__(
+        self,
+        slow_query_ms: float = SLOW_QUERY_MS,
+        log_path: Path | None = None,
+        max_log_bytes: int = LOG_MAX_BYTES,
+        log_backups: int = LOG_BACKUPS,
+    ):
+        self.slow_query_s = slow_query_ms / 1000
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._stats: dict[str, MethodStats] = {}
+        self._recent: deque[CallRecord] = deque(maxlen=RECENT_CALLS)
+        # [(seconds, method, sql)] over all calls, attributed to the method
+        # that ran the statement itself
+        self._slowest: list[tuple[float, str, str]] = []
+
+        self.log_path = log_path
+        self._logger = None
+        if log_path is not None:
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            self._logger = logging.getLogger(
+                f"gear_tracker.slow_sql.{log_path.resolve()}"
+            )
+            self._logger.propagate = False
+            if not self._logger.handlers:
+                handler = RotatingFileHandler(
+                    log_path,
+                    maxBytes=max_log_bytes,
+                    backupCount=log_backups,
+                    encoding="utf-8",
+                )
+                handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+                self._logger.addHandler(handler)
+            self._logger.setLevel(logging.INFO)
+
+    # -------- HOOKS --------
+
+    def instrument(self, repo) -> None:
+        """Wrap repo's public methods and hook its connections (idempotent)."""
+        if getattr(repo, "_instrumentation", None) is self:
+            return
+        for name in dir(type(repo)):
+            if name.startswith("_") or name in _UNWRAPPED:
+                continue
+            if not callable(getattr(type(repo), name)):
+                continue
+            setattr(repo, name, self._wrap(name, getattr(repo, name)))
+        repo._instrumentation = self
+        # Connections are attached as they leave the pool
+        repo._pool.instrumentation = self
+
+    def attach(self, conn: sqlite3.Connection) -> None:
+        """Hook a connection: count statements and time its cursors."""
+        conn.set_trace_callback(self._on_trace)
+        conn._instrumentation = self
+
+    def _wrap(self, name: str, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            with self.action(name):
+                return method(*args, **kwargs)
+
+        return wrapper
+
+    @contextmanager
+    def action(self, name: str):
+        """
+        Record everything run inside the block as one call of `name`.
+        Used for repository methods and for UI actions (e.g. a tab refresh)
+        so their nested repository calls are grouped.
+        """
+        stack = self._stack()
+        parent = stack[-1] if stack else None
+        record = CallRecord(method=name, parent=parent.method if parent else None)
+        if parent:
+            parent.children[name] = parent.children.get(name, 0) + 1
+
+        stack.append(record)
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record.wall_s = time.perf_counter() - start
+            stack.pop()
+            self._finish(record, parent)
+
+    def _stack(self) -> list[CallRecord]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _on_trace(self, statement: str) -> None:
+        stack = self._stack()
+        if stack:
+            stack[-1].statements += 1
+        else:
+            self._record_untracked()
+
+    def _begin_statement(self, sql: str) -> list | None:
+        stack = self._stack()
+        if not stack:
+            return None
+        timed = [0.0, sql]
+        stack[-1]._timed.append(timed)
+        return timed
+
+    # -------- RECORDING --------
+
+    def _record_untracked(self) -> None:
+        with self._lock:
+            stats = self._stats.get(UNTRACKED)
+            if stats is None:
+                stats = self._stats[UNTRACKED] = MethodStats(method=UNTRACKED)
+            stats.statements += 1
+
+    def _finish(self, record: CallRecord, parent: CallRecord | None) -> None:
+        own = heapq.nlargest(
+            SLOWEST_PER_CALL,
+            ((seconds, _one_line(sql)) for seconds, sql in record._timed),
+        )
+        record.sql_s += sum(seconds for seconds, _ in record._timed)
+        record.slowest = heapq.nlargest(SLOWEST_PER_CALL, record.slowest + own)
+
+        if self._logger is not None:
+            for seconds, sql in record._timed:
+                if seconds >= self.slow_query_s:
+                    self._logger.info(
+                        "%8.1f ms  %s  %s", seconds * 1000, record.method, _one_line(sql)
+                    )
+        record._timed = []
+
+        if parent is not None:
+            parent.statements += record.statements
+            parent.sql_s += record.sql_s
+            parent.slowest.extend(record.slowest)
+
+        with self._lock:
+            stats = self._stats.get(record.method)
+            if stats is None:
+                stats = self._stats[record.method] = MethodStats(method=record.method)
+            stats.calls += 1
+            stats.statements += record.statements
+            stats.sql_s += record.sql_s
+            stats.wall_s += record.wall_s
+            stats.max_statements = max(stats.max_statements, record.statements)
+            stats.slowest = heapq.nlargest(
+                SLOWEST_PER_CALL, stats.slowest + record.slowest
+            )
+            for child, count in record.children.items():
+                if count > stats.max_child_calls.get(child, 0):
+                    stats.max_child_calls[child] = count
+            self._recent.append(record)
+            self._slowest = heapq.nlargest(
+                SLOWEST_PER_CALL * 2,
+                self._slowest
+                + [(seconds, record.method, sql) for seconds, sql in own],
+            )
+
+    # -------- SUMMARY --------
+
+    def summary(self) -> list[MethodStats]:
+        """Per-method aggregates, most SQL time first."""
+        with self._lock:
+            return sorted(self._stats.values(), key=lambda s: s.sql_s, reverse=True)
+
+    def recent_calls(self) -> list[CallRecord]:
+        """The last RECENT_CALLS calls, oldest first."""
+        with self._lock:
+            return list(self._recent)
+
+    def n_plus_one_suspects(self) -> list[tuple[str, str, int]]:
+        """[(method, child, calls per call)] where a child ran N_PLUS_ONE_CALLS+ times."""
+        suspects = []
+        for stats in self.summary():
+            for child, count in stats.max_child_calls.items():
+                if count >= N_PLUS_ONE_CALLS:
+                    suspects.append((stats.method, child, count))
+        return sorted(suspects, key=lambda s: s[2], reverse=True)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._recent.clear()
+            self._slowest.clear()
+
+    def report(self, limit: int = 20) -> str:
+        lines = [
+            "SQL profile:",
+            f"  {'method':<34}{'calls':>7}{'stmts':>8}{'stmt/call':>10}"
+            f"{'sql ms':>10}{'wall ms':>10}",
+        ]
+        for stats in self.summary()[:limit]:
+            lines.append(
+                f"  {stats.method:<34}{stats.calls:>7}{stats.statements:>8}"
+                f"{stats.statements_per_call:>10.1f}{stats.sql_s * 1000:>10.1f}"
+                f"{stats.wall_s * 1000:>10.1f}"
+            )
+
+        suspects = self.n_plus_one_suspects()
+        if suspects:
+            lines.append("Possible N+1 patterns:")
+            for method, child, count in suspects:
+                lines.append(f"  {method} -> {child} x{count} per call")
+
+        with self._lock:
+            slowest = list(self._slowest)
+        if slowest:
+            lines.append("Slowest statements:")
+            for seconds, method, sql in slowest:
+                lines.append(f"  {seconds * 1000:>8.1f} ms  {method}  {sql[:100]}")
+        return "\n".join(lines)
@@ -0,0 +1,407 @@
+"""
+QR Label Sheets
+
+Renders printable label sheets (PNG or SVG pages) with one QR code per
+item. Each code encodes the item id, which scanner mode resolves through
+item_registry.
+
+Encoded codes are cached on disk as 1-bit PNGs keyed by item id and a hash
+of the payload, so reprinting a sheet only encodes items that are new or
+whose payload changed. Cache misses are encoded in parallel on a process
+pool when there are enough of them to pay for starting it.
+"""
+
+import hashlib
+import os
+import struct
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+import qr
+
+# Bump when the payload format or encoder output changes
+CACHE_FORMAT = 1
+# Below this many cache misses, encoding inline beats starting a pool
+PARALLEL_MIN_CODES = 16
+QUIET_ZONE = 2
+
+FORMAT_EXTENSIONS = {"png": ".png", "svg": ".svg"}
+
+# Category -> (repository listing, subtitle for an item)
+LABEL_SOURCES = {
+    "firearms": (
+        "get_all_firearms",
+        lambda f: " · ".join(p for p in (f.caliber, f.serial_number) if p),
+    ),
+    "nfa_items": (
+        "get_all_nfa_items",
+        lambda n: " · ".join(p for p in (n.nfa_type.value, n.serial_number) if p),
+    ),
+    "attachments": (
+        "get_all_attachments",
+        lambda a: " ".join(p for p in (a.brand, a.model) if p),
+    ),
+    "soft_gear": ("get_all_soft_gear", lambda g: g.category),
+    "consumables": ("get_all_consumables", lambda c: c.category),
+}
+
+
+@dataclass
+class LabelItem:
+    item_id: str
+    title: str
+    subtitle: str = ""
+
+    @property
+    def payload(self) -> str:
+        return self.item_id
+
+
+@dataclass
+class SheetLayout:
+    """Page grid; the default approximates 3 x 10 address label stock."""
+
+    page_width_in: float = 8.5
+    page_height_in: float = 11.0
+    columns: int = 3
+    rows: int = 10
+    margin_x_in: float = 0.19
+    margin_y_in: float = 0.5
+    dpi: int = 300
+
+    @property
+    def per_page(self) -> int:
+        return self.columns * self.rows
+
+    def px(self, inches: float) -> int:
+        return round(inches * self.dpi)
+
+    def cells(self, count: int):
+        """Yield (x, y, width, height) in pixels for the first count cells."""
+        cell_w = (self.page_width_in - 2 * self.margin_x_in) / self.columns
+        cell_h = (self.page_height_in - 2 * self.margin_y_in) / self.rows
+        for i in range(count):
+            row, column = divmod(i, self.columns)
+            yield (
+                self.px(self.margin_x_in + column * cell_w),
+                self.px(self.margin_y_in + row * cell_h),
+                self.px(cell_w),
+                self.px(cell_h),
+            )
+
+
+@dataclass
+class LabelSheetResult:
+    pages: list[Path]
+    labels: int
+    encoded: int
+    cached: int
+
+
+def collect_label_items(repo, categories: list[str] | None = None) -> list[LabelItem]:
+    """Label items for the given LABEL_SOURCES categories (default: all)."""
+    items = []
+    for category in categories or list(LABEL_SOURCES):
+        if category not in LABEL_SOURCES:
+            raise ValueError(
+                f"Unknown label category: {category}. "
+                f"Valid categories: {', '.join(LABEL_SOURCES)}"
+            )
+        getter, subtitle = LABEL_SOURCES[category]
+        for entity in getattr(repo, getter)():
+            items.append(LabelItem(entity.id, entity.name, subtitle(entity) or ""))
+    return items
+
+
+def default_cache_dir() -> Path:
+    from vault import VAULT_DIR
+
+    return VAULT_DIR / "label_cache"
+
+
+# -------- CODE CACHE --------
+
+
+def _cache_path(cache_dir: Path, item: LabelItem) -> Path:
+    digest = hashlib.sha256(f"{CACHE_FORMAT}:{item.payload}".encode()).hexdigest()
+    return cache_dir / f"{item.item_id}-{digest[:16]}.png"
+
+
+def _write_png(path: Path, modules: list[bytearray]) -> None:
+    """1-bit grayscale PNG, one pixel per module (dark modules are black)."""
+    size = len(modules)
+    raw = bytearray()
+    for row in modules:
+        raw.append(0)  # filter: none
+        packed = 0
+        for x in range(size):
+            packed = packed << 1 | (0 if row[x] else 1)
+        pad = -size % 8
+        raw += (packed << pad).to_bytes((size + pad) // 8, "big")
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (
+            struct.pack(">I", len(data))
+            + kind
+            + data
+            + struct.pack(">I", zlib.crc32(kind + data))
+        )
+
+    png = (
+        b"\x89PNG\r\n\x1a\n"
+        + chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 1, 0, 0, 0, 0))
+        + chunk(b"IDAT", zlib.compress(bytes(raw), 9))
+        + chunk(b"IEND", b"")
+    )
+    # Write-then-rename so concurrent workers never leave a partial file
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_bytes(png)
+    os.replace(tmp, path)
+
+
+def _read_png(path: Path) -> list[bytearray] | None:
+    """Read a PNG written by _write_png; None if missing or not in that form."""
+    try:
+        data = path.read_bytes()
+    except OSError:
+        return None
+    if not data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return None
+
+    pos, idat, size = 8, b"", None
+    while pos + 8 <= len(data):
+        length, kind = struct.unpack(">I4s", data[pos : pos + 8])
+        body = data[pos + 8 : pos + 8 + length]
+        if kind == b"IHDR":
+            width, height, depth, color = struct.unpack(">IIBB", body[:10])
+            if width != height or depth != 1 or color != 0:
+                return None
+            size = width
+        elif kind == b"IDAT":
+            idat += body
+        pos += 12 + length
+    if size is None:
+        return None
+
+    try:
+        raw = zlib.decompress(idat)
+    except zlib.error:
+        return None
+    stride = (size + 7) // 8 + 1
+    if len(raw) != stride * size:
+        return None
+    modules = []
+    for y in range(size):
+        line = raw[y * stride : (y + 1) * stride]
+        if line[0] != 0:
+            return None
+        packed = int.from_bytes(line[1:], "big") >> (-size % 8)
+        modules.append(
+            bytearray(0 if (packed >> (size - 1 - x)) & 1 else 1 for x in range(size))
+        )
+    return modules
+
+
+def _encode_to_cache(job: tuple[str, str]) -> list[bytearray]:
+    # Process pool worker: top-level so it pickles
+    payload, path = job
+    modules = qr.encode(payload)
+    _write_png(Path(path), modules)
+    return modules
+
+
+def encode_items(
+    items: list[LabelItem],
+    cache_dir: Path,
+    workers: int | None = None,
+) -> tuple[dict[str, list[bytearray]], int]:
+    """
+    QR modules per item id, from the cache where possible.
+    Returns (modules by item id, number of codes newly encoded).
+    """
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    codes: dict[str, list[bytearray]] = {}
+    misses: dict[str, tuple[LabelItem, Path]] = {}
+    for item in items:
+        if item.item_id in codes or item.item_id in misses:
+            continue
+        path = _cache_path(cache_dir, item)
+        modules = _read_png(path)
+        if modules is None:
+            misses[item.item_id] = (item, path)
+        else:
+            codes[item.item_id] = modules
+
+    jobs = [(item.payload, str(path)) for item, path in misses.values()]
+    if len(jobs) >= PARALLEL_MIN_CODES and (os.cpu_count() or 1) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            encoded = list(pool.map(_encode_to_cache, jobs, chunksize=8))
+    else:
+        encoded = [_encode_to_cache(job) for job in jobs]
+
+    for (item, path), modules in zip(misses.values(), encoded):
+        codes[item.item_id] = modules
+        # Drop entries for this item's earlier payloads
+        for stale in cache_dir.glob(f"{item.item_id}-*.png"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+    return codes, len(misses)
+
+
+# -------- SHEETS --------
+
+
+def write_label_sheets(
+    items: list[LabelItem],
+    output_dir: Path,
+    fmt: str = "png",
+    layout: SheetLayout | None = None,
+    cache_dir: Path | None = None,
+    workers: int | None = None,
+) -> LabelSheetResult:
+    """Write labels_NN<ext> pages into output_dir (PNG or SVG)."""
+    if fmt not in FORMAT_EXTENSIONS:
+        raise ValueError(
+            f"Unknown label format: {fmt}. Valid formats: {', '.join(FORMAT_EXTENSIONS)}"
+        )
+    if not items:
+        raise ValueError("No items to label")
+    layout = layout or SheetLayout()
+    codes, encoded = encode_items(items, cache_dir or default_cache_dir(), workers)
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    render = _render_svg_page if fmt == "svg" else _render_png_page
+    pages = []
+    for start in range(0, len(items), layout.per_page):
+        page_items = items[start : start + layout.per_page]
+        path = output_dir / f"labels_{len(pages) + 1:02d}{FORMAT_EXTENSIONS[fmt]}"
+        render(path, page_items, codes, layout)
+        pages.append(path)
+
+    return LabelSheetResult(
+        pages=pages,
+        labels=len(items),
+        encoded=encoded,
+        cached=len(codes) - encoded,
+    )
+
+
+def _label_geometry(cell: tuple[int, int, int, int], size: int):
+    """(module px, QR x, QR y, text x) for a code of size modules in a cell."""
+    x, y, width, height = cell
+    pad = height // 12
+    module = max((height - 2 * pad) // (size + 2 * QUIET_ZONE), 1)
+    qr_px = module * (size + 2 * QUIET_ZONE)
+    qr_y = y + (height - qr_px) // 2
+    return module, x + pad, qr_y, x + pad + qr_px + pad
+
+
+def _dark_runs(row: bytearray):
+    """Yield (start, length) of each horizontal run of dark modules."""
+    x, size = 0, len(row)
+    while x < size:
+        if row[x]:
+            start = x
+            while x < size and row[x]:
+                x += 1
+            yield start, x - start
+        else:
+            x += 1
+
+
+def _render_svg_page(path, items, codes, layout: SheetLayout) -> None:
+    width, height = layout.px(layout.page_width_in), layout.px(layout.page_height_in)
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" '
+        f'width="{layout.page_width_in}in" height="{layout.page_height_in}in" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<rect width="{width}" height="{height}" fill="#fff"/>',
+    ]
+    for item, cell in zip(items, layout.cells(len(items))):
+        modules = codes[item.item_id]
+        module, qr_x, qr_y, text_x = _label_geometry(cell, len(modules))
+        origin_x = qr_x + QUIET_ZONE * module
+        origin_y = qr_y + QUIET_ZONE * module
+        path_data = "".join(
+            f"M{origin_x + start * module},{origin_y + y * module}"
+            f"h{run * module}v{module}h-{run * module}z"
+            for y, row in enumerate(modules)
+            for start, run in _dark_runs(row)
+        )
+        parts.append(f'<path d="{path_data}" fill="#000"/>')
+
+        font = cell[3] // 6
+        text_y = cell[1] + cell[3] // 2
+        parts.append(
+            f'<text x="{text_x}" y="{text_y - font // 4}" font-family="sans-serif" '
+            f'font-size="{font}" font-weight="bold">{escape(item.title)}</text>'
+        )
+        if item.subtitle:
+            parts.append(
+                f'<text x="{text_x}" y="{text_y + font}" font-family="sans-serif" '
+                f'font-size="{font * 4 // 5}">{escape(item.subtitle)}</text>'
+            )
+    parts.append("</svg>")
+    path.write_text("\n".join(parts) + "\n", encoding="utf-8")
+
+
+def _render_png_page(path, items, codes, layout: SheetLayout) -> None:
+    # Qt is only needed for raster pages; text rendering needs a GUI app
+    from PyQt6.QtCore import QRect, Qt
+    from PyQt6.QtGui import QFont, QGuiApplication, QImage, QPainter
+
+    if QGuiApplication.instance() is None:
+        raise ValueError("PNG label sheets need a running Qt application; use SVG")
+
+    width, height = layout.px(layout.page_width_in), layout.px(layout.page_height_in)
+    image = QImage(width, height, QImage.Format.Format_Grayscale8)
+    image.fill(Qt.GlobalColor.white)
+    dots_per_meter = round(layout.dpi / 0.0254)
+    image.setDotsPerMeterX(dots_per_meter)
+    image.setDotsPerMeterY(dots_per_meter)
+
+    painter = QPainter(image)
+    try:
+        for item, cell in zip(items, layout.cells(len(items))):
+            modules = codes[item.item_id]
+            module, qr_x, qr_y, text_x = _label_geometry(cell, len(modules))
+            origin_x = qr_x + QUIET_ZONE * module
+            origin_y = qr_y + QUIET_ZONE * module
+            for y, row in enumerate(modules):
+                for start, run in _dark_runs(row):
+                    painter.fillRect(
+                        origin_x + start * module,
+                        origin_y + y * module,
+                        run * module,
+                        module,
+                        Qt.GlobalColor.black,
+                    )
+
+            text_width = cell[0] + cell[2] - text_x
+            half = cell[3] // 2
+            title_font = QFont("sans-serif")
+            title_font.setPixelSize(cell[3] // 6)
+            title_font.setBold(True)
+            painter.setFont(title_font)
+            painter.drawText(
+                QRect(text_x, cell[1], text_width, half),
+                Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignBottom,
+                item.title,
+            )
+            if item.subtitle:
+                sub_font = QFont("sans-serif")
+                sub_font.setPixelSize(cell[3] * 2 // 15)
+                painter.setFont(sub_font)
+                painter.drawText(
+                    QRect(text_x, cell[1] + half, text_width, half),
+                    Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignTop,
+                    item.subtitle,
+                )
+    finally:
+        painter.end()
+    if not image.save(str(path), "PNG"):
+        raise ValueError(f"Could not write {path}")
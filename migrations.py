@@ -0,0 +1,756 @@
+"""
+Migrations Module
+
+Numbered schema migrations for GearTracker databases. The number of the
+last applied step is stored in the database header (PRAGMA user_version),
+so an up-to-date database is verified with a single pragma read and no
+schema introspection.
+
+To change the schema, append a new step to MIGRATIONS; never edit or
+reorder steps that have shipped. Each step runs in its own transaction
+together with the user_version bump. Progress notes go to stderr, so they
+never mix with a CLI command's output.
+"""
+
+import sqlite3
+import sys
+
+import audit
+import chronograph
+import rollups
+
+
+def _m001_baseline(cursor: sqlite3.Cursor) -> None:
+    """Original tables, plus the legacy fix-ups for development databases."""
+    # Firearms table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS firearms (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            caliber TEXT NOT NULL,
+            serial_number TEXT UNIQUE,
+            purchase_date INTEGER NOT NULL,
+            notes TEXT,
+            status TEXT DEFAULT 'AVAILABLE'
+        )
+    """)
+
+    # Soft gear table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS soft_gear (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            brand TEXT,
+            purchase_date INTEGER NOT NULL,
+            notes TEXT,
+            status TEXT DEFAULT 'AVAILABLE'
+        )
+    """)
+
+    # Consumables table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS consumables (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            unit TEXT NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 0,
+            min_quantity INTEGER NOT NULL DEFAULT 0,
+            notes TEXT
+        )
+    """)
+
+    # Consumable transactions (for history)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS consumable_transactions (
+            id TEXT PRIMARY KEY,
+            consumable_id TEXT NOT NULL,
+            transaction_type TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            date INTEGER NOT NULL,
+            notes TEXT,
+            FOREIGN KEY(consumable_id) REFERENCES consumables(id)
+        )
+    """)
+
+    # Maintenance logs (polymorphic - works for firearms and soft gear)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS maintenance_logs (
+            id TEXT PRIMARY KEY,
+            item_id TEXT NOT NULL,
+            item_type TEXT NOT NULL,
+            log_type TEXT NOT NULL,
+            date INTEGER NOT NULL,
+            details TEXT,
+            ammo_count INTEGER,
+            photo_path TEXT
+        )
+    """)
+
+    # Borrowers
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS borrowers (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            phone TEXT,
+            email TEXT,
+            notes TEXT
+        )
+    """)
+
+    # Checkouts (polymorphic - works for firearms and soft gear)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS checkouts (
+            id TEXT PRIMARY KEY,
+            item_id TEXT NOT NULL,
+            item_type TEXT NOT NULL,
+            borrower_id TEXT NOT NULL,
+            checkout_date INTEGER NOT NULL,
+            expected_return INTEGER,
+            actual_return INTEGER,
+            notes TEXT,
+            FOREIGN KEY(borrower_id) REFERENCES borrowers(id)
+        )
+    """)
+    # NFA_ITEM table creation
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS nfa_items (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            nfa_type TEXT NOT NULL,
+            manufacturer TEXT,
+            serial_number TEXT,
+            tax_stamp_id TEXT NOT NULL,
+            caliber_bore TEXT,
+            purchase_date INTEGER NOT NULL,
+            form_type TEXT,
+            trust_name TEXT,
+            notes TEXT,
+            status TEXT DEFAULT 'AVAILABLE'
+        )
+    """)
+    # Transfers table creation
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS transfers (
+           id TEXT PRIMARY KEY,
+            firearm_id TEXT NOT NULL,
+            transfer_date INTEGER NOT NULL,
+            buyer_name TEXT NOT NULL,
+            buyer_address TEXT NOT NULL,
+            buyer_dl_number TEXT NOT NULL,
+            buyer_ltc_number TEXT,
+            sale_price REAL,
+            ffl_dealer TEXT,
+            ffl_license TEXT,
+            notes TEXT,
+            FOREIGN KEY(firearm_id) REFERENCES firearms(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attachments (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            category TEXT NOT NULL,
+            brand TEXT,
+            model TEXT,
+            serial_number TEXT,
+            purchase_date INTEGER,
+            mounted_on_firearm_id TEXT,
+            mount_position TEXT,
+            zero_distance_yards INTEGER,
+            zero_notes TEXT,
+            notes TEXT,
+            FOREIGN KEY(mounted_on_firearm_id) REFERENCES firearms(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS reload_batches (
+            id TEXT PRIMARY KEY,
+            cartridge TEXT NOT NULL,
+            firearm_id TEXT,
+            date_created INTEGER NOT NULL,
+
+            bullet_maker TEXT,
+            bullet_model TEXT,
+            bullet_weight_gr INTEGER,
+
+            powder_name TEXT,
+            powder_charge_gr REAL,
+            powder_lot TEXT,
+
+            primer_maker TEXT,
+            primer_type TEXT,
+
+            case_brand TEXT,
+            case_times_fired INTEGER,
+            case_prep_notes TEXT,
+
+            coal_in REAL,
+            crimp_style TEXT,
+
+            test_date INTEGER,
+            avg_velocity INTEGER,
+            es INTEGER,
+            sd INTEGER,
+            group_size_inches REAL,
+            group_distance_yards INTEGER,
+
+            intended_use TEXT,
+            status TEXT,
+            notes TEXT,
+
+            FOREIGN KEY(firearm_id) REFERENCES firearms(id)
+        )
+    """)
+
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS loadouts (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            description TEXT,
+            created_date INTEGER NOT NULL,
+            notes TEXT
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS loadout_items (
+            id TEXT PRIMARY KEY,
+            loadout_id TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            item_type TEXT NOT NULL,
+            notes TEXT,
+            FOREIGN KEY(loadout_id) REFERENCES loadouts(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS loadout_consumables (
+            id TEXT PRIMARY KEY,
+            loadout_id TEXT NOT NULL,
+            consumable_id TEXT NOT NULL,
+            quantity INTEGER NOT NULL,
+            notes TEXT,
+            FOREIGN KEY(loadout_id) REFERENCES loadouts(id),
+            FOREIGN KEY(consumable_id) REFERENCES consumables(id)
+        )
+    """)
+
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS loadout_checkouts (
+            id TEXT PRIMARY KEY,
+            loadout_id TEXT NOT NULL,
+            checkout_id TEXT NOT NULL,
+            return_date INTEGER,
+            rounds_fired INTEGER DEFAULT 0,
+            rain_exposure INTEGER DEFAULT 0,
+            ammo_type TEXT,
+            notes TEXT,
+            FOREIGN KEY(loadout_id) REFERENCES loadouts(id),
+            FOREIGN KEY(checkout_id) REFERENCES checkouts(id)
+        )
+    """)
+
+    # fixing maintenance_logs table
+    cursor.execute("PRAGMA table_info(maintenance_logs)")
+    maint_columns = {row[1] for row in cursor.fetchall()}
+
+    # if table exists but doesn't have item_id, drop and recreate
+    if maint_columns and "item_id" not in maint_columns:
+        cursor.execute("DROP TABLE maintenance_logs")
+        print(
+            "✓ Dropped old maintenance_logs table (incompatible schema)",
+            file=sys.stderr,
+        )
+
+        cursor.execute("""
+        CREATE TABLE maintenance_logs (
+            id TEXT PRIMARY KEY,
+            item_id TEXT NOT NULL,
+            item_type TEXT NOT NULL,
+            log_type TEXT NOT NULL,
+            date INTEGER NOT NULL,
+            details TEXT,
+            ammo_count INTEGER,
+            photo_path TEXT
+            )
+        """)
+        print("✓ Recreated maintenance_logs table with correct schema", file=sys.stderr)
+
+    # migration logic
+    desired_schema = {
+        "firearms": [
+            ("status", "TEXT", "AVAILABLE"),
+            ("is_nfa", "INTEGER", 0),
+            ("nfa_type", "TEXT", None),
+            ("tax_stamp_id", "TEXT", ""),
+            ("form_type", "TEXT", ""),
+            ("barrel_length", "TEXT", ""),
+            ("trust_name", "TEXT", ""),
+            ("transfer_status", "TEXT", "OWNED"),
+            ("rounds_fired", "INTEGER", 0),
+            ("clean_interval_rounds", "INTEGER", 500),
+            ("oil_interval_days", "INTEGER", 90),
+            ("needs_maintenance", "INTEGER", 0),
+            ("maintenance_conditions", "TEXT", ""),
+        ],
+        "soft_gear": [
+            ("status", "TEXT", "AVAILABLE"),
+        ],
+        "maintenance_logs": [
+            ("item_id", "TEXT", None),
+            ("item_type", "TEXT", None),
+            ("log_type", "TEXT", None),
+            ("date", "INTEGER", None),
+            ("details", "TEXT", None),
+            ("ammo_count", "INTEGER", None),
+            ("photo_path", "TEXT", None),
+        ],
+    }
+    # Auto migration loop to add missing columns during development
+    for table_name, columns_to_add in desired_schema.items():
+        # Get list of existing columns for this table
+        cursor.execute(f"PRAGMA table_info({table_name})")
+        existing_columns = {row[1] for row in cursor.fetchall()}
+
+        # Check each desired column
+        for col_name, col_type, default_value in columns_to_add:
+            if col_name not in existing_columns:
+                # Column is missing, add it
+                if default_value is not None:
+                    cursor.execute(
+                        f"ALTER TABLE {table_name} ADD COLUMN {col_name} {col_type} DEFAULT '{default_value}'"
+                    )
+                else:
+                    cursor.execute(
+                        f"ALTER TABLE {table_name} ADD COLUMN {col_name} {col_type}"
+                    )
+                print(
+                    f"✓ Migrated '{table_name}': added '{col_name}' column",
+                    file=sys.stderr,
+                )
+
+
+def _m002_report_indexes(cursor: sqlite3.Cursor) -> None:
+    # Indexes for aggregate/report queries (last cleaning, season recaps)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenance_logs_type_item_date
+        ON maintenance_logs(log_type, item_id, date)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenance_logs_type_date
+        ON maintenance_logs(log_type, date)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_consumable_transactions_date
+        ON consumable_transactions(date)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_checkouts_checkout_date
+        ON checkouts(checkout_date)
+    """)
+
+
+def _m003_usage_rollups(cursor: sqlite3.Cursor) -> None:
+    # Time-bucketed usage rollups, kept current by triggers
+    if rollups.create_rollup_schema(cursor):
+        rollups.rebuild_rollups(cursor)
+        print("✓ Migrated 'usage_rollups': built rollups from history", file=sys.stderr)
+
+
+def _m004_shot_strings(cursor: sqlite3.Cursor) -> None:
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS shot_strings (
+            id TEXT PRIMARY KEY,
+            batch_id TEXT NOT NULL,
+            recorded_date INTEGER NOT NULL,
+            firearm_id TEXT,
+            temperature_f INTEGER,
+            notes TEXT,
+
+            shot_count INTEGER NOT NULL,
+            velocities BLOB NOT NULL,
+
+            mean_fps REAL,
+            es_fps REAL,
+            sd_fps REAL,
+            ke_ftlb REAL,
+            tko REAL,
+            stats_version INTEGER NOT NULL DEFAULT 0,
+
+            FOREIGN KEY(batch_id) REFERENCES reload_batches(id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_shot_strings_batch
+        ON shot_strings(batch_id, recorded_date)
+    """)
+    # Strings stored before stats were versioned
+    chronograph.recompute_stats(cursor)
+
+
+def _m005_history_keyset_indexes(cursor: sqlite3.Cursor) -> None:
+    # (filter, date, id) indexes so keyset history pages,
+    # WHERE (date, id) < (?, ?) ORDER BY date DESC, id DESC LIMIT n,
+    # are index range scans with no sort
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenance_logs_item_date_id
+        ON maintenance_logs(item_id, date, id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_maintenance_logs_date_id
+        ON maintenance_logs(date, id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_consumable_transactions_consumable_date_id
+        ON consumable_transactions(consumable_id, date, id)
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_checkouts_checkout_date_id
+        ON checkouts(checkout_date, id)
+    """)
+
+
+# Item tables covered by item_registry -> column holding a scannable code
+# (besides the id itself), or None
+REGISTRY_TABLES = {
+    "firearms": "serial_number",
+    "nfa_items": "serial_number",
+    "attachments": "serial_number",
+    "soft_gear": None,
+    "consumables": None,
+}
+
+
+def _registry_code_sql(code_column: str | None, row: str) -> str:
+    if code_column is None:
+        return "NULL"
+    return f"NULLIF(TRIM({row}.{code_column}), '')"
+
+
+def _m006_item_registry(cursor: sqlite3.Cursor) -> None:
+    # One row per item across all item tables, so a scanned id or serial
+    # resolves with a single index lookup instead of probing every table
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS item_registry (
+            id TEXT PRIMARY KEY,
+            item_table TEXT NOT NULL,
+            code TEXT COLLATE NOCASE
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_item_registry_code
+        ON item_registry(code)
+    """)
+
+    for table, code_column in REGISTRY_TABLES.items():
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO item_registry (id, item_table, code)
+            SELECT id, '{table}', {_registry_code_sql(code_column, table)}
+            FROM {table}
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_registry_{table}_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                INSERT OR REPLACE INTO item_registry (id, item_table, code)
+                VALUES (NEW.id, '{table}', {_registry_code_sql(code_column, "NEW")});
+            END
+        """)
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_registry_{table}_delete
+            AFTER DELETE ON {table}
+            BEGIN
+                DELETE FROM item_registry WHERE id = OLD.id;
+            END
+        """)
+        watched = "id" if code_column is None else f"id, {code_column}"
+        cursor.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_registry_{table}_update
+            AFTER UPDATE OF {watched} ON {table}
+            BEGIN
+                DELETE FROM item_registry WHERE id = OLD.id;
+                INSERT OR REPLACE INTO item_registry (id, item_table, code)
+                VALUES (NEW.id, '{table}', {_registry_code_sql(code_column, "NEW")});
+            END
+        """)
+
+
+# Item tables with a checkout status column
+STATUS_TABLES = ("firearms", "soft_gear", "nfa_items")
+
+
+def _m007_unified_items(cursor: sqlite3.Cursor) -> None:
+    # item_registry also carries name and status, so mixed item lists are
+    # resolved and re-statused with one set-based statement. Status writes
+    # to the registry are pushed down to the per-type table by trigger;
+    # writes to the per-type tables flow up as before.
+    cursor.execute("ALTER TABLE item_registry ADD COLUMN name TEXT")
+    cursor.execute("ALTER TABLE item_registry ADD COLUMN status TEXT")
+    # Closing a mixed list of items' open checkouts in one UPDATE
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_checkouts_item_return
+        ON checkouts(item_id, actual_return)
+    """)
+
+    for table, code_column in REGISTRY_TABLES.items():
+        status = "status" if table in STATUS_TABLES else None
+        current = f"FROM {table} t WHERE t.id = item_registry.id"
+        cursor.execute(f"""
+            UPDATE item_registry
+            SET name = (SELECT name {current}),
+                status = {f"(SELECT status {current})" if status else "NULL"}
+            WHERE item_table = '{table}'
+        """)
+
+        code = _registry_code_sql(code_column, "NEW")
+        new_status = "NEW.status" if status else "NULL"
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_registry_{table}_insert")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_registry_{table}_insert
+            AFTER INSERT ON {table}
+            BEGIN
+                INSERT OR REPLACE INTO item_registry (id, item_table, code, name, status)
+                VALUES (NEW.id, '{table}', {code}, NEW.name, {new_status});
+            END
+        """)
+
+        # Updated in place (not delete + insert) so a status pushed down
+        # from the registry comes back as a no-op
+        watched = ", ".join(
+            column for column in ("id", code_column, "name", status) if column
+        )
+        cursor.execute(f"DROP TRIGGER IF EXISTS trg_registry_{table}_update")
+        cursor.execute(f"""
+            CREATE TRIGGER trg_registry_{table}_update
+            AFTER UPDATE OF {watched} ON {table}
+            BEGIN
+                UPDATE item_registry
+                SET id = NEW.id, code = {code}, name = NEW.name, status = {new_status}
+                WHERE id = OLD.id;
+            END
+        """)
+
+        if status:
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_registry_status_to_{table}
+                AFTER UPDATE OF status ON item_registry
+                WHEN NEW.item_table = '{table}' AND NEW.status IS NOT OLD.status
+                BEGIN
+                    UPDATE {table} SET status = NEW.status
+                    WHERE id = NEW.id AND status IS NOT NEW.status;
+                END
+            """)
+
+
+def _m008_active_checkouts_view(cursor: sqlite3.Cursor) -> None:
+    # Only open checkouts are ever asked "is this overdue?", so a partial
+    # index keeps the overdue range scan and count as small as the number
+    # of items out, however long the checkout history grows
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_checkouts_open_expected
+        ON checkouts(expected_return) WHERE actual_return IS NULL
+    """)
+    # Open checkouts with their borrower and item name, so the checkouts
+    # tab and overdue queries are one statement. item_registry already
+    # unions the names of every item table.
+    cursor.execute("""
+        CREATE VIEW IF NOT EXISTS active_checkouts AS
+        SELECT c.*, b.name AS borrower_name,
+               b.phone AS borrower_phone, b.email AS borrower_email,
+               COALESCE(r.name, 'Unknown') AS item_name
+        FROM checkouts c
+        JOIN borrowers b ON c.borrower_id = b.id
+        LEFT JOIN item_registry r ON r.id = c.item_id
+        WHERE c.actual_return IS NULL
+    """)
+
+
+def _m009_manifests(cursor: sqlite3.Cursor) -> None:
+    # Trip manifests: a planned list of gear and consumable quantities that
+    # is checked out and returned as a whole. Each gear line keeps the id of
+    # the checkout it opened; consumable lines record how much came back.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS manifests (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            borrower_id TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'PLANNED',
+            loadout_id TEXT,
+            location TEXT,
+            created_date INTEGER NOT NULL,
+            start_date INTEGER,
+            end_date INTEGER,
+            expected_return INTEGER,
+            notes TEXT,
+            FOREIGN KEY(borrower_id) REFERENCES borrowers(id),
+            FOREIGN KEY(loadout_id) REFERENCES loadouts(id)
+        )
+    """)
+    # UNIQUE doubles as the manifest_id index the bulk transitions use
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS manifest_lines (
+            id TEXT PRIMARY KEY,
+            manifest_id TEXT NOT NULL,
+            item_id TEXT NOT NULL,
+            item_type TEXT NOT NULL,
+            quantity INTEGER NOT NULL DEFAULT 1,
+            quantity_returned INTEGER,
+            checkout_id TEXT,
+            notes TEXT,
+            UNIQUE(manifest_id, item_id),
+            FOREIGN KEY(manifest_id) REFERENCES manifests(id),
+            FOREIGN KEY(checkout_id) REFERENCES checkouts(id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_manifests_created_date
+        ON manifests(created_date)
+    """)
+
+
+def _m010_attachment_mounts(cursor: sqlite3.Cursor) -> None:
+    # One row per period an attachment spent on a firearm; the open period
+    # (removed_date IS NULL) mirrors attachments.mounted_on_firearm_id.
+    # Triggers keep it in step with every write to attachments, so edits,
+    # imports and bulk remounts all leave history.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS attachment_mounts (
+            id TEXT PRIMARY KEY,
+            attachment_id TEXT NOT NULL,
+            firearm_id TEXT NOT NULL,
+            mount_position TEXT,
+            mounted_date INTEGER NOT NULL,
+            removed_date INTEGER,
+            FOREIGN KEY(attachment_id) REFERENCES attachments(id)
+        )
+    """)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_attachment_mounts_attachment_date
+        ON attachment_mounts(attachment_id, mounted_date)
+    """)
+
+    # Existing mounts start at purchase (or now, if unknown)
+    cursor.execute("""
+        INSERT INTO attachment_mounts
+        SELECT lower(hex(randomblob(16))), id, mounted_on_firearm_id,
+               mount_position,
+               COALESCE(purchase_date, CAST(strftime('%s', 'now') AS INTEGER)),
+               NULL
+        FROM attachments
+        WHERE mounted_on_firearm_id IS NOT NULL AND mounted_on_firearm_id != ''
+    """)
+
+    open_mount = """
+        INSERT INTO attachment_mounts
+        SELECT lower(hex(randomblob(16))), NEW.id, NEW.mounted_on_firearm_id,
+               NEW.mount_position, CAST(strftime('%s', 'now') AS INTEGER), NULL
+        WHERE NEW.mounted_on_firearm_id IS NOT NULL
+          AND NEW.mounted_on_firearm_id != '';
+    """
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_attachment_mounts_insert
+        AFTER INSERT ON attachments
+        BEGIN
+            {open_mount}
+        END
+    """)
+    cursor.execute(f"""
+        CREATE TRIGGER IF NOT EXISTS trg_attachment_mounts_update
+        AFTER UPDATE OF mounted_on_firearm_id, mount_position ON attachments
+        WHEN NEW.mounted_on_firearm_id IS NOT OLD.mounted_on_firearm_id
+          OR NEW.mount_position IS NOT OLD.mount_position
+        BEGIN
+            UPDATE attachment_mounts
+            SET removed_date = CAST(strftime('%s', 'now') AS INTEGER)
+            WHERE attachment_id = OLD.id AND removed_date IS NULL;
+            {open_mount}
+        END
+    """)
+    cursor.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_attachment_mounts_delete
+        AFTER DELETE ON attachments
+        BEGIN
+            DELETE FROM attachment_mounts WHERE attachment_id = OLD.id;
+        END
+    """)
+
+
+def _m011_audit_log(cursor: sqlite3.Cursor) -> None:
+    # Trigger-written change history; see audit.py. Migrations that add
+    # columns to an audited table must call audit.create_audit_triggers()
+    audit.create_audit_schema(cursor)
+
+
+def _m012_undo_journal(cursor: sqlite3.Cursor) -> None:
+    # Audit triggers now keep BLOB columns (as hex) so deletes can be undone
+    audit.create_audit_triggers(cursor)
+    audit.create_journal_schema(cursor)
+
+
+# (version, description, step). When a chronograph formula changes, bump
+# chronograph.STATS_VERSION and append a step calling recompute_stats().
+MIGRATIONS = [
+    (1, "baseline schema", _m001_baseline),
+    (2, "report indexes", _m002_report_indexes),
+    (3, "usage rollups", _m003_usage_rollups),
+    (4, "chronograph shot strings", _m004_shot_strings),
+    (5, "history keyset indexes", _m005_history_keyset_indexes),
+    (6, "item registry", _m006_item_registry),
+    (7, "unified item names and status", _m007_unified_items),
+    (8, "active checkouts view", _m008_active_checkouts_view),
+    (9, "trip manifests", _m009_manifests),
+    (10, "attachment mount history", _m010_attachment_mounts),
+    (11, "audit log", _m011_audit_log),
+    (12, "undo journal", _m012_undo_journal),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """
+    Bring the database up to SCHEMA_VERSION.
+    Returns the number of steps applied (0 for an up-to-date database).
+    """
+    version = get_schema_version(conn)
+    if version == SCHEMA_VERSION:
+        return 0
+    if version > SCHEMA_VERSION:
+        raise ValueError(
+            f"Database schema version {version} is newer than this version of "
+            f"GearTracker supports ({SCHEMA_VERSION}). Please update GearTracker."
+        )
+
+    applied = 0
+    cursor = conn.cursor()
+    for step_version, description, step in MIGRATIONS:
+        if step_version <= version:
+            continue
+        # Take the write lock first: another process opening the same
+        # database may have applied this step while we waited for it
+        cursor.execute("BEGIN IMMEDIATE")
+        if get_schema_version(conn) >= step_version:
+            conn.rollback()
+            continue
+        try:
+            step(cursor)
+            cursor.execute(f"PRAGMA user_version = {step_version}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(
+            f"✓ Migrated schema to version {step_version} ({description})",
+            file=sys.stderr,
+        )
+        applied += 1
+    return applied
@@ -0,0 +1,336 @@
+"""
+QR Code Encoder
+
+Minimal pure-Python QR encoder for item labels, so printing labels adds no
+dependency to the single-file binary. Supports byte mode at error
+correction level M for versions 1-10 (up to 213 bytes), which covers item
+ids with room to spare. Follows ISO/IEC 18004: Reed-Solomon over GF(256),
+interleaved blocks, and the lowest-penalty of the eight data masks.
+"""
+
+MAX_VERSION = 10
+
+# Level M, indexed by version (index 0 unused)
+_ECC_CODEWORDS_PER_BLOCK = (0, 10, 16, 26, 18, 24, 16, 18, 22, 22, 26)
+_NUM_ECC_BLOCKS = (0, 1, 1, 1, 2, 2, 4, 4, 4, 5, 5)
+# Format information bits for level M
+_ECC_FORMAT_BITS = 0
+
+_MASKS = (
+    lambda x, y: (x + y) % 2 == 0,
+    lambda x, y: y % 2 == 0,
+    lambda x, y: x % 3 == 0,
+    lambda x, y: (x + y) % 3 == 0,
+    lambda x, y: (x // 3 + y // 2) % 2 == 0,
+    lambda x, y: x * y % 2 + x * y % 3 == 0,
+    lambda x, y: (x * y % 2 + x * y % 3) % 2 == 0,
+    lambda x, y: ((x + y) % 2 + x * y % 3) % 2 == 0,
+)
+
+# Dark:light:dark:light:dark 1:1:3:1:1 run (penalty N3 when next to light)
+_FINDER_LIKE = "1011101"
+
+
+def encode(payload: str | bytes, mask: int | None = None) -> list[bytearray]:
+    """
+    Encode payload (UTF-8 for str) as a QR symbol. Returns the module
+    matrix as rows of 0/1 (1 = dark), without the quiet zone. mask forces
+    one of the eight masks; by default the lowest-penalty one is used.
+    """
+    data = payload.encode("utf-8") if isinstance(payload, str) else bytes(payload)
+    for version in range(1, MAX_VERSION + 1):
+        if len(data) <= _data_capacity(version):
+            break
+    else:
+        raise ValueError(
+            f"QR payload too long: {len(data)} bytes "
+            f"(max {_data_capacity(MAX_VERSION)})"
+        )
+
+    symbol = _Symbol(version)
+    symbol.draw_codewords(_add_ecc(_data_codewords(data, version), version))
+    if mask is None:
+        mask = min(range(8), key=symbol.penalty_with_mask)
+    elif not 0 <= mask < 8:
+        raise ValueError(f"Invalid QR mask: {mask}")
+    symbol.apply_mask(mask)
+    symbol.draw_format_bits(mask)
+    return symbol.modules
+
+
+# -------- CODEWORDS --------
+
+
+def _raw_data_modules(version: int) -> int:
+    # Modules left for data + ECC once function patterns are placed
+    result = (16 * version + 128) * version + 64
+    if version >= 2:
+        num_align = version // 7 + 2
+        result -= (25 * num_align - 10) * num_align - 55
+        if version >= 7:
+            result -= 36
+    return result
+
+
+def _num_data_codewords(version: int) -> int:
+    return (
+        _raw_data_modules(version) // 8
+        - _ECC_CODEWORDS_PER_BLOCK[version] * _NUM_ECC_BLOCKS[version]
+    )
+
+
+def _count_bits(version: int) -> int:
+    return 8 if version <= 9 else 16
+
+
+def _data_capacity(version: int) -> int:
+    # Mode indicator (4 bits) + character count precede the data bytes
+    return (_num_data_codewords(version) * 8 - 4 - _count_bits(version)) // 8
+
+
+def _data_codewords(data: bytes, version: int) -> list[int]:
+    bits = [0, 1, 0, 0]  # byte mode
+    bits += _int_bits(len(data), _count_bits(version))
+    for byte in data:
+        bits += _int_bits(byte, 8)
+
+    capacity = _num_data_codewords(version) * 8
+    bits += [0] * min(4, capacity - len(bits))  # terminator
+    bits += [0] * (-len(bits) % 8)
+    codewords = [
+        int("".join(map(str, bits[i : i + 8])), 2) for i in range(0, len(bits), 8)
+    ]
+    pad = (0xEC, 0x11)
+    codewords += [pad[i % 2] for i in range(capacity // 8 - len(codewords))]
+    return codewords
+
+
+def _int_bits(value: int, length: int) -> list[int]:
+    return [(value >> i) & 1 for i in reversed(range(length))]
+
+
+def _add_ecc(data: list[int], version: int) -> list[int]:
+    """Split data into blocks, append each block's ECC, and interleave."""
+    num_blocks = _NUM_ECC_BLOCKS[version]
+    ecc_len = _ECC_CODEWORDS_PER_BLOCK[version]
+    raw_codewords = _raw_data_modules(version) // 8
+    num_short = num_blocks - raw_codewords % num_blocks
+    short_len = raw_codewords // num_blocks
+
+    divisor = _rs_divisor(ecc_len)
+    blocks = []
+    k = 0
+    for i in range(num_blocks):
+        block = data[k : k + short_len - ecc_len + (0 if i < num_short else 1)]
+        k += len(block)
+        ecc = _rs_remainder(block, divisor)
+        if i < num_short:
+            # Placeholder so all blocks line up; skipped when interleaving
+            block = block + [0]
+        blocks.append(block + ecc)
+
+    result = []
+    for i in range(len(blocks[0])):
+        for j, block in enumerate(blocks):
+            if i != short_len - ecc_len or j >= num_short:
+                result.append(block[i])
+    return result
+
+
+def _rs_multiply(x: int, y: int) -> int:
+    # GF(2^8) product modulo x^8 + x^4 + x^3 + x^2 + 1
+    z = 0
+    for i in reversed(range(8)):
+        z = (z << 1) ^ ((z >> 7) * 0x11D)
+        z ^= ((y >> i) & 1) * x
+    return z
+
+
+def _rs_divisor(degree: int) -> list[int]:
+    result = [0] * (degree - 1) + [1]
+    root = 1
+    for _ in range(degree):
+        for j in range(degree):
+            result[j] = _rs_multiply(result[j], root)
+            if j + 1 < degree:
+                result[j] ^= result[j + 1]
+        root = _rs_multiply(root, 0x02)
+    return result
+
+
+def _rs_remainder(data: list[int], divisor: list[int]) -> list[int]:
+    result = [0] * len(divisor)
+    for byte in data:
+        factor = byte ^ result.pop(0)
+        result.append(0)
+        for i, coef in enumerate(divisor):
+            result[i] ^= _rs_multiply(coef, factor)
+    return result
+
+
+# -------- SYMBOL --------
+
+
+class _Symbol:
+    """Module matrix under construction; function modules are never masked."""
+
+    def __init__(self, version: int):
+        self.version = version
+        self.size = version * 4 + 17
+        self.modules = [bytearray(self.size) for _ in range(self.size)]
+        self.is_function = [bytearray(self.size) for _ in range(self.size)]
+        self._draw_function_patterns()
+
+    def _set(self, x: int, y: int, dark: bool) -> None:
+        self.modules[y][x] = dark
+        self.is_function[y][x] = 1
+
+    def _draw_function_patterns(self) -> None:
+        size = self.size
+        for i in range(size):
+            self._set(6, i, i % 2 == 0)
+            self._set(i, 6, i % 2 == 0)
+
+        for cx, cy in ((3, 3), (size - 4, 3), (3, size - 4)):
+            for dy in range(-4, 5):
+                for dx in range(-4, 5):
+                    x, y = cx + dx, cy + dy
+                    if 0 <= x < size and 0 <= y < size:
+                        self._set(x, y, max(abs(dx), abs(dy)) not in (2, 4))
+
+        positions = _alignment_positions(self.version)
+        last = len(positions) - 1
+        for i, cx in enumerate(positions):
+            for j, cy in enumerate(positions):
+                # Skip the three corners occupied by finder patterns
+                if (i, j) in ((0, 0), (0, last), (last, 0)):
+                    continue
+                for dy in range(-2, 3):
+                    for dx in range(-2, 3):
+                        self._set(cx + dx, cy + dy, max(abs(dx), abs(dy)) != 1)
+
+        # Reserve the format areas; real bits are drawn after masking
+        self.draw_format_bits(0)
+        self._draw_version_bits()
+
+    def draw_format_bits(self, mask: int) -> None:
+        size = self.size
+        data = _ECC_FORMAT_BITS << 3 | mask
+        rem = data
+        for _ in range(10):
+            rem = (rem << 1) ^ ((rem >> 9) * 0x537)
+        bits = (data << 10 | rem) ^ 0x5412
+
+        def bit(i: int) -> bool:
+            return (bits >> i) & 1 == 1
+
+        for i in range(6):
+            self._set(8, i, bit(i))
+        self._set(8, 7, bit(6))
+        self._set(8, 8, bit(7))
+        self._set(7, 8, bit(8))
+        for i in range(9, 15):
+            self._set(14 - i, 8, bit(i))
+
+        for i in range(8):
+            self._set(size - 1 - i, 8, bit(i))
+        for i in range(8, 15):
+            self._set(8, size - 15 + i, bit(i))
+        self._set(8, size - 8, True)  # dark module
+
+    def _draw_version_bits(self) -> None:
+        if self.version < 7:
+            return
+        rem = self.version
+        for _ in range(12):
+            rem = (rem << 1) ^ ((rem >> 11) * 0x1F25)
+        bits = self.version << 12 | rem
+        for i in range(18):
+            dark = (bits >> i) & 1 == 1
+            a, b = self.size - 11 + i % 3, i // 3
+            self._set(a, b, dark)
+            self._set(b, a, dark)
+
+    def draw_codewords(self, codewords: list[int]) -> None:
+        """Place codewords in the two-column zigzag, skipping function modules."""
+        size = self.size
+        total_bits = len(codewords) * 8
+        i = 0
+        right = size - 1
+        while right >= 1:
+            if right == 6:
+                right = 5  # skip the vertical timing column
+            upward = ((right + 1) & 2) == 0
+            for vert in range(size):
+                y = size - 1 - vert if upward else vert
+                for x in (right, right - 1):
+                    if not self.is_function[y][x] and i < total_bits:
+                        self.modules[y][x] = (codewords[i >> 3] >> (7 - (i & 7))) & 1
+                        i += 1
+            right -= 2
+
+    def apply_mask(self, mask: int) -> None:
+        predicate = _MASKS[mask]
+        for y in range(self.size):
+            row, function_row = self.modules[y], self.is_function[y]
+            for x in range(self.size):
+                if not function_row[x] and predicate(x, y):
+                    row[x] ^= 1
+
+    def penalty_with_mask(self, mask: int) -> int:
+        self.apply_mask(mask)
+        self.draw_format_bits(mask)
+        score = self._penalty()
+        self.apply_mask(mask)  # XOR again to undo
+        return score
+
+    def _penalty(self) -> int:
+        size = self.size
+        rows = ["".join(map(str, row)) for row in self.modules]
+        columns = ["".join(row[x] for row in rows) for x in range(size)]
+
+        score = 0
+        for line in rows + columns:
+            # N1: runs of 5+ same-colour modules
+            run = 1
+            for a, b in zip(line, line[1:]):
+                if a == b:
+                    run += 1
+                    continue
+                if run >= 5:
+                    score += run - 2
+                run = 1
+            if run >= 5:
+                score += run - 2
+
+            # N3: finder-like runs with 4 light modules before or after
+            # (the border counts as light)
+            padded = "0000" + line + "0000"
+            start = padded.find(_FINDER_LIKE)
+            while start != -1:
+                end = start + len(_FINDER_LIKE)
+                if "1" not in padded[start - 4 : start] or "1" not in padded[end : end + 4]:
+                    score += 40
+                start = padded.find(_FINDER_LIKE, start + 1)
+
+        # N2: 2x2 blocks of one colour
+        modules = self.modules
+        for y in range(size - 1):
+            upper, lower = modules[y], modules[y + 1]
+            for x in range(size - 1):
+                if upper[x] == upper[x + 1] == lower[x] == lower[x + 1]:
+                    score += 3
+
+        # N4: dark/light balance, 10 points per full 5% step away from 50%
+        dark = sum(map(sum, modules))
+        score += abs(dark * 20 - size * size * 10) // (size * size) * 10
+        return score
+
+
+def _alignment_positions(version: int) -> list[int]:
+    if version == 1:
+        return []
+    num_align = version // 7 + 2
+    step = (version * 8 + num_align * 3 + 5) // (num_align * 4 - 4) * 2
+    result = [version * 4 + 10 - i * step for i in range(num_align - 1)] + [6]
+    return list(reversed(result))
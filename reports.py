@@ -0,0 +1,600 @@
+"""
+Summary Reports Module
+
+Generates the "current inventory", "maintenance due" and "season usage recap"
+reports, and printable trip manifests, as Markdown, HTML or CSV.
+
+Every report section is a single set-based SQL query. Rows are pulled from the
+cursor lazily and rendered through generators, so a report is streamed to disk
+without ever holding a full table in memory. This module only depends on the
+repository layer and never imports PyQt6.
+"""
+
+import csv
+import html
+import io
+import sqlite3
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator
+
+REPORT_FORMATS = ("markdown", "html", "csv")
+
+FORMAT_EXTENSIONS = {"markdown": ".md", "html": ".html", "csv": ".csv"}
+
+_OWNED = "(f.transfer_status = 'OWNED' OR f.transfer_status IS NULL)"
+
+_LAST_CLEAN_JOIN = """
+    LEFT JOIN (
+        SELECT item_id, MAX(date) AS last_clean
+        FROM maintenance_logs
+        WHERE log_type = 'CLEANING'
+        GROUP BY item_id
+    ) lc ON lc.item_id = f.id
+"""
+
+
+@dataclass
+class ReportSection:
+    title: str
+    headers: list[str]
+    query: str
+    params: tuple = ()
+    # Optional per-row transform applied after fetching (formatting only)
+    row_formatter: Callable[[tuple], list] | None = None
+
+
+@dataclass
+class Report:
+    title: str
+    subtitle: str = ""
+    sections: list[ReportSection] = field(default_factory=list)
+
+
+# ============== REPORT DEFINITIONS ==============
+
+
+def _fmt_date(ts: int | None, empty: str = "") -> str:
+    return datetime.fromtimestamp(ts).strftime("%Y-%m-%d") if ts else empty
+
+
+def build_inventory_report() -> Report:
+    """Current inventory of all owned gear plus open checkouts."""
+    return Report(
+        title="Current Inventory",
+        subtitle=f"Generated {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        sections=[
+            ReportSection(
+                title="Firearms",
+                headers=[
+                    "Name",
+                    "Caliber",
+                    "Serial",
+                    "Status",
+                    "Rounds",
+                    "Last Cleaned",
+                    "Notes",
+                ],
+                query=f"""
+                    SELECT f.name, f.caliber, f.serial_number, f.status,
+                           f.rounds_fired, lc.last_clean, f.notes
+                    FROM firearms f
+                    {_LAST_CLEAN_JOIN}
+                    WHERE {_OWNED}
+                    ORDER BY f.name
+                """,
+                row_formatter=lambda r: [
+                    r[0],
+                    r[1],
+                    r[2] or "",
+                    r[3] or "AVAILABLE",
+                    r[4] or 0,
+                    _fmt_date(r[5], "Never"),
+                    r[6] or "",
+                ],
+            ),
+            ReportSection(
+                title="NFA Items",
+                headers=[
+                    "Name",
+                    "Type",
+                    "Manufacturer",
+                    "Serial",
+                    "Tax Stamp",
+                    "Status",
+                ],
+                query="""
+                    SELECT name, nfa_type, manufacturer, serial_number,
+                           tax_stamp_id, COALESCE(status, 'AVAILABLE')
+                    FROM nfa_items
+                    ORDER BY name
+                """,
+            ),
+            ReportSection(
+                title="Soft Gear",
+                headers=["Name", "Category", "Brand", "Status", "Notes"],
+                query="""
+                    SELECT name, category, brand, COALESCE(status, 'AVAILABLE'),
+                           notes
+                    FROM soft_gear
+                    ORDER BY category, name
+                """,
+            ),
+            ReportSection(
+                title="Attachments",
+                headers=["Name", "Category", "Brand", "Model", "Mounted On"],
+                query="""
+                    SELECT a.name, a.category, a.brand, a.model, f.name
+                    FROM attachments a
+                    LEFT JOIN firearms f ON f.id = a.mounted_on_firearm_id
+                    ORDER BY a.category, a.name
+                """,
+            ),
+            ReportSection(
+                title="Consumables",
+                headers=["Name", "Category", "Quantity", "Unit", "Min Qty", "Low Stock?"],
+                query="""
+                    SELECT name, category, quantity, unit, min_quantity,
+                           CASE WHEN quantity <= min_quantity THEN 'YES' ELSE '' END
+                    FROM consumables
+                    ORDER BY category, name
+                """,
+            ),
+            ReportSection(
+                title="Active Checkouts",
+                headers=["Item", "Type", "Borrower", "Checkout Date", "Expected Return"],
+                query="""
+                    SELECT COALESCE(f.name, g.name, n.name, 'Unknown'),
+                           c.item_type, b.name, c.checkout_date, c.expected_return
+                    FROM checkouts c
+                    JOIN borrowers b ON b.id = c.borrower_id
+                    LEFT JOIN firearms f
+                        ON c.item_type = 'FIREARM' AND f.id = c.item_id
+                    LEFT JOIN soft_gear g
+                        ON c.item_type = 'SOFT_GEAR' AND g.id = c.item_id
+                    LEFT JOIN nfa_items n
+                        ON c.item_type = 'NFA_ITEM' AND n.id = c.item_id
+                    WHERE c.actual_return IS NULL
+                    ORDER BY c.checkout_date DESC
+                """,
+                row_formatter=lambda r: [
+                    r[0],
+                    r[1],
+                    r[2],
+                    _fmt_date(r[3]),
+                    _fmt_date(r[4], "TBD"),
+                ],
+            ),
+        ],
+    )
+
+
+def _maintenance_reasons(row: tuple, now_ts: int) -> str:
+    (
+        _name,
+        _caliber,
+        rounds,
+        clean_interval,
+        oil_interval,
+        needs_maintenance,
+        conditions,
+        last_clean,
+    ) = row
+    reasons = []
+    if clean_interval and rounds >= clean_interval:
+        reasons.append(f"Rounds fired ({rounds}) exceeds clean interval ({clean_interval})")
+    if oil_interval and last_clean:
+        days = (now_ts - last_clean) // 86400
+        if days >= oil_interval:
+            reasons.append(f"Last cleaned {days} days ago (interval: {oil_interval} days)")
+    if conditions:
+        reasons.extend(c.strip() for c in conditions.split(",") if c.strip())
+    if needs_maintenance and not reasons:
+        reasons.append("Flagged for maintenance")
+    return "; ".join(reasons)
+
+
+def build_maintenance_due_report() -> Report:
+    """Firearms past a maintenance threshold and consumables below minimum."""
+    now_ts = int(datetime.now().timestamp())
+    return Report(
+        title="Maintenance Due",
+        subtitle=f"As of {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+        sections=[
+            ReportSection(
+                title="Firearms Needing Maintenance",
+                headers=[
+                    "Name",
+                    "Caliber",
+                    "Rounds",
+                    "Clean Interval",
+                    "Last Cleaned",
+                    "Reasons",
+                ],
+                query=f"""
+                    SELECT f.name, f.caliber, f.rounds_fired,
+                           f.clean_interval_rounds, f.oil_interval_days,
+                           f.needs_maintenance, f.maintenance_conditions,
+                           lc.last_clean
+                    FROM firearms f
+                    {_LAST_CLEAN_JOIN}
+                    WHERE {_OWNED}
+                      AND (
+                        f.needs_maintenance = 1
+                        OR (f.clean_interval_rounds > 0
+                            AND f.rounds_fired >= f.clean_interval_rounds)
+                        OR (f.oil_interval_days > 0 AND lc.last_clean IS NOT NULL
+                            AND lc.last_clean <= ? - f.oil_interval_days * 86400)
+                        OR COALESCE(f.maintenance_conditions, '') != ''
+                      )
+                    ORDER BY f.name
+                """,
+                params=(now_ts,),
+                row_formatter=lambda r: [
+                    r[0],
+                    r[1],
+                    r[2],
+                    r[3],
+                    _fmt_date(r[7], "Never"),
+                    _maintenance_reasons(r, now_ts),
+                ],
+            ),
+            ReportSection(
+                title="Low Stock Consumables",
+                headers=["Name", "Category", "Quantity", "Min Qty", "Unit"],
+                query="""
+                    SELECT name, category, quantity, min_quantity, unit
+                    FROM consumables
+                    WHERE quantity <= min_quantity
+                    ORDER BY category, name
+                """,
+            ),
+        ],
+    )
+
+
+def build_season_recap_report(
+    year: int | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> Report:
+    """
+    Usage recap for a season. Defaults to the current calendar year;
+    pass start/end to recap an arbitrary window (end is exclusive).
+    """
+    if start is None or end is None:
+        year = year or datetime.now().year
+        start = datetime(year, 1, 1)
+        end = datetime(year + 1, 1, 1)
+    window = (int(start.timestamp()), int(end.timestamp()))
+
+    return Report(
+        title="Season Usage Recap",
+        subtitle=f"{start.strftime('%Y-%m-%d')} to {end.strftime('%Y-%m-%d')}",
+        sections=[
+            ReportSection(
+                title="Rounds Fired by Firearm",
+                headers=["Firearm", "Caliber", "Sessions", "Rounds", "First", "Last"],
+                query="""
+                    SELECT f.name, f.caliber, COUNT(*), SUM(COALESCE(m.ammo_count, 0)),
+                           MIN(m.date), MAX(m.date)
+                    FROM maintenance_logs m
+                    JOIN firearms f ON f.id = m.item_id
+                    WHERE m.log_type = 'FIRED_ROUNDS'
+                      AND m.date >= ? AND m.date < ?
+                    GROUP BY m.item_id
+                    ORDER BY 4 DESC, f.name
+                """,
+                params=window,
+                row_formatter=lambda r: [
+                    r[0],
+                    r[1],
+                    r[2],
+                    r[3],
+                    _fmt_date(r[4]),
+                    _fmt_date(r[5]),
+                ],
+            ),
+            ReportSection(
+                title="Maintenance Activity",
+                headers=["Event Type", "Events", "Items"],
+                query="""
+                    SELECT log_type, COUNT(*), COUNT(DISTINCT item_id)
+                    FROM maintenance_logs
+                    WHERE log_type != 'FIRED_ROUNDS'
+                      AND date >= ? AND date < ?
+                    GROUP BY log_type
+                    ORDER BY 2 DESC
+                """,
+                params=window,
+            ),
+            ReportSection(
+                title="Loadout Trips",
+                headers=["Loadout", "Trips", "Rounds Fired", "Rain Exposures"],
+                query="""
+                    SELECT l.name, COUNT(*), SUM(COALESCE(lc.rounds_fired, 0)),
+                           SUM(COALESCE(lc.rain_exposure, 0))
+                    FROM loadout_checkouts lc
+                    JOIN checkouts c ON c.id = lc.checkout_id
+                    JOIN loadouts l ON l.id = lc.loadout_id
+                    WHERE c.checkout_date >= ? AND c.checkout_date < ?
+                    GROUP BY lc.loadout_id
+                    ORDER BY 2 DESC, l.name
+                """,
+                params=window,
+            ),
+            ReportSection(
+                title="Checkouts by Borrower",
+                headers=["Borrower", "Checkouts", "Still Out"],
+                query="""
+                    SELECT b.name, COUNT(*), SUM(c.actual_return IS NULL)
+                    FROM checkouts c
+                    JOIN borrowers b ON b.id = c.borrower_id
+                    WHERE c.checkout_date >= ? AND c.checkout_date < ?
+                    GROUP BY c.borrower_id
+                    ORDER BY 2 DESC, b.name
+                """,
+                params=window,
+            ),
+            ReportSection(
+                title="Consumable Usage",
+                headers=["Consumable", "Unit", "Used", "Added"],
+                query="""
+                    SELECT c.name, c.unit,
+                           SUM(CASE WHEN t.quantity < 0 THEN -t.quantity ELSE 0 END),
+                           SUM(CASE WHEN t.quantity > 0 THEN t.quantity ELSE 0 END)
+                    FROM consumable_transactions t
+                    JOIN consumables c ON c.id = t.consumable_id
+                    WHERE t.date >= ? AND t.date < ?
+                    GROUP BY t.consumable_id
+                    ORDER BY 3 DESC, c.name
+                """,
+                params=window,
+            ),
+            ReportSection(
+                title="Reload Batches",
+                headers=["Cartridge", "Batches", "Tested"],
+                query="""
+                    SELECT cartridge, COUNT(*), COUNT(test_date)
+                    FROM reload_batches
+                    WHERE date_created >= ? AND date_created < ?
+                    GROUP BY cartridge
+                    ORDER BY 2 DESC, cartridge
+                """,
+                params=window,
+            ),
+        ],
+    )
+
+
+def build_manifest_report(manifest_id: str) -> Report:
+    """Printable trip manifest: what left, what came back, what was used."""
+    return Report(
+        title="Trip Manifest",
+        sections=[
+            ReportSection(
+                title="Trip",
+                headers=[
+                    "Trip",
+                    "Status",
+                    "Borrower",
+                    "Location",
+                    "Planned",
+                    "Started",
+                    "Due Back",
+                    "Completed",
+                ],
+                query="""
+                    SELECT m.name, m.status, b.name, m.location, m.created_date,
+                           m.start_date, m.expected_return, m.end_date
+                    FROM manifests m
+                    LEFT JOIN borrowers b ON b.id = m.borrower_id
+                    WHERE m.id = ?
+                """,
+                params=(manifest_id,),
+                row_formatter=lambda r: [
+                    r[0],
+                    r[1].replace("_", " ").title(),
+                    r[2] or "",
+                    r[3] or "",
+                    _fmt_date(r[4]),
+                    _fmt_date(r[5]),
+                    _fmt_date(r[6]),
+                    _fmt_date(r[7]),
+                ],
+            ),
+            ReportSection(
+                title="Gear",
+                headers=["Item", "Type", "Serial", "Checked Out", "Returned", "Notes"],
+                query="""
+                    SELECT COALESCE(r.name, 'Unknown'), l.item_type, r.code,
+                           c.checkout_date, c.actual_return, l.notes
+                    FROM manifest_lines l
+                    LEFT JOIN item_registry r ON r.id = l.item_id
+                    LEFT JOIN checkouts c ON c.id = l.checkout_id
+                    WHERE l.manifest_id = ? AND l.item_type != 'CONSUMABLE'
+                    ORDER BY l.item_type, 1
+                """,
+                params=(manifest_id,),
+                row_formatter=lambda r: [
+                    r[0],
+                    r[1],
+                    r[2] or "",
+                    _fmt_date(r[3]),
+                    _fmt_date(r[4], "Out" if r[3] else ""),
+                    r[5] or "",
+                ],
+            ),
+            ReportSection(
+                title="Consumables",
+                headers=["Consumable", "Unit", "Packed", "Returned", "Used"],
+                query="""
+                    SELECT COALESCE(c.name, 'Unknown'), c.unit, l.quantity,
+                           l.quantity_returned, l.quantity - l.quantity_returned
+                    FROM manifest_lines l
+                    LEFT JOIN consumables c ON c.id = l.item_id
+                    WHERE l.manifest_id = ? AND l.item_type = 'CONSUMABLE'
+                    ORDER BY 1
+                """,
+                params=(manifest_id,),
+            ),
+        ],
+    )
+
+
+REPORTS: dict[str, tuple[str, Callable[..., Report]]] = {
+    "inventory": ("Current Inventory", build_inventory_report),
+    "maintenance_due": ("Maintenance Due", build_maintenance_due_report),
+    "season_recap": ("Season Usage Recap", build_season_recap_report),
+    "manifest": ("Trip Manifest", build_manifest_report),
+}
+
+
+# ============== STREAMING ==============
+
+
+def _iter_section_rows(
+    conn: sqlite3.Connection, section: ReportSection
+) -> Iterator[list]:
+    cursor = conn.cursor()
+    cursor.execute(section.query, section.params)
+    formatter = section.row_formatter
+    # Iterating the cursor steps the statement one row at a time
+    for row in cursor:
+        yield formatter(row) if formatter else ["" if v is None else v for v in row]
+
+
+def _cell(value) -> str:
+    return "" if value is None else str(value)
+
+
+def _md_cell(value) -> str:
+    return _cell(value).replace("|", "\\|").replace("\n", " ")
+
+
+def _render_markdown(conn, report: Report) -> Iterator[str]:
+    yield f"# {report.title}\n\n"
+    if report.subtitle:
+        yield f"_{report.subtitle}_\n\n"
+    for section in report.sections:
+        yield f"## {section.title}\n\n"
+        empty = True
+        for row in _iter_section_rows(conn, section):
+            if empty:
+                yield "| " + " | ".join(section.headers) + " |\n"
+                yield "|" + " --- |" * len(section.headers) + "\n"
+                empty = False
+            yield "| " + " | ".join(_md_cell(v) for v in row) + " |\n"
+        yield "_No entries._\n\n" if empty else "\n"
+
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 2em; }}
+table {{ border-collapse: collapse; margin-bottom: 2em; }}
+th, td {{ border: 1px solid #999; padding: 4px 8px; text-align: left; }}
+th {{ background: #ddd; }}
+.empty {{ color: #777; font-style: italic; }}
+</style>
+</head>
+<body>
+"""
+
+
+def _render_html(conn, report: Report) -> Iterator[str]:
+    yield _HTML_HEAD.format(title=html.escape(report.title))
+    yield f"<h1>{html.escape(report.title)}</h1>\n"
+    if report.subtitle:
+        yield f"<p><em>{html.escape(report.subtitle)}</em></p>\n"
+    for section in report.sections:
+        yield f"<h2>{html.escape(section.title)}</h2>\n"
+        empty = True
+        for row in _iter_section_rows(conn, section):
+            if empty:
+                yield "<table>\n<tr>"
+                yield "".join(f"<th>{html.escape(h)}</th>" for h in section.headers)
+                yield "</tr>\n"
+                empty = False
+            yield "<tr>"
+            yield "".join(f"<td>{html.escape(_cell(v))}</td>" for v in row)
+            yield "</tr>\n"
+        yield '<p class="empty">No entries.</p>\n' if empty else "</table>\n"
+    yield "</body>\n</html>\n"
+
+
+def _render_csv(conn, report: Report) -> Iterator[str]:
+    # Same === SECTION === layout as the full CSV export
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    writer.writerow([f"=== {report.title.upper()} ==="])
+    if report.subtitle:
+        writer.writerow([f"# {report.subtitle}"])
+    writer.writerow([])
+    yield flush()
+    for section in report.sections:
+        writer.writerow([f"=== {section.title.upper()} ==="])
+        writer.writerow(section.headers)
+        yield flush()
+        for row in _iter_section_rows(conn, section):
+            writer.writerow(row)
+            yield flush()
+        writer.writerow([])
+        yield flush()
+
+
+_RENDERERS = {
+    "markdown": _render_markdown,
+    "html": _render_html,
+    "csv": _render_csv,
+}
+
+
+def iter_report(repo, report_name: str, fmt: str, **params) -> Iterator[str]:
+    """
+    Yield a rendered report chunk by chunk.
+
+    Args:
+        repo: GearRepository instance
+        report_name: key of REPORTS ("inventory", "maintenance_due",
+            "season_recap", "manifest")
+        fmt: one of REPORT_FORMATS
+        **params: passed to the report builder (e.g. year=2025,
+            manifest_id=...)
+    """
+    if report_name not in REPORTS:
+        raise ValueError(f"Unknown report: {report_name}")
+    if fmt not in _RENDERERS:
+        raise ValueError(
+            f"Unknown report format: {fmt}. Valid formats: {', '.join(REPORT_FORMATS)}"
+        )
+
+    report = REPORTS[report_name][1](**params)
+    conn = repo.connect()
+    try:
+        yield from _RENDERERS[fmt](conn, report)
+    finally:
+        conn.close()
+
+
+def write_report(
+    repo, report_name: str, fmt: str, output_path: Path, **params
+) -> Path:
+    """Stream a report to output_path and return the path written."""
+    output_path = Path(output_path)
+    newline = "" if fmt == "csv" else None
+    with open(output_path, "w", newline=newline, encoding="utf-8") as f:
+        for chunk in iter_report(repo, report_name, fmt, **params):
+            f.write(chunk)
+    return output_path
@@ -0,0 +1,258 @@
+"""
+Usage Rollups Module
+
+Pre-aggregated daily/weekly/monthly buckets for round counts, maintenance
+load, consumable usage and loadout trips, so charts never have to scan the
+raw history tables.
+
+Rollups are maintained incrementally by SQLite triggers on the source tables
+(so CSV imports and every repository write path are covered) and can be
+rebuilt from scratch with rebuild_rollups().
+"""
+
+import sqlite3
+from datetime import datetime, timedelta
+
+GRANULARITIES = ("DAY", "WEEK", "MONTH")
+
+# Subject id used for the all-subjects total of a subject type
+ALL_SUBJECTS = "*"
+
+# Metrics
+ROUNDS_FIRED = "ROUNDS_FIRED"
+MAINTENANCE_EVENTS = "MAINTENANCE_EVENTS"
+CONSUMABLE_USED = "USED"
+CONSUMABLE_ADDED = "ADDED"
+LOADOUT_TRIPS = "TRIPS"
+
+ROLLUPS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS usage_rollups (
+        granularity TEXT NOT NULL,
+        bucket_start TEXT NOT NULL,
+        subject_type TEXT NOT NULL,
+        subject_id TEXT NOT NULL,
+        metric TEXT NOT NULL,
+        value INTEGER NOT NULL DEFAULT 0,
+        event_count INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (granularity, subject_type, metric, subject_id, bucket_start)
+    ) WITHOUT ROWID
+"""
+
+
+def _bucket_expr(ts_expr: str, granularity_expr: str = "g.granularity") -> str:
+    """SQL expression mapping an epoch column to its local bucket start date."""
+    return f"""
+        CASE {granularity_expr}
+            WHEN 'DAY' THEN date({ts_expr}, 'unixepoch', 'localtime')
+            WHEN 'WEEK' THEN date({ts_expr}, 'unixepoch', 'localtime', 'weekday 0', '-6 days')
+            ELSE date({ts_expr}, 'unixepoch', 'localtime', 'start of month')
+        END
+    """
+
+
+def bucket_start(moment: datetime, granularity: str) -> str:
+    """Start date of the bucket containing a local datetime (as _bucket_expr)."""
+    day = moment.date()
+    if granularity == "WEEK":
+        # Monday, like 'weekday 0', '-6 days'
+        day -= timedelta(days=day.weekday())
+    elif granularity == "MONTH":
+        day = day.replace(day=1)
+    return day.isoformat()
+
+
+_GRANULARITY_ROWS = " UNION ALL ".join(
+    f"SELECT '{g}' AS granularity" for g in GRANULARITIES
+)
+
+# Each source describes how one row of a history table feeds the rollups.
+# Expressions use the placeholder {row} for NEW/OLD inside triggers or the
+# table alias when rebuilding.
+_SOURCES = {
+    "maintenance_logs": {
+        "ts": "{row}.date",
+        "subject_type": "CASE WHEN {row}.log_type = 'FIRED_ROUNDS' THEN 'FIREARM' ELSE {row}.item_type END",
+        "subject_id": "{row}.item_id",
+        "metric": f"CASE WHEN {{row}}.log_type = 'FIRED_ROUNDS' THEN '{ROUNDS_FIRED}' ELSE '{MAINTENANCE_EVENTS}' END",
+        "value": "CASE WHEN {row}.log_type = 'FIRED_ROUNDS' THEN COALESCE({row}.ammo_count, 0) ELSE 1 END",
+        "columns": "date, item_id, item_type, log_type, ammo_count",
+    },
+    "consumable_transactions": {
+        "ts": "{row}.date",
+        "subject_type": "'CONSUMABLE'",
+        "subject_id": "{row}.consumable_id",
+        "metric": f"CASE WHEN {{row}}.quantity < 0 THEN '{CONSUMABLE_USED}' ELSE '{CONSUMABLE_ADDED}' END",
+        "value": "ABS({row}.quantity)",
+        "columns": "date, consumable_id, quantity",
+    },
+    "loadout_checkouts": {
+        "ts": "(SELECT checkout_date FROM checkouts WHERE id = {row}.checkout_id)",
+        "subject_type": "'LOADOUT'",
+        "subject_id": "{row}.loadout_id",
+        "metric": f"'{LOADOUT_TRIPS}'",
+        "value": "1",
+        "columns": "loadout_id, checkout_id",
+    },
+}
+
+
+def _bucket_rows_sql(source: dict, row: str, extra: str = "") -> str:
+    """SELECT of every (bucket, subject) key one source row contributes to."""
+    src = {k: v.replace("{row}", row) for k, v in source.items()}
+    return f"""
+        SELECT g.granularity, {src["subject_type"]}, {src["metric"]},
+               s.subject_id, {_bucket_expr(src["ts"])}{extra}
+        FROM ({_GRANULARITY_ROWS}) g,
+             (SELECT {src["subject_id"]} AS subject_id
+              UNION ALL SELECT '{ALL_SUBJECTS}') s
+        WHERE {src["ts"]} IS NOT NULL
+    """
+
+
+def _apply_sql(source: dict, row: str, sign: int) -> str:
+    """INSERT..SELECT upserting one source row into every bucket (sign=+1/-1)."""
+    value = source["value"].replace("{row}", row)
+    return f"""
+        INSERT INTO usage_rollups (
+            granularity, subject_type, metric, subject_id, bucket_start,
+            value, event_count
+        )
+        {_bucket_rows_sql(source, row, f", {sign} * ({value}), {sign}")}
+        ON CONFLICT (granularity, subject_type, metric, subject_id, bucket_start)
+        DO UPDATE SET value = value + excluded.value,
+                      event_count = event_count + excluded.event_count;
+    """
+
+
+def _prune_sql(source: dict, row: str) -> str:
+    """Drop buckets emptied by removing one source row (primary key lookups)."""
+    return f"""
+        DELETE FROM usage_rollups
+        WHERE event_count <= 0
+          AND (granularity, subject_type, metric, subject_id, bucket_start)
+              IN ({_bucket_rows_sql(source, row)});
+    """
+
+
+def _trigger_sql(table: str, source: dict) -> list[str]:
+    return [
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_{table}_insert
+        AFTER INSERT ON {table}
+        BEGIN
+            {_apply_sql(source, "NEW", 1)}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_{table}_delete
+        AFTER DELETE ON {table}
+        BEGIN
+            {_apply_sql(source, "OLD", -1)}
+            {_prune_sql(source, "OLD")}
+        END
+        """,
+        f"""
+        CREATE TRIGGER IF NOT EXISTS trg_rollup_{table}_update
+        AFTER UPDATE OF {source["columns"]} ON {table}
+        BEGIN
+            {_apply_sql(source, "OLD", -1)}
+            {_apply_sql(source, "NEW", 1)}
+            {_prune_sql(source, "OLD")}
+        END
+        """,
+    ]
+
+
+def create_rollup_schema(cursor: sqlite3.Cursor) -> bool:
+    """
+    Create the rollup table and its triggers.
+    Returns True if the table was newly created (caller should rebuild).
+    """
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'usage_rollups'"
+    )
+    created = cursor.fetchone() is None
+
+    cursor.execute(ROLLUPS_TABLE_SQL)
+    for table, source in _SOURCES.items():
+        for sql in _trigger_sql(table, source):
+            cursor.execute(sql)
+    return created
+
+
+def rebuild_rollups(cursor: sqlite3.Cursor) -> None:
+    """Recompute every bucket from the source tables (caller commits)."""
+    cursor.execute("DELETE FROM usage_rollups")
+    for table, source in _SOURCES.items():
+        src = {k: v.replace("{row}", "t") for k, v in source.items()}
+        bucket = _bucket_expr(src["ts"])
+        cursor.execute(f"""
+            INSERT INTO usage_rollups (
+                granularity, bucket_start, subject_type, subject_id, metric,
+                value, event_count
+            )
+            SELECT granularity, bucket_start, subject_type, subject_id, metric,
+                   SUM(value), COUNT(*)
+            FROM (
+                SELECT g.granularity AS granularity,
+                       {bucket} AS bucket_start,
+                       {src["subject_type"]} AS subject_type,
+                       CASE WHEN tot.total THEN '{ALL_SUBJECTS}'
+                            ELSE {src["subject_id"]} END AS subject_id,
+                       {src["metric"]} AS metric,
+                       {src["value"]} AS value
+                FROM {table} t,
+                     ({_GRANULARITY_ROWS}) g,
+                     (SELECT 0 AS total UNION ALL SELECT 1) tot
+                WHERE {src["ts"]} IS NOT NULL
+            )
+            GROUP BY granularity, bucket_start, subject_type, subject_id, metric
+        """)
+
+
+def pick_granularity(start: datetime, end: datetime, max_points: int = 400) -> str:
+    """Finest granularity that keeps a chart of [start, end) under max_points."""
+    days = max((end - start).days, 1)
+    if days <= max_points:
+        return "DAY"
+    if days // 7 <= max_points:
+        return "WEEK"
+    return "MONTH"
+
+
+def get_usage_series(
+    cursor: sqlite3.Cursor,
+    subject_type: str,
+    metric: str,
+    subject_id: str = ALL_SUBJECTS,
+    granularity: str = "MONTH",
+    start: datetime | None = None,
+    end: datetime | None = None,
+) -> list[tuple[str, int, int]]:
+    """
+    Returns [(bucket_start, value, event_count), ...] in bucket order, for
+    every bucket overlapping [start, end) (so the first may begin before
+    start). Reads only pre-aggregated rows via the rollup primary key.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(
+            f"Invalid granularity: {granularity}. Valid values: {', '.join(GRANULARITIES)}"
+        )
+
+    query = """
+        SELECT bucket_start, value, event_count
+        FROM usage_rollups
+        WHERE granularity = ? AND subject_type = ? AND metric = ?
+          AND subject_id = ?
+    """
+    params: list = [granularity, subject_type, metric, subject_id]
+    if start:
+        query += " AND bucket_start >= ?"
+        params.append(bucket_start(start, granularity))
+    if end:
+        query += " AND bucket_start < ?"
+        params.append(end.strftime("%Y-%m-%d"))
+    query += " ORDER BY bucket_start"
+
+    cursor.execute(query, params)
+    return cursor.fetchall()
@@ -0,0 +1,92 @@
+"""
+Type-Ahead Search Index
+
+In-memory index over the text of table rows for filter-as-you-type.
+Terms of three or more characters are looked up by trigram (substring
+match); shorter terms match the start of a word through a prefix map.
+A query's whitespace-separated terms must all match (AND). Lookups touch
+only the posting sets for the query, never every row.
+"""
+
+import string
+
+TRIGRAM = 3
+
+# Stripped so ".308" and "(SBR)" are also found by "30" and "sb"
+_PUNCTUATION = string.punctuation
+
+
+def _post(postings: dict[str, set[int]], keys: set[str], row: int) -> None:
+    for key in keys:
+        rows = postings.get(key)
+        if rows is None:
+            postings[key] = {row}
+        else:
+            rows.add(row)
+
+
+class SearchIndex:
+    """Maps query terms to the row numbers whose text contains them."""
+
+    def __init__(self, rows: list[str] | None = None):
+        self._texts: list[str] = []
+        self._trigrams: dict[str, set[int]] = {}
+        self._prefixes: dict[str, set[int]] = {}
+        if rows:
+            for text in rows:
+                self.add(text)
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def add(self, text: str) -> int:
+        """Index one row's text; returns its row number."""
+        row = len(self._texts)
+        text = text.casefold()
+        self._texts.append(text)
+
+        grams = {text[i : i + TRIGRAM] for i in range(len(text) - TRIGRAM + 1)}
+        prefixes = set()
+        for word in text.split():
+            bare = word.strip(_PUNCTUATION)
+            prefixes.update((word[:1], word[:2], bare[:1], bare[:2]))
+        prefixes.discard("")
+        _post(self._trigrams, grams, row)
+        _post(self._prefixes, prefixes, row)
+        return row
+
+    def search(self, query: str) -> set[int] | None:
+        """
+        Row numbers matching every term in query, or None for an empty
+        query (no filter).
+        """
+        terms = query.casefold().split()
+        if not terms:
+            return None
+
+        matches = None
+        # Short terms first: their posting sets are cheap to intersect
+        for term in sorted(terms, key=len):
+            rows = self._term_rows(term)
+            matches = rows if matches is None else matches & rows
+            if not matches:
+                return set()
+        return matches
+
+    def _term_rows(self, term: str) -> set[int]:
+        if len(term) < TRIGRAM:
+            return set(self._prefixes.get(term, ()))
+
+        postings = []
+        for i in range(len(term) - TRIGRAM + 1):
+            rows = self._trigrams.get(term[i : i + TRIGRAM])
+            if rows is None:
+                return set()
+            postings.append(rows)
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+        if len(term) == TRIGRAM:
+            return candidates
+        # Trigrams can all be present without forming the term in order
+        texts = self._texts
+        return {row for row in candidates if term in texts[row]}
@@ -0,0 +1,501 @@
+"""
+Scanner Station Server
+
+Local JSON-over-HTTP API over GearRepository, so barcode scanner stations
+on this machine or the LAN can log checkouts, returns, rounds and
+maintenance against one tracker.db. It runs as its own process:
+
+    python server.py --host 0.0.0.0 --port 8765
+
+    GET  /health                      GET  /stats
+    GET  /items/<id or serial>        GET  /firearms
+    GET  /borrowers                   GET  /checkouts[?overdue=1]
+    POST /checkouts   {"items": [...], "borrower": "...", "expected_return": "YYYY-MM-DD"}
+    POST /returns     {"items": [...]} or {"checkout_ids": [...]}
+    POST /rounds      {"item": "...", "rounds": 50}
+    POST /maintenance {"item": "...", "type": "CLEANING", "details": "..."}
+
+Requests are parsed on one asyncio event loop. Reads run on a bounded pool
+of worker threads, each on its own pooled SQLite connection (WAL lets them
+read while a write commits). Writes go through a queue to a single writer
+thread, which takes everything queued so far as one batch: one transaction,
+one savepoint per request. Under load that is one commit (and fsync) per
+batch instead of per request, and writers never contend for the lock.
+Errors are returned as {"error": message} with a 4xx/5xx status.
+
+Only the repository layer is imported, never PyQt6.
+"""
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import sys
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from cli import find_borrower, open_repository, resolve_items
+from gear_tracker import (
+    ITEM_TABLE_CATEGORIES,
+    GearRepository,
+    MaintenanceLog,
+    MaintenanceType,
+)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 4
+
+# Most writes committed in one transaction
+MAX_BATCH = 64
+# Queued writes beyond this are turned away with 503 until the writer
+# catches up
+MAX_QUEUED_WRITES = 1024
+
+MAX_HEADER_BYTES = 16 * 1024
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HttpError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+_KIND_NAMES = {str: "a string", int: "an integer"}
+
+
+def _field(data: dict, name: str, kind: type = str):
+    value = data.get(name)
+    if not isinstance(value, kind) or isinstance(value, bool) and kind is int:
+        raise ValueError(f"Field '{name}' must be {_KIND_NAMES[kind]}")
+    return value
+
+
+def _optional(data: dict, name: str, kind: type = str, default=None):
+    """_field() for a field that may be missing or null."""
+    if data.get(name) is None:
+        return default
+    return _field(data, name, kind)
+
+
+def _codes(data: dict, name: str) -> list[str]:
+    codes = data.get(name)
+    if not isinstance(codes, list) or not all(isinstance(c, str) for c in codes):
+        raise ValueError(f"Field '{name}' must be a list of strings")
+    return codes
+
+
+def _date(value) -> datetime | None:
+    if value is None:
+        return None
+    if not isinstance(value, str):
+        raise ValueError("Dates must be YYYY-MM-DD or ISO 8601 strings")
+    return datetime.fromisoformat(value)
+
+
+def _iso(value: datetime | None) -> str | None:
+    return value.isoformat(timespec="seconds") if value else None
+
+
+def _checkout_json(checkout, borrower, item_name: str) -> dict:
+    return {
+        "id": checkout.id,
+        "item_id": checkout.item_id,
+        "item_type": checkout.item_type.value,
+        "item_name": item_name,
+        "borrower": {"id": borrower.id, "name": borrower.name},
+        "checkout_date": _iso(checkout.checkout_date),
+        "expected_return": _iso(checkout.expected_return),
+    }
+
+
+class GearServer:
+    """HTTP front end; handlers run on the read pool or in the writer."""
+
+    def __init__(
+        self,
+        repo: GearRepository,
+        workers: int = DEFAULT_WORKERS,
+        max_batch: int = MAX_BATCH,
+    ):
+        self.repo = repo
+        self.max_batch = max_batch
+        self._readers = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="reader"
+        )
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="writer")
+        self._writes: asyncio.Queue | None = None
+        # (method, first path segment) -> (handler, is_write)
+        self._routes = {
+            ("GET", "health"): (self.get_health, False),
+            ("GET", "stats"): (self.get_stats, False),
+            ("GET", "items"): (self.get_item, False),
+            ("GET", "firearms"): (self.get_firearms, False),
+            ("GET", "borrowers"): (self.get_borrowers, False),
+            ("GET", "checkouts"): (self.get_checkouts, False),
+            ("POST", "checkouts"): (self.post_checkouts, True),
+            ("POST", "returns"): (self.post_returns, True),
+            ("POST", "rounds"): (self.post_rounds, True),
+            ("POST", "maintenance"): (self.post_maintenance, True),
+        }
+        self.requests = 0
+        self.writes = 0
+        self.write_batches = 0
+        self.largest_batch = 0
+
+    # -------- READ HANDLERS --------
+
+    def get_health(self, query: dict, data: dict, arg: str | None) -> dict:
+        return {"status": "ok"}
+
+    def get_stats(self, query: dict, data: dict, arg: str | None) -> dict:
+        locks = self.repo.lock_stats
+        return {
+            "requests": self.requests,
+            "writes": self.writes,
+            "write_batches": self.write_batches,
+            "mean_batch": round(self.writes / self.write_batches, 2)
+            if self.write_batches
+            else 0.0,
+            "largest_batch": self.largest_batch,
+            "lock_wait_s": round(locks.wait_s, 3),
+            "lock_retries": locks.retries,
+        }
+
+    def get_item(self, query: dict, data: dict, arg: str | None) -> dict:
+        resolved = self.repo.resolve_code(arg or "")
+        if resolved is None:
+            raise HttpError(HTTPStatus.NOT_FOUND, f"Unknown item: {arg}")
+        item_table, item_id = resolved
+        checkout = next(
+            (
+                _checkout_json(*row)
+                for row in self.repo.get_active_checkouts()
+                if row[0].item_id == item_id
+            ),
+            None,
+        )
+        return {"id": item_id, "item_table": item_table, "checkout": checkout}
+
+    def get_firearms(self, query: dict, data: dict, arg: str | None) -> list:
+        return [
+            {
+                "id": f.id,
+                "name": f.name,
+                "serial_number": f.serial_number,
+                "status": f.status.value,
+                "rounds_fired": f.rounds_fired,
+                "needs_maintenance": f.needs_maintenance,
+            }
+            for f in self.repo.get_all_firearms()
+        ]
+
+    def get_borrowers(self, query: dict, data: dict, arg: str | None) -> list:
+        return [{"id": b.id, "name": b.name} for b in self.repo.get_all_borrowers()]
+
+    def get_checkouts(self, query: dict, data: dict, arg: str | None) -> list:
+        if query.get("overdue") in ("1", "true"):
+            rows = self.repo.get_overdue_checkouts()
+        else:
+            rows = self.repo.get_active_checkouts()
+        return [_checkout_json(*row) for row in rows]
+
+    # -------- WRITE HANDLERS --------
+    # Run in the writer thread, inside the batch's transaction
+
+    def post_checkouts(self, query: dict, data: dict, arg: str | None) -> dict:
+        borrower = find_borrower(self.repo, _field(data, "borrower"))
+        item_ids = list(resolve_items(self.repo, _codes(data, "items")))
+        checkout_ids = self.repo.checkout_items(
+            item_ids,
+            borrower.id,
+            _date(data.get("expected_return")),
+            _optional(data, "notes", default=""),
+        )
+        return {"checkout_ids": checkout_ids}
+
+    def post_returns(self, query: dict, data: dict, arg: str | None) -> dict:
+        # Rejected like cli.py's return when anything given is not out
+        active = [checkout for checkout, _, _ in self.repo.get_active_checkouts()]
+        if "checkout_ids" in data:
+            checkout_ids = _codes(data, "checkout_ids")
+            out = {c.id for c in active}
+            not_out = [c for c in checkout_ids if c not in out]
+        else:
+            items = resolve_items(self.repo, _codes(data, "items"))
+            out = {c.item_id for c in active}
+            not_out = [code for item_id, code in items.items() if item_id not in out]
+            checkout_ids = [c.id for c in active if c.item_id in items]
+        if not_out:
+            raise ValueError(f"Not checked out: {', '.join(not_out)}")
+        return {"returned": self.repo.return_items(checkout_ids)}
+
+    def post_rounds(self, query: dict, data: dict, arg: str | None) -> dict:
+        code = _field(data, "item")
+        resolved = self.repo.resolve_code(code)
+        if resolved is None or resolved[0] != "firearms":
+            raise ValueError(f"Not a firearm: {code}")
+        item_id = resolved[1]
+        rounds = _field(data, "rounds", int)
+        if rounds < 1:
+            raise ValueError("Field 'rounds' must be at least 1")
+        self.repo.update_firearm_rounds(item_id, rounds)
+        return {"item_id": item_id, "rounds": rounds}
+
+    def post_maintenance(self, query: dict, data: dict, arg: str | None) -> dict:
+        code = _field(data, "item")
+        resolved = self.repo.resolve_code(code)
+        if resolved is None or resolved[0] not in ITEM_TABLE_CATEGORIES:
+            raise ValueError(f"Unknown item: {code}")
+        try:
+            log_type = MaintenanceType(_field(data, "type"))
+        except ValueError:
+            raise ValueError(
+                "Field 'type' must be one of "
+                + ", ".join(t.value for t in MaintenanceType)
+            ) from None
+        log = MaintenanceLog(
+            id=str(uuid.uuid4()),
+            item_id=resolved[1],
+            item_type=ITEM_TABLE_CATEGORIES[resolved[0]],
+            log_type=log_type,
+            date=_date(data.get("date")) or datetime.now(),
+            details=_optional(data, "details", default=""),
+            ammo_count=_optional(data, "ammo_count", int),
+        )
+        self.repo.log_maintenance(log)
+        return {"id": log.id}
+
+    # -------- WRITER --------
+
+    def _run_batch(self, ops: list) -> list[tuple[bool, object]]:
+        """Run ops in one transaction; returns (failed, result or error) each."""
+        results = []
+        try:
+            with self.repo.batch():
+                for op in ops:
+                    try:
+                        with self.repo.batch_step():
+                            results.append((False, op()))
+                    except Exception as e:
+                        results.append((True, e))
+        except (sqlite3.Error, OSError) as e:
+            # Nothing was committed, including the ops that succeeded
+            return [(True, e)] * len(ops)
+        return results
+
+    async def _write_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._writes.get()]
+            # Whatever queued up while the last batch ran goes in this one
+            while len(batch) < self.max_batch and not self._writes.empty():
+                batch.append(self._writes.get_nowait())
+            results = await loop.run_in_executor(
+                self._writer, self._run_batch, [op for op, _ in batch]
+            )
+            self.writes += len(batch)
+            self.write_batches += 1
+            self.largest_batch = max(self.largest_batch, len(batch))
+            for (_, future), (failed, value) in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if failed:
+                    future.set_exception(value)
+                else:
+                    future.set_result(value)
+
+    async def _submit_write(self, op):
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self._writes.put_nowait((op, future))
+        except asyncio.QueueFull:
+            raise HttpError(
+                HTTPStatus.SERVICE_UNAVAILABLE, "Too many queued writes"
+            ) from None
+        return await future
+
+    # -------- HTTP --------
+
+    async def dispatch(self, method: str, target: str, body: bytes):
+        """Returns (status, JSON-able payload) for one request."""
+        self.requests += 1
+        url = urlsplit(target)
+        parts = [unquote(p) for p in url.path.split("/") if p]
+        name = parts[0] if parts else ""
+        arg = "/".join(parts[1:]) or None
+        route = self._routes.get((method, name))
+        if route is None:
+            if any(n == name for _, n in self._routes):
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Method not allowed"}
+            return HTTPStatus.NOT_FOUND, {"error": f"Not found: {url.path}"}
+        handler, is_write = route
+
+        try:
+            data = json.loads(body) if body else {}
+            if not isinstance(data, dict):
+                raise ValueError("Request body must be a JSON object")
+            call = partial(handler, dict(parse_qsl(url.query)), data, arg)
+            if is_write:
+                result = await self._submit_write(call)
+                status = HTTPStatus.CREATED if method == "POST" else HTTPStatus.OK
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self._readers, call)
+                status = HTTPStatus.OK
+        except HttpError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e:
+            # Includes malformed JSON (JSONDecodeError)
+            return HTTPStatus.BAD_REQUEST, {"error": str(e)}
+        except sqlite3.OperationalError as e:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": str(e)}
+        except Exception as e:
+            traceback.print_exc()
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {"error": str(e)}
+        return status, result
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Serve HTTP/1.1 requests on one connection, keeping it alive."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                try:
+                    method, target, version = request_line.decode("latin-1").split()
+                except ValueError:
+                    await self._respond(
+                        writer, HTTPStatus.BAD_REQUEST, {"error": "Bad request"}, False
+                    )
+                    break
+
+                headers = {}
+                size = len(request_line)
+                while True:
+                    line = await reader.readline()
+                    size += len(line)
+                    if size > MAX_HEADER_BYTES:
+                        raise HttpError(
+                            HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE,
+                            "Headers too large",
+                        )
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    raise HttpError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Body too large")
+                body = await reader.readexactly(length) if length else b""
+
+                keep_alive = (
+                    version == "HTTP/1.1"
+                    and headers.get("connection", "").lower() != "close"
+                )
+                status, payload = await self.dispatch(method.upper(), target, body)
+                await self._respond(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except HttpError as e:
+            await self._respond(writer, e.status, {"error": str(e)}, False)
+        except (ValueError, asyncio.LimitOverrunError):
+            # Unparseable Content-Length or an over-long line
+            await self._respond(
+                writer, HTTPStatus.BAD_REQUEST, {"error": "Bad request"}, False
+            )
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(
+        self,
+        writer: asyncio.StreamWriter,
+        status: HTTPStatus,
+        payload,
+        keep_alive: bool,
+    ) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+        )
+        if not keep_alive:
+            head += "Connection: close\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+    async def serve(self, host: str, port: int) -> None:
+        self._writes = asyncio.Queue(MAX_QUEUED_WRITES)
+        write_loop = asyncio.create_task(self._write_loop())
+        server = await asyncio.start_server(
+            self.handle_connection, host, port, limit=MAX_HEADER_BYTES
+        )
+        bound = server.sockets[0].getsockname()
+        print(f"Listening on http://{bound[0]}:{bound[1]}", flush=True)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            write_loop.cancel()
+            self._readers.shutdown(wait=False, cancel_futures=True)
+            self._writer.shutdown(wait=True)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python server.py",
+        description="Local JSON-over-HTTP API for scanner stations.",
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--db", help="database file (default: active profile)")
+    source.add_argument("--profile", help="profile name")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="0: any free")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"read worker threads (default {DEFAULT_WORKERS})",
+    )
+    parser.add_argument(
+        "--max-batch",
+        type=int,
+        default=MAX_BATCH,
+        help=f"most writes per transaction (default {MAX_BATCH})",
+    )
+    args = parser.parse_args(argv)
+    if args.workers < 1 or args.max_batch < 1:
+        parser.error("--workers and --max-batch must be at least 1")
+
+    try:
+        repo = open_repository(args)
+    except (ValueError, OSError) as e:
+        print(f"server: error: {e}", file=sys.stderr)
+        return 1
+    server = GearServer(repo, args.workers, args.max_batch)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        repo.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Photo Thumbnails
+
+Downsampled previews of maintenance photos for the gallery. Images are
+decoded on a thread pool with QImageReader, which scales JPEGs while
+decoding instead of loading them at full size, and the results are kept in
+an on-disk cache so reopening a gallery does not decode anything.
+
+Cache entries are content-addressed: the file name is a hash of the
+photo's absolute path, modification time and size (plus the thumbnail
+size), so an edited or replaced photo gets a new entry and stale entries
+simply age out. The cache is trimmed least-recently-used first once it
+grows past its byte budget; a hit refreshes the entry's mtime, so recency
+survives restarts.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+
+from PyQt6.QtCore import QObject, QSize, Qt, pyqtSignal
+from PyQt6.QtGui import QImage, QImageReader
+
+# Longest side of a thumbnail, in pixels
+THUMBNAIL_SIZE = 160
+THUMBNAIL_CACHE_MAX_BYTES = 64 * 1024 * 1024
+# Bump when thumbnails are rendered differently
+CACHE_FORMAT = 1
+
+IMAGE_EXTENSIONS = (
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".webp",
+    ".bmp",
+    ".gif",
+    ".tif",
+    ".tiff",
+)
+
+
+def default_cache_dir() -> Path:
+    from vault import VAULT_DIR
+
+    return VAULT_DIR / "thumbnail_cache"
+
+
+def photo_files(photo_path: str) -> list[Path]:
+    """
+    Images behind a maintenance log's photo_path: the file itself, or the
+    images in it (by name) when it is a folder of photos from the event.
+    """
+    path = Path(photo_path).expanduser()
+    if path.is_dir():
+        return sorted(
+            p
+            for p in path.iterdir()
+            if p.suffix.lower() in IMAGE_EXTENSIONS and p.is_file()
+        )
+    return [path]
+
+
+# -------- CACHE --------
+
+
+class ThumbnailCache:
+    """Content-addressed thumbnail files with LRU eviction; thread-safe."""
+
+    def __init__(
+        self,
+        cache_dir: Path | None = None,
+        max_bytes: int = THUMBNAIL_CACHE_MAX_BYTES,
+        size: int = THUMBNAIL_SIZE,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+        self.max_bytes = max_bytes
+        self.size = size
+        self._lock = threading.Lock()
+        # File name -> bytes, least recently used first; scanned on first use
+        self._entries: OrderedDict[str, int] | None = None
+        self._total = 0
+
+    def key(self, path: Path) -> str | None:
+        """Cache file name for path's current contents; None if unreadable."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        source = (
+            f"{os.path.abspath(path)}\0{st.st_mtime_ns}\0{st.st_size}"
+            f"\0{self.size}\0{CACHE_FORMAT}"
+        )
+        return hashlib.sha256(source.encode("utf-8")).hexdigest() + ".jpg"
+
+    def _load_entries(self) -> OrderedDict[str, int]:
+        if self._entries is None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            found = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".jpg") and entry.is_file():
+                        st = entry.stat()
+                        found.append((st.st_mtime_ns, entry.name, st.st_size))
+            found.sort()
+            self._entries = OrderedDict((name, size) for _, name, size in found)
+            self._total = sum(size for _, _, size in found)
+        return self._entries
+
+    def get(self, key: str) -> Path | None:
+        with self._lock:
+            entries = self._load_entries()
+            if key not in entries:
+                return None
+            entries.move_to_end(key)
+        path = self.cache_dir / key
+        try:
+            os.utime(path)
+        except OSError:
+            # Removed behind our back (e.g. another window evicted it)
+            with self._lock:
+                self._total -= entries.pop(key, 0)
+            return None
+        return path
+
+    def put(self, key: str, image: QImage) -> None:
+        with self._lock:
+            entries = self._load_entries()
+        path = self.cache_dir / key
+        tmp = path.with_name(f"{key}.{threading.get_ident()}.tmp")
+        if not image.save(str(tmp), "JPG", 85):
+            tmp.unlink(missing_ok=True)
+            return
+        os.replace(tmp, path)
+        size = path.stat().st_size
+
+        with self._lock:
+            self._total += size - entries.pop(key, 0)
+            entries[key] = size
+            evicted = []
+            while self._total > self.max_bytes and len(entries) > 1:
+                name, old_size = entries.popitem(last=False)
+                self._total -= old_size
+                evicted.append(name)
+        for name in evicted:
+            (self.cache_dir / name).unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        with self._lock:
+            entries = self._load_entries()
+            names = list(entries)
+            entries.clear()
+            self._total = 0
+        for name in names:
+            (self.cache_dir / name).unlink(missing_ok=True)
+
+
+def load_thumbnail(cache: ThumbnailCache, path: Path) -> QImage | None:
+    """Thumbnail of the image at path from the cache, decoding it on a miss."""
+    key = cache.key(path)
+    if key is None:
+        return None
+    cached = cache.get(key)
+    if cached is not None:
+        image = QImage(str(cached))
+        if not image.isNull():
+            return image
+
+    reader = QImageReader(str(path))
+    # Honour EXIF rotation, as phone photos are usually stored sideways
+    reader.setAutoTransform(True)
+    source_size = reader.size()
+    if source_size.isValid():
+        target = source_size.scaled(
+            QSize(cache.size, cache.size), Qt.AspectRatioMode.KeepAspectRatio
+        )
+        if target.width() < source_size.width():
+            # Scaled while decoding: JPEGs skip most of the full-size work
+            reader.setScaledSize(target)
+    image = reader.read()
+    if image.isNull():
+        return None
+    if max(image.width(), image.height()) > cache.size:
+        image = image.scaled(
+            cache.size,
+            cache.size,
+            Qt.AspectRatioMode.KeepAspectRatio,
+            Qt.TransformationMode.SmoothTransformation,
+        )
+    cache.put(key, image)
+    return image
+
+
+# -------- LOADER --------
+
+
+class ThumbnailLoader(QObject):
+    """
+    Loads thumbnails on a worker pool and hands them to the GUI thread via
+    `ready(tag, image)`; image is null when a photo cannot be read. Queued
+    requests are dropped by cancel(), e.g. when the gallery closes.
+    """
+
+    ready = pyqtSignal(int, QImage)
+
+    def __init__(
+        self, cache: ThumbnailCache, workers: int | None = None, parent=None
+    ):
+        super().__init__(parent)
+        self.cache = cache
+        self._pool = ThreadPoolExecutor(
+            max_workers=workers or min(4, os.cpu_count() or 1),
+            thread_name_prefix="thumbnails",
+        )
+        self._requested: dict[int, Future] = {}
+        self._cancelled = False
+
+    def request(self, tag: int, path: Path) -> None:
+        if self._cancelled or tag in self._requested:
+            return
+        self._requested[tag] = self._pool.submit(self._load, tag, path)
+
+    def _load(self, tag: int, path: Path) -> None:
+        if self._cancelled:
+            return
+        image = load_thumbnail(self.cache, path)
+        if not self._cancelled:
+            # Emitted from the worker; delivered on the GUI thread (queued)
+            self.ready.emit(tag, image if image is not None else QImage())
+
+    def cancel(self) -> None:
+        self._cancelled = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -1,7 +1,15 @@
+import functools
+import multiprocessing
 import sys
+import time
 import uuid
-import sqlite3
+from typing import TYPE_CHECKING, Callable
+
+_IMPORT_START = time.perf_counter()
+
+from dataclasses import replace
 from datetime import datetime, timedelta
+from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication,
     QMainWindow,
@@ -23,16 +31,27 @@ from PyQt6.QtWidgets import (
     QMessageBox,
     QFormLayout,
     QGroupBox,
+    QListView,
     QListWidget,
     QListWidgetItem,
     QCheckBox,
     QFileDialog,
+    QInputDialog,
+)
+from PyQt6.QtCore import Qt, QDate, QEvent, QObject, QSize, QTimer, QUrl, pyqtSignal
+from PyQt6.QtGui import (
+    QColor,
+    QDesktopServices,
+    QIcon,
+    QImage,
+    QKeySequence,
+    QPalette,
+    QPixmap,
+    QShortcut,
 )
-from PyQt6.QtCore import Qt, QDate
-from PyQt6.QtGui import QColor, QPalette
 
 from gear_tracker import (
-    GearRepository,
+    HistoryPage,
     Firearm,
     SoftGear,
     Consumable,
@@ -48,47 +67,549 @@ from gear_tracker import (
     Transfer,
     Attachment,
     ReloadBatch,
+    ShotString,
     Loadout,
     LoadoutItem,
     LoadoutConsumable,
     LoadoutCheckout,
+    Manifest,
+    ManifestStatus,
 )
 
-from csv_import_export import (
-    create_import_export_tab,
-    DuplicateResolutionDialog,
-    ImportProgressDialog,
-)
+from chronograph import parse_velocities
+from search_index import SearchIndex
+from thumbnails import ThumbnailCache, ThumbnailLoader, photo_files
+from vault import VAULT_DIR, ProfileRegistry, open_profile
+
+if TYPE_CHECKING:
+    from instrumentation import QueryInstrumentation
+
+
+NEW_PROFILE_ITEM = "➕ New Profile..."
+
+# How often the Checkouts tab's overdue badge is recounted
+OVERDUE_CHECK_MS = 60_000
+
+# item_registry table -> (tab refresher, table widget attribute, repo listing)
+ITEM_TABLE_VIEWS = {
+    "firearms": ("refresh_firearms", "firearm_table", "get_all_firearms"),
+    "nfa_items": ("refresh_nfa_items", "nfa_table", "get_all_nfa_items"),
+    "attachments": ("refresh_attachments", "attachment_table", "get_all_attachments"),
+    "soft_gear": ("refresh_soft_gear", "soft_gear_table", "get_all_soft_gear"),
+    "consumables": ("refresh_consumables", "consumable_table", "get_all_consumables"),
+}
+
+
+def _built_tab_only(refresh_method):
+    """Skip a tab refresh until the tab is built; it is populated on first view."""
+
+    @functools.wraps(refresh_method)
+    def wrapper(self):
+        for index in self._built_tabs:
+            refresher = self._tab_specs[index][2]
+            if refresher and refresher.__name__ == refresh_method.__name__:
+                if self.sql_trace:
+                    # Group the refresh's repository calls under one action
+                    with self.sql_trace.action(f"ui.{refresh_method.__name__}"):
+                        return refresh_method(self)
+                return refresh_method(self)
+        return None
+
+    return wrapper
+
+
+class StartupProfiler:
+    """Wall-clock time per startup phase, reported by --profile-startup."""
+
+    def __init__(self, start: float):
+        self._start = start
+        self._last = start
+        self.phases: list[tuple[str, float]] = []
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self) -> str:
+        lines = ["Startup profile (ms):"]
+        for phase, seconds in self.phases:
+            lines.append(f"  {phase:<32}{seconds * 1000:>9.1f}")
+        lines.append(f"  {'time to first paint':<32}{(self._last - self._start) * 1000:>9.1f}")
+        return "\n".join(lines)
+
+
+class PagedTableLoader:
+    """
+    Fills a QTableWidget one keyset page at a time, fetching the next page
+    when the user scrolls near the bottom, so long histories open instantly.
+    """
+
+    # Rows from the bottom at which the next page is requested
+    PREFETCH_ROWS = 20
+
+    def __init__(
+        self,
+        table: QTableWidget,
+        fetch_page: Callable[[tuple | None], HistoryPage],
+        fill_row: Callable[[int, object], None],
+    ):
+        self.table = table
+        self._fetch_page = fetch_page
+        self._fill_row = fill_row
+        self._cursor = None
+        self._done = False
+
+        scroll_bar = table.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self._maybe_load)
+        # Also fires when rows are added: keeps loading until the view
+        # can scroll, otherwise a short first page could never trigger more
+        scroll_bar.rangeChanged.connect(self._maybe_load)
+        self.load_next()
+
+    def load_next(self) -> None:
+        if self._done:
+            return
+        page = self._fetch_page(self._cursor)
+        start = self.table.rowCount()
+        self.table.setRowCount(start + len(page.items))
+        for offset, item in enumerate(page.items):
+            self._fill_row(start + offset, item)
+        self._cursor = page.next_cursor
+        self._done = page.next_cursor is None
+
+    def _maybe_load(self, *_args) -> None:
+        scroll_bar = self.table.verticalScrollBar()
+        row_height = max(self.table.verticalHeader().defaultSectionSize(), 1)
+        remaining_rows = (scroll_bar.maximum() - scroll_bar.value()) / row_height
+        if remaining_rows <= self.PREFETCH_ROWS:
+            self.load_next()
+
+
+class TableFilterBar(QLineEdit):
+    """
+    Filter-as-you-type for a QTableWidget. Matching goes through a
+    SearchIndex over the given columns' cell text and non-matching rows are
+    hidden, so typing never queries the database or rebuilds the table; row
+    numbers (and so currentRow() lookups) are unchanged. The index is
+    rebuilt lazily after the table's contents change.
+    """
+
+    def __init__(self, table: QTableWidget, columns: tuple[int, ...]):
+        super().__init__()
+        self.table = table
+        self.columns = columns
+        self._index: SearchIndex | None = None
+        # Rows currently hidden; None when unknown after the table changed
+        self._hidden: set[int] | None = set()
+        self._reapply_pending = False
+
+        headers = [table.horizontalHeaderItem(c).text().lower() for c in columns]
+        self.setPlaceholderText(f"🔍 Filter by {', '.join(headers)}")
+        self.setClearButtonEnabled(True)
+        self.textChanged.connect(self.apply)
+
+        model = table.model()
+        model.modelReset.connect(self._invalidate)
+        model.rowsInserted.connect(self._invalidate)
+        model.rowsRemoved.connect(self._invalidate)
+        model.dataChanged.connect(self._invalidate)
+
+    def focusInEvent(self, event) -> None:
+        # Build ahead of the first keystroke, while the user is still clicking
+        if self._index is None:
+            self._index = self._build_index()
+        super().focusInEvent(event)
+
+    def _invalidate(self, *_args) -> None:
+        self._index = None
+        self._hidden = None
+        # A refresh fires one signal per cell; reapply once when it is done
+        if self.text() and not self._reapply_pending:
+            self._reapply_pending = True
+            QTimer.singleShot(0, self.apply)
+
+    def _build_index(self) -> SearchIndex:
+        table = self.table
+        index = SearchIndex()
+        for row in range(table.rowCount()):
+            cells = (table.item(row, column) for column in self.columns)
+            index.add("\n".join(cell.text() for cell in cells if cell))
+        return index
+
+    def apply(self, *_args) -> None:
+        self._reapply_pending = False
+        rows = range(self.table.rowCount())
+        text = self.text()
+        if text.strip():
+            if self._index is None:
+                self._index = self._build_index()
+            matches = self._index.search(text)
+            hidden = {row for row in rows if row not in matches}
+        else:
+            hidden = set()
+
+        previous = self._hidden
+        # Only touch rows whose visibility changed
+        changed = rows if previous is None else hidden ^ previous
+        for row in changed:
+            self.table.setRowHidden(row, row in hidden)
+        self._hidden = hidden
+
+
+class ScannerListener(QObject):
+    """
+    Scanner input mode. Keyboard-wedge barcode/QR scanners "type" a code as
+    a burst of keystrokes, usually ending in Enter. While installed as an
+    application event filter, printable keys are captured into a buffer
+    instead of reaching widgets; Enter, or a pause after the burst for
+    scanners without a suffix, emits the buffered code.
+    """
+
+    scanned = pyqtSignal(str)
+
+    # Pause that ends a code from a scanner configured without Enter
+    IDLE_MS = 80
+
+    def __init__(self, parent: QObject | None = None):
+        super().__init__(parent)
+        self._buffer: list[str] = []
+        self._idle = QTimer(self)
+        self._idle.setSingleShot(True)
+        self._idle.setInterval(self.IDLE_MS)
+        self._idle.timeout.connect(self._flush)
+
+    def set_active(self, active: bool) -> None:
+        app = QApplication.instance()
+        self._buffer.clear()
+        if active:
+            app.installEventFilter(self)
+        else:
+            self._idle.stop()
+            app.removeEventFilter(self)
+
+    def eventFilter(self, obj, event) -> bool:
+        if event.type() != QEvent.Type.KeyPress:
+            return False
+        if event.key() in (Qt.Key.Key_Return, Qt.Key.Key_Enter):
+            self._idle.stop()
+            self._flush()
+            return True
+        text = event.text()
+        if text and text.isprintable():
+            self._buffer.append(text)
+            self._idle.start()
+            return True
+        return False
+
+    def _flush(self) -> None:
+        code = "".join(self._buffer).strip()
+        self._buffer.clear()
+        if code:
+            self.scanned.emit(code)
+
+
+class PhotoGallery(QListWidget):
+    """
+    Icon grid of photos. Thumbnails come from a ThumbnailLoader off the GUI
+    thread and are only requested for items in or near the viewport, so a
+    gallery of hundreds of photos opens at once and fills in as it scrolls.
+    """
+
+    # Viewport heights above and below the visible area to request ahead
+    PREFETCH_SCREENS = 1
+
+    def __init__(self, photos: list[tuple[Path, str]], loader: ThumbnailLoader):
+        super().__init__()
+        size = loader.cache.size
+        self.setViewMode(QListView.ViewMode.IconMode)
+        self.setResizeMode(QListView.ResizeMode.Adjust)
+        self.setMovement(QListView.Movement.Static)
+        self.setUniformItemSizes(True)
+        self.setWordWrap(True)
+        self.setIconSize(QSize(size, size))
+        self.setGridSize(QSize(size + 24, size + 40))
+
+        self._loader = loader
+        self._paths = [path for path, _ in photos]
+        self._requested: set[int] = set()
+
+        placeholder = QPixmap(size, size)
+        placeholder.fill(QColor(60, 60, 60))
+        icon = QIcon(placeholder)
+        for path, caption in photos:
+            item = QListWidgetItem(icon, caption)
+            item.setToolTip(str(path))
+            self.addItem(item)
+
+        loader.ready.connect(self._on_ready)
+        self.itemActivated.connect(self._open_photo)
+        scroll_bar = self.verticalScrollBar()
+        scroll_bar.valueChanged.connect(self._request_visible)
+        # Layout (and so item positions) settles after show and on resize
+        scroll_bar.rangeChanged.connect(self._request_visible)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        QTimer.singleShot(0, self._request_visible)
+
+    def _request_visible(self, *_args) -> None:
+        viewport = self.viewport().rect()
+        margin = viewport.height() * self.PREFETCH_SCREENS
+        ahead = viewport.adjusted(0, -margin, 0, margin)
+        visible, nearby = [], []
+        for row in range(self.count()):
+            if row in self._requested:
+                continue
+            rect = self.visualItemRect(self.item(row))
+            if rect.intersects(viewport):
+                visible.append(row)
+            elif rect.intersects(ahead):
+                nearby.append(row)
+        # On-screen thumbnails first
+        for row in visible + nearby:
+            self._requested.add(row)
+            self._loader.request(row, self._paths[row])
+
+    def _on_ready(self, row: int, image: QImage) -> None:
+        item = self.item(row)
+        if item is None:
+            return
+        if image.isNull():
+            item.setText(f"{item.text()}\n(not found)")
+        else:
+            item.setIcon(QIcon(QPixmap.fromImage(image)))
+
+    def _open_photo(self, item: QListWidgetItem) -> None:
+        path = self._paths[self.row(item)]
+        QDesktopServices.openUrl(QUrl.fromLocalFile(str(path)))
 
 
 class GearTrackerApp(QMainWindow):
-    def __init__(self):
+    def __init__(
+        self,
+        profiler: StartupProfiler | None = None,
+        sql_trace: "QueryInstrumentation | None" = None,
+    ):
         super().__init__()
-        self.repo = GearRepository()
+        self.sql_trace = sql_trace
+        # Created when a photo gallery is first opened
+        self._thumbnail_cache: ThumbnailCache | None = None
+        self.profiles = ProfileRegistry()
+        self.repo = open_profile(self.profiles, self.profiles.active)
+        if self.sql_trace:
+            self.sql_trace.instrument(self.repo)
+        if profiler:
+            profiler.mark("open profile database")
         self.init_ui()
+        if profiler:
+            profiler.mark("build window + active tab")
 
     def init_ui(self):
-        self.setWindowTitle("Gear Tracker")
+        self.setWindowTitle(f"Gear Tracker - {self.profiles.active}")
         self.setGeometry(100, 100, 1200, 700)
 
         # Main tab widget
         self.tabs = QTabWidget()
         self.setCentralWidget(self.tabs)
 
-        # Create tabs
-        self.tabs.addTab(self.create_firearms_tab(), "🔫 Firearms")
-        self.tabs.addTab(self.create_attachments_tab(), "🔧 Attachments")
-        self.tabs.addTab(self.create_reloading_tab(), "🧪 Reloading")
-        self.tabs.addTab(self.create_soft_gear_tab(), "🎒 Soft Gear")
-        self.tabs.addTab(self.create_consumables_tab(), "📦 Consumables")
-        self.tabs.addTab(self.create_loadouts_tab(), "🎒 Loadouts")
-        self.tabs.addTab(self.create_checkouts_tab(), "📋 Checkouts")
-        self.tabs.addTab(self.create_borrowers_tab(), "👥 Borrowers")
-        self.tabs.addTab(self.create_nfa_items_tab(), "🔇 NFA Items")
-        self.tabs.addTab(self.create_transfers_tab(), "📋 Transfers")
-        self.tabs.addTab(self.create_import_export_tab(), "📁 Import/Export")
-        # Refresh all on startup
-        self.refresh_all()
+        # (label, builder, refresher) in tab order. Tabs start as empty
+        # placeholders and are built and populated the first time they are
+        # shown, so startup only pays for the tab on screen.
+        self._tab_specs = [
+            ("🔫 Firearms", self.create_firearms_tab, self.refresh_firearms),
+            ("🔧 Attachments", self.create_attachments_tab, self.refresh_attachments),
+            ("🧪 Reloading", self.create_reloading_tab, self.refresh_reloads),
+            ("🎒 Soft Gear", self.create_soft_gear_tab, self.refresh_soft_gear),
+            ("📦 Consumables", self.create_consumables_tab, self.refresh_consumables),
+            ("🎒 Loadouts", self.create_loadouts_tab, self.refresh_loadouts),
+            ("🧭 Trips", self.create_trips_tab, self.refresh_trips),
+            ("📋 Checkouts", self.create_checkouts_tab, self.refresh_checkouts),
+            ("👥 Borrowers", self.create_borrowers_tab, self.refresh_borrowers),
+            ("🔇 NFA Items", self.create_nfa_items_tab, self.refresh_nfa_items),
+            ("📋 Transfers", self.create_transfers_tab, self.refresh_transfers),
+            # Binds the repository when built, so it is rebuilt on profile switch
+            ("📁 Import/Export", self.create_import_export_tab, None),
+        ]
+        self._checkouts_tab = next(
+            i
+            for i, (_, builder, _) in enumerate(self._tab_specs)
+            if builder == self.create_checkouts_tab
+        )
+        self._built_tabs: set[int] = set()
+        # Built tabs whose data changed while they were off screen
+        self._stale_tabs: set[int] = set()
+
+        for label, _, _ in self._tab_specs:
+            self.tabs.addTab(QWidget(), label)
+        self.tabs.currentChanged.connect(self._on_tab_changed)
+
+        # Profile switcher
+        self.profile_combo = QComboBox()
+        self.profile_combo.setToolTip("Switch profile (vault)")
+        self._populate_profile_combo()
+        self.profile_combo.activated.connect(self._on_profile_selected)
+
+        # Scanner input mode (F9)
+        self.scanner = ScannerListener(self)
+        self.scanner.scanned.connect(self._on_scanned)
+        # Set while a dialog accepts scans (e.g. batch checkout)
+        self._scan_target: Callable[[str, str], None] | None = None
+        self.scan_btn = QPushButton("📷 Scan")
+        self.scan_btn.setCheckable(True)
+        self.scan_btn.setToolTip(
+            "Scanner mode (F9): scanned ids and serials jump to the item"
+        )
+        self.scan_btn.toggled.connect(self._set_scan_mode)
+        QShortcut(QKeySequence("F9"), self, activated=self.scan_btn.toggle)
+
+        # Undo/redo of repository writes (text fields keep their own)
+        QShortcut(QKeySequence.StandardKey.Undo, self, activated=self.undo_action)
+        QShortcut(QKeySequence.StandardKey.Redo, self, activated=self.redo_action)
+        QShortcut(QKeySequence("Ctrl+Y"), self, activated=self.redo_action)
+
+        corner = QWidget()
+        corner_layout = QHBoxLayout(corner)
+        corner_layout.setContentsMargins(0, 0, 0, 0)
+        corner_layout.addWidget(self.scan_btn)
+        corner_layout.addWidget(self.profile_combo)
+        self.tabs.setCornerWidget(corner, Qt.Corner.TopRightCorner)
+
+        # Build and populate the active tab only
+        self._on_tab_changed(self.tabs.currentIndex())
+
+        # Checkouts fall overdue with time, not only on edits
+        self.update_overdue_badge()
+        self._overdue_timer = QTimer(self)
+        self._overdue_timer.timeout.connect(self.update_overdue_badge)
+        self._overdue_timer.start(OVERDUE_CHECK_MS)
+
+        # Audit log upkeep, once the window is up
+        QTimer.singleShot(0, self.repo.prune_audit_log)
+
+    def _build_tab(self, index: int):
+        label, builder, _ = self._tab_specs[index]
+        placeholder = self.tabs.widget(index)
+
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(index)
+        self.tabs.insertTab(index, builder(), label)
+        self.tabs.setCurrentIndex(index)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
+        self._built_tabs.add(index)
+
+    def _on_tab_changed(self, index: int):
+        if index < 0:
+            return
+        refresher = self._tab_specs[index][2]
+        if index not in self._built_tabs:
+            self._build_tab(index)
+            if refresher:
+                refresher()
+        elif index in self._stale_tabs:
+            self._stale_tabs.discard(index)
+            refresher()
+
+    # ============== PROFILES ==============
+
+    def _populate_profile_combo(self):
+        self.profile_combo.blockSignals(True)
+        self.profile_combo.clear()
+        for profile in self.profiles.list_profiles():
+            self.profile_combo.addItem(f"🗄️ {profile.name}", profile.name)
+        self.profile_combo.addItem(NEW_PROFILE_ITEM, None)
+        self.profile_combo.setCurrentIndex(
+            self.profile_combo.findData(self.profiles.active)
+        )
+        self.profile_combo.blockSignals(False)
+
+    def _on_profile_selected(self, index: int):
+        name = self.profile_combo.itemData(index)
+        if name is None:
+            self.create_profile()
+        elif name != self.profiles.active:
+            self.switch_profile(name)
+
+    def create_profile(self):
+        name, ok = QInputDialog.getText(
+            self, "New Profile", "Profile name (e.g., Parish):"
+        )
+        if not ok or not name.strip():
+            self._populate_profile_combo()
+            return
+        try:
+            profile = self.profiles.add_profile(name)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            self._populate_profile_combo()
+            return
+        self.switch_profile(profile.name)
+
+    def switch_profile(self, name: str):
+        """Swap to another profile's database without rebuilding the window."""
+        self.repo = open_profile(self.profiles, name)
+        if self.sql_trace:
+            self.sql_trace.instrument(self.repo)
+        self.setWindowTitle(f"Gear Tracker - {name}")
+        self._populate_profile_combo()
+
+        # Tabs without a refresher hold the old repository; rebuild on view
+        self._built_tabs = {i for i in self._built_tabs if self._tab_specs[i][2]}
+
+        current = self.tabs.currentIndex()
+        self._stale_tabs = self._built_tabs - {current}
+        if current in self._built_tabs:
+            self._tab_specs[current][2]()
+        else:
+            self._on_tab_changed(current)
+        self.update_overdue_badge()
+
+    # ============== SCANNING ==============
+
+    def _set_scan_mode(self, active: bool):
+        self.scanner.set_active(active)
+        if active:
+            self.statusBar().showMessage("Scanner mode: scan a label or serial")
+        else:
+            self.statusBar().clearMessage()
+
+    def _on_scanned(self, code: str):
+        resolved = self.repo.resolve_code(code)
+        if resolved is None:
+            self.statusBar().showMessage(f"⚠️ No item matches '{code}'")
+            QApplication.beep()
+            return
+        item_table, item_id = resolved
+        if self._scan_target:
+            self._scan_target(item_table, item_id)
+        else:
+            self.focus_item(item_table, item_id)
+
+    def focus_item(self, item_table: str, item_id: str):
+        """Switch to the item's tab and select its row."""
+        refresher, table_attr, getter = ITEM_TABLE_VIEWS[item_table]
+
+        index = next(
+            i
+            for i, spec in enumerate(self._tab_specs)
+            if spec[2] and spec[2].__name__ == refresher
+        )
+        self.tabs.setCurrentIndex(index)
+        table = getattr(self, table_attr)
+        # Rows follow the (cached) listing order
+        items = getattr(self.repo, getter)()
+        row = next((i for i, item in enumerate(items) if item.id == item_id), None)
+        if row is None or row >= table.rowCount():
+            # e.g. a transferred firearm, which the tab does not list
+            self.statusBar().showMessage("Scanned item not shown in this tab")
+            return
+        if table.isRowHidden(row):
+            table.parentWidget().findChild(TableFilterBar).clear()
+        table.selectRow(row)
+        table.scrollToItem(table.item(row, 0))
+        self.statusBar().showMessage(f"Scanned: {table.item(row, 0).text()}")
 
     # ============== FIREARMS TAB ==============
 
@@ -104,6 +625,7 @@ class GearTrackerApp(QMainWindow):
         self.firearm_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.firearm_table, (0, 1, 2)))
         layout.addWidget(self.firearm_table)
 
         btn_layout = QHBoxLayout()
@@ -122,6 +644,10 @@ class GearTrackerApp(QMainWindow):
         )
         btn_layout.addWidget(history_btn)
 
+        details_btn = QPushButton("🔍 Details")
+        details_btn.clicked.connect(self.view_firearm_details)
+        btn_layout.addWidget(details_btn)
+
         delete_btn = QPushButton("🗑️ Delete")
         delete_btn.setStyleSheet("background-color: #6B2020;")
         delete_btn.clicked.connect(self.delete_selected_firearm)
@@ -136,6 +662,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_firearms(self):
         self.firearm_table.setRowCount(0)
         firearms = self.repo.get_all_firearms()
@@ -183,6 +710,106 @@ class GearTrackerApp(QMainWindow):
 
             self.firearm_table.setItem(i, 6, QTableWidgetItem(fw.notes))
 
+    def view_firearm_details(self):
+        row = self.firearm_table.currentRow()
+        if row < 0:
+            QMessageBox.warning(self, "Error", "Select a firearm to view")
+            return
+
+        fw = self.repo.get_all_firearms()[row]
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Firearm: {fw.name}")
+        dialog.setMinimumSize(600, 500)
+        layout = QVBoxLayout()
+
+        info = QLabel(
+            f"<b>{fw.name}</b> — {fw.caliber}<br>"
+            f"Serial: {fw.serial_number} | Status: {fw.status.value} | "
+            f"Rounds: {fw.rounds_fired}"
+        )
+        layout.addWidget(info)
+
+        mounted_group = QGroupBox("Mounted Attachments")
+        mounted_layout = QVBoxLayout()
+        mounted_list = QListWidget()
+        mounted_layout.addWidget(mounted_list)
+        move_btn = QPushButton("🔀 Move Checked…")
+        mounted_layout.addWidget(move_btn)
+        mounted_group.setLayout(mounted_layout)
+        layout.addWidget(mounted_group)
+
+        history_group = QGroupBox("Mount History")
+        history_layout = QVBoxLayout()
+        history_table = QTableWidget()
+        history_table.setColumnCount(4)
+        history_table.setHorizontalHeaderLabels(
+            ["Attachment", "Position", "Mounted", "Removed"]
+        )
+        history_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        history_layout.addWidget(history_table)
+        history_group.setLayout(history_layout)
+        layout.addWidget(history_group)
+
+        def populate():
+            index = self.repo.get_mount_index()
+
+            mounted_list.clear()
+            for att in index.attachments_on(fw.id):
+                text = f"🔧 {att.name} ({att.category})"
+                if att.mount_position:
+                    text += f" — {att.mount_position}"
+                item = QListWidgetItem(text)
+                item.setFlags(item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                item.setCheckState(Qt.CheckState.Unchecked)
+                item.setData(Qt.ItemDataRole.UserRole, att.id)
+                mounted_list.addItem(item)
+            move_btn.setEnabled(mounted_list.count() > 0)
+
+            names = {att.id: att.name for att in self.repo.get_all_attachments()}
+            mounts = index.history_on(fw.id)
+            history_table.setRowCount(len(mounts))
+            # Most recent first
+            for i, mount in enumerate(reversed(mounts)):
+                history_table.setItem(
+                    i, 0, QTableWidgetItem(names.get(mount.attachment_id, "Unknown"))
+                )
+                history_table.setItem(i, 1, QTableWidgetItem(mount.mount_position))
+                history_table.setItem(
+                    i, 2, QTableWidgetItem(mount.mounted_date.strftime("%Y-%m-%d"))
+                )
+                removed = (
+                    mount.removed_date.strftime("%Y-%m-%d")
+                    if mount.removed_date
+                    else "Mounted"
+                )
+                history_table.setItem(i, 3, QTableWidgetItem(removed))
+
+        def move_checked():
+            checked = [
+                mounted_list.item(i).data(Qt.ItemDataRole.UserRole)
+                for i in range(mounted_list.count())
+                if mounted_list.item(i).checkState() == Qt.CheckState.Checked
+            ]
+            if not checked:
+                QMessageBox.warning(dialog, "Error", "Check the attachments to move")
+                return
+            ok, firearm_id = self._choose_mount_target(dialog, exclude=fw.id)
+            if ok and self._remount(dialog, checked, firearm_id):
+                populate()
+
+        move_btn.clicked.connect(move_checked)
+        populate()
+
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.accept)
+        layout.addWidget(close_btn)
+
+        dialog.setLayout(layout)
+        dialog.exec()
+
     def delete_selected_firearm(self):
         row = self.firearm_table.currentRow()
         if row < 0:
@@ -442,6 +1069,10 @@ class GearTrackerApp(QMainWindow):
         self.attachment_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        self.attachment_table.setSelectionBehavior(
+            QTableWidget.SelectionBehavior.SelectRows
+        )
+        layout.addWidget(TableFilterBar(self.attachment_table, (0, 1, 2, 3)))
         layout.addWidget(self.attachment_table)
 
         btn_layout = QHBoxLayout()
@@ -454,6 +1085,10 @@ class GearTrackerApp(QMainWindow):
         edit_btn.clicked.connect(self.open_edit_attachment_dialog)
         btn_layout.addWidget(edit_btn)
 
+        move_btn = QPushButton("🔀 Move Selected…")
+        move_btn.clicked.connect(self.move_selected_attachments)
+        btn_layout.addWidget(move_btn)
+
         delete_btn = QPushButton("🗑️ Delete")
         delete_btn.setStyleSheet("background-color: #6B2020;")
         delete_btn.clicked.connect(self.delete_selected_attachment)
@@ -463,6 +1098,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_attachments(self):
         self.attachment_table.setRowCount(0)
         attachments = self.repo.get_all_attachments()
@@ -475,13 +1111,9 @@ class GearTrackerApp(QMainWindow):
             brand_model = f"{att.brand} {att.model}".strip()
             self.attachment_table.setItem(i, 2, QTableWidgetItem(brand_model))
 
-            mounted_name = ""
-            if att.mounted_on_firearm_id and att.mounted_on_firearm_id in firearms:
-                fw = firearms[att.mounted_on_firearm_id]
-                mounted_name = fw.name
-                if att.mount_position:
-                    mounted_name += f" ({att.mount_position})"
-            self.attachment_table.setItem(i, 3, QTableWidgetItem(mounted_name))
+            self.attachment_table.setItem(
+                i, 3, QTableWidgetItem(self._mounted_on_text(att, firearms))
+            )
 
             zero_text = ""
             if att.zero_distance_yards:
@@ -490,6 +1122,15 @@ class GearTrackerApp(QMainWindow):
 
             self.attachment_table.setItem(i, 5, QTableWidgetItem(att.notes or ""))
 
+    @staticmethod
+    def _mounted_on_text(att: Attachment, firearms: dict) -> str:
+        fw = firearms.get(att.mounted_on_firearm_id)
+        if fw is None:
+            return ""
+        if att.mount_position:
+            return f"{fw.name} ({att.mount_position})"
+        return fw.name
+
     def _get_selected_attachment(self):
         row = self.attachment_table.currentRow()
         if row < 0:
@@ -500,6 +1141,65 @@ class GearTrackerApp(QMainWindow):
             return None
         return attachments[row]
 
+    def _choose_mount_target(self, parent, exclude: str | None = None):
+        """
+        Ask which firearm to move attachments to. Returns (ok, firearm id),
+        where a None id means unmount.
+        """
+        firearms = [fw for fw in self.repo.get_all_firearms() if fw.id != exclude]
+        choices = ["Unmounted"] + [fw.name for fw in firearms]
+        choice, ok = QInputDialog.getItem(
+            parent, "Move Attachments", "Mount on:", choices, 0, False
+        )
+        if not ok:
+            return False, None
+        idx = choices.index(choice)
+        return True, firearms[idx - 1].id if idx > 0 else None
+
+    def _remount(self, parent, attachment_ids: list[str], firearm_id: str | None):
+        """Move attachments in one operation and patch the attachments tab."""
+        try:
+            self.repo.remount_attachments(
+                {attachment_id: firearm_id for attachment_id in attachment_ids}
+            )
+        except ValueError as e:
+            QMessageBox.warning(parent, "Error", str(e))
+            return False
+        self._update_attachment_mount_cells(set(attachment_ids))
+        return True
+
+    def _update_attachment_mount_cells(self, attachment_ids: set[str]) -> None:
+        # Rows follow get_all_attachments() order, which a remount does not
+        # change, so only the "Mounted On" cells of moved rows are rewritten
+        if not self.attachment_table.rowCount():
+            return
+        attachments = self.repo.get_all_attachments()
+        if len(attachments) != self.attachment_table.rowCount():
+            self.refresh_attachments()
+            return
+        firearms = {f.id: f for f in self.repo.get_all_firearms()}
+        for row, att in enumerate(attachments):
+            if att.id in attachment_ids:
+                self.attachment_table.item(row, 3).setText(
+                    self._mounted_on_text(att, firearms)
+                )
+
+    def move_selected_attachments(self):
+        rows = sorted(
+            {index.row() for index in self.attachment_table.selectedIndexes()}
+        )
+        attachments = self.repo.get_all_attachments()
+        selected = [attachments[row] for row in rows if row < len(attachments)]
+        if not selected:
+            QMessageBox.warning(
+                self, "Error", "Select one or more attachments to move"
+            )
+            return
+
+        ok, firearm_id = self._choose_mount_target(self)
+        if ok and self._remount(self, [att.id for att in selected], firearm_id):
+            self.statusBar().showMessage(f"Moved {len(selected)} attachment(s)")
+
     def open_add_attachment_dialog(self):
         dialog = QDialog(self)
         dialog.setWindowTitle("Add Attachment")
@@ -709,6 +1409,7 @@ class GearTrackerApp(QMainWindow):
         self.soft_gear_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.soft_gear_table, (0, 1, 2)))
         layout.addWidget(self.soft_gear_table)
 
         btn_layout = QHBoxLayout()
@@ -736,6 +1437,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_soft_gear(self):
         self.soft_gear_table.setRowCount(0)
         gear_list = self.repo.get_all_soft_gear()
@@ -857,6 +1559,7 @@ class GearTrackerApp(QMainWindow):
         self.consumable_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.consumable_table, (0, 1)))
         layout.addWidget(self.consumable_table)
 
         btn_layout = QHBoxLayout()
@@ -888,6 +1591,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_consumables(self):
         self.consumable_table.setRowCount(0)
         consumables = self.repo.get_all_consumables()
@@ -1047,7 +1751,6 @@ class GearTrackerApp(QMainWindow):
 
         consumables = self.repo.get_all_consumables()
         selected = consumables[row]
-        history = self.repo.get_consumable_history(selected.id)
 
         dialog = QDialog(self)
         dialog.setWindowTitle(f"History: {selected.name}")
@@ -1060,8 +1763,7 @@ class GearTrackerApp(QMainWindow):
         table.setHorizontalHeaderLabels(["Date", "Type", "Qty", "Notes"])
         table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
 
-        for i, tx in enumerate(history):
-            table.insertRow(i)
+        def fill_row(i, tx):
             table.setItem(i, 0, QTableWidgetItem(tx.date.strftime("%Y-%m-%d %H:%M")))
             table.setItem(i, 1, QTableWidgetItem(tx.transaction_type))
 
@@ -1071,6 +1773,11 @@ class GearTrackerApp(QMainWindow):
 
         layout.addWidget(table)
         dialog.setLayout(layout)
+        dialog.loader = PagedTableLoader(
+            table,
+            lambda after: self.repo.get_consumable_history_page(selected.id, after),
+            fill_row,
+        )
         dialog.exec()
 
     # ============== LOADOUTS TAB ==============
@@ -1093,6 +1800,7 @@ class GearTrackerApp(QMainWindow):
         self.loadout_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.loadout_table, (0, 1)))
         layout.addWidget(self.loadout_table)
 
         btn_layout = QHBoxLayout()
@@ -1123,6 +1831,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_loadouts(self):
         self.loadout_table.setRowCount(0)
         loadouts = self.repo.get_all_loadouts()
@@ -1568,9 +2277,9 @@ class GearTrackerApp(QMainWindow):
 
         if loadout:
             # Update existing loadout
-            loadout.name = name
-            loadout.description = description
-            loadout.notes = notes
+            loadout = replace(
+                loadout, name=name, description=description, notes=notes
+            )
             self.repo.update_loadout(loadout)
 
             # Clear old items and consumables
@@ -1878,6 +2587,314 @@ class GearTrackerApp(QMainWindow):
             QMessageBox.critical(dialog, "Checkout Failed", error_message)
             return
 
+    # ============== TRIPS TAB ==============
+
+    def create_trips_tab(self):
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        info_label = QLabel(
+            "Trip manifests: plan from a loadout, start the trip to check "
+            "everything out, complete it to log what came back."
+        )
+        info_label.setStyleSheet("color: #888; font-style: italic; padding: 5px;")
+        layout.addWidget(info_label)
+
+        self.trip_table = QTableWidget()
+        self.trip_table.setColumnCount(6)
+        self.trip_table.setHorizontalHeaderLabels(
+            ["Trip", "Status", "Borrower", "Location", "Planned", "Due Back"]
+        )
+        self.trip_table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.Stretch
+        )
+        layout.addWidget(TableFilterBar(self.trip_table, (0, 1, 2, 3)))
+        layout.addWidget(self.trip_table)
+
+        btn_layout = QHBoxLayout()
+
+        plan_btn = QPushButton("🧭 Plan Trip")
+        plan_btn.clicked.connect(self.open_plan_trip_dialog)
+        btn_layout.addWidget(plan_btn)
+
+        view_btn = QPushButton("View Manifest")
+        view_btn.clicked.connect(self.view_selected_trip)
+        btn_layout.addWidget(view_btn)
+
+        start_btn = QPushButton("🚀 Start Trip")
+        start_btn.setStyleSheet("background-color: #20206B; font-weight: bold;")
+        start_btn.clicked.connect(self.start_selected_trip)
+        btn_layout.addWidget(start_btn)
+
+        complete_btn = QPushButton("✅ Complete Trip")
+        complete_btn.clicked.connect(self.open_complete_trip_dialog)
+        btn_layout.addWidget(complete_btn)
+
+        export_btn = QPushButton("📄 Export")
+        export_btn.clicked.connect(self.export_selected_trip)
+        btn_layout.addWidget(export_btn)
+
+        delete_btn = QPushButton("🗑️ Delete")
+        delete_btn.setStyleSheet("background-color: #6B2020;")
+        delete_btn.clicked.connect(self.delete_selected_trip)
+        btn_layout.addWidget(delete_btn)
+
+        layout.addLayout(btn_layout)
+        widget.setLayout(layout)
+        return widget
+
+    @_built_tab_only
+    def refresh_trips(self):
+        self.trip_table.setRowCount(0)
+        borrowers = {b.id: b.name for b in self.repo.get_all_borrowers()}
+
+        for i, trip in enumerate(self.repo.get_all_manifests()):
+            self.trip_table.insertRow(i)
+            self.trip_table.setItem(i, 0, QTableWidgetItem(trip.name))
+
+            status_item = QTableWidgetItem(trip.status.value.replace("_", " ").title())
+            if trip.status == ManifestStatus.IN_PROGRESS:
+                status_item.setBackground(QColor(255, 200, 100))
+            self.trip_table.setItem(i, 1, status_item)
+
+            self.trip_table.setItem(
+                i, 2, QTableWidgetItem(borrowers.get(trip.borrower_id, "Unknown"))
+            )
+            self.trip_table.setItem(i, 3, QTableWidgetItem(trip.location))
+            self.trip_table.setItem(
+                i, 4, QTableWidgetItem(trip.created_date.strftime("%Y-%m-%d"))
+            )
+            due_text = ""
+            if trip.expected_return:
+                due_text = trip.expected_return.strftime("%Y-%m-%d")
+            self.trip_table.setItem(i, 5, QTableWidgetItem(due_text))
+
+    def _get_selected_trip(self) -> Manifest | None:
+        row = self.trip_table.currentRow()
+        if row < 0:
+            return None
+        trips = self.repo.get_all_manifests()
+        if row >= len(trips):
+            return None
+        return trips[row]
+
+    def open_plan_trip_dialog(self):
+        borrowers = self.repo.get_all_borrowers()
+        if not borrowers:
+            QMessageBox.warning(self, "Error", "Add a borrower first (Borrowers tab)")
+            return
+        loadouts = self.repo.get_all_loadouts()
+        if not loadouts:
+            QMessageBox.warning(self, "Error", "Create a loadout first (Loadouts tab)")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Plan Trip")
+        dialog.setMinimumWidth(400)
+        layout = QFormLayout()
+
+        name_input = QLineEdit()
+        name_input.setPlaceholderText("e.g. Elk Season 2026")
+        layout.addRow("Trip Name:", name_input)
+
+        loadout_combo = QComboBox()
+        for loadout in loadouts:
+            loadout_combo.addItem(loadout.name, loadout.id)
+        layout.addRow("Loadout:", loadout_combo)
+
+        borrower_combo = QComboBox()
+        for borrower in borrowers:
+            borrower_combo.addItem(borrower.name, borrower.id)
+        layout.addRow("Borrower:", borrower_combo)
+
+        location_input = QLineEdit()
+        location_input.setPlaceholderText("e.g. Sam Houston NF - Unit 3")
+        layout.addRow("Location:", location_input)
+
+        return_date_edit = QDateEdit()
+        return_date_edit.setDate(QDate.currentDate().addDays(7))
+        return_date_edit.setCalendarPopup(True)
+        layout.addRow("Expected Return:", return_date_edit)
+
+        notes_input = QTextEdit()
+        notes_input.setMaximumHeight(80)
+        layout.addRow("Notes:", notes_input)
+
+        def save():
+            name = name_input.text().strip()
+            if not name:
+                QMessageBox.warning(dialog, "Error", "Trip name is required")
+                return
+            self.repo.create_manifest_from_loadout(
+                loadout_combo.currentData(),
+                name,
+                borrower_combo.currentData(),
+                expected_return=datetime(
+                    return_date_edit.date().year(),
+                    return_date_edit.date().month(),
+                    return_date_edit.date().day(),
+                ),
+                location=location_input.text().strip(),
+                notes=notes_input.toPlainText(),
+            )
+            dialog.accept()
+            self.refresh_trips()
+
+        save_btn = QPushButton("Save")
+        save_btn.clicked.connect(save)
+        layout.addRow(save_btn)
+
+        dialog.setLayout(layout)
+        dialog.exec()
+
+    def view_selected_trip(self):
+        trip = self._get_selected_trip()
+        if not trip:
+            QMessageBox.warning(self, "No Selection", "Please select a trip.")
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Trip Manifest: {trip.name}")
+        dialog.setMinimumSize(600, 400)
+        layout = QVBoxLayout(dialog)
+
+        table = QTableWidget()
+        table.setColumnCount(4)
+        table.setHorizontalHeaderLabels(["Item", "Type", "Packed", "Returned"])
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        lines = self.repo.get_manifest_lines(trip.id)
+        table.setRowCount(len(lines))
+        for i, (line, item_name) in enumerate(lines):
+            table.setItem(i, 0, QTableWidgetItem(item_name))
+            table.setItem(i, 1, QTableWidgetItem(line.item_type.value))
+            table.setItem(i, 2, QTableWidgetItem(str(line.quantity)))
+            returned = (
+                "" if line.quantity_returned is None else str(line.quantity_returned)
+            )
+            table.setItem(i, 3, QTableWidgetItem(returned))
+        layout.addWidget(table)
+
+        close_btn = QPushButton("Close")
+        close_btn.clicked.connect(dialog.accept)
+        layout.addWidget(close_btn)
+        dialog.exec()
+
+    def start_selected_trip(self):
+        trip = self._get_selected_trip()
+        if not trip:
+            QMessageBox.warning(self, "No Selection", "Please select a trip to start.")
+            return
+
+        try:
+            self.repo.start_manifest(trip.id)
+        except ValueError as e:
+            QMessageBox.critical(self, "Cannot Start Trip", str(e))
+            return
+        self.refresh_all()
+        QMessageBox.information(
+            self, "Trip Started", f"Everything on '{trip.name}' is checked out."
+        )
+
+    def open_complete_trip_dialog(self):
+        trip = self._get_selected_trip()
+        if not trip:
+            QMessageBox.warning(
+                self, "No Selection", "Please select a trip to complete."
+            )
+            return
+        if trip.status != ManifestStatus.IN_PROGRESS:
+            QMessageBox.warning(
+                self, "Error", "Only a trip in progress can be completed"
+            )
+            return
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"Complete Trip: {trip.name}")
+        layout = QFormLayout()
+        layout.addRow(QLabel("All gear still out is returned. How much came back?"))
+
+        returned_spins = {}
+        for line, item_name in self.repo.get_manifest_lines(trip.id):
+            if line.item_type != GearCategory.CONSUMABLE:
+                continue
+            spin = QSpinBox()
+            spin.setRange(0, line.quantity)
+            spin.setSuffix(f" / {line.quantity}")
+            layout.addRow(f"{item_name}:", spin)
+            returned_spins[line.id] = spin
+
+        def save():
+            returned = {
+                line_id: spin.value() for line_id, spin in returned_spins.items()
+            }
+            try:
+                self.repo.complete_manifest(trip.id, returned)
+            except ValueError as e:
+                QMessageBox.critical(dialog, "Cannot Complete Trip", str(e))
+                return
+            dialog.accept()
+            self.refresh_all()
+
+        save_btn = QPushButton("Complete Trip")
+        save_btn.clicked.connect(save)
+        layout.addRow(save_btn)
+
+        dialog.setLayout(layout)
+        dialog.exec()
+
+    def export_selected_trip(self):
+        from reports import write_report
+
+        trip = self._get_selected_trip()
+        if not trip:
+            QMessageBox.warning(self, "No Selection", "Please select a trip to export.")
+            return
+
+        filters = {"Markdown Files (*.md)": "markdown", "CSV Files (*.csv)": "csv"}
+        file_path, selected = QFileDialog.getSaveFileName(
+            self,
+            "Export Trip Manifest",
+            str(Path.home() / "Documents" / f"trip_{trip.name}.md"),
+            ";;".join(filters),
+        )
+        if not file_path:
+            return
+
+        fmt = "csv" if file_path.lower().endswith(".csv") else filters[selected]
+        try:
+            write_report(
+                self.repo, "manifest", fmt, Path(file_path), manifest_id=trip.id
+            )
+            QMessageBox.information(
+                self, "Export Complete", f"Manifest saved to:\n{file_path}"
+            )
+        except Exception as e:
+            QMessageBox.critical(
+                self, "Export Error", f"Failed to export manifest:\n{str(e)}"
+            )
+
+    def delete_selected_trip(self):
+        trip = self._get_selected_trip()
+        if not trip:
+            QMessageBox.warning(self, "No Selection", "Please select a trip to delete.")
+            return
+
+        reply = QMessageBox.question(
+            self,
+            "Confirm Delete",
+            f"Delete the manifest for '{trip.name}'?",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
+            QMessageBox.StandardButton.No,
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+        try:
+            self.repo.delete_manifest(trip.id)
+        except ValueError as e:
+            QMessageBox.warning(self, "Error", str(e))
+            return
+        self.refresh_trips()
+
     # ============== CHECKOUTS TAB ==============
 
     def create_checkouts_tab(self):
@@ -1894,6 +2911,7 @@ class GearTrackerApp(QMainWindow):
         self.checkout_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.checkout_table, (0, 1, 2)))
         layout.addWidget(self.checkout_table)
 
         btn_layout = QHBoxLayout()
@@ -1910,9 +2928,12 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_checkouts(self):
         self.checkout_table.setRowCount(0)
         checkouts = self.repo.get_active_checkouts()
+        overdue = {checkout.id for checkout, _, _ in self.repo.get_overdue_checkouts()}
+        self.update_overdue_badge(len(overdue))
 
         for i, (checkout, borrower, item_name) in enumerate(checkouts):
             self.checkout_table.insertRow(i)
@@ -1928,13 +2949,28 @@ class GearTrackerApp(QMainWindow):
             exp_return = ""
             if checkout.expected_return:
                 exp_return = checkout.expected_return.strftime("%Y-%m-%d")
-                if checkout.expected_return < datetime.now():
-                    item = QTableWidgetItem(exp_return + " (OVERDUE)")
-                    item.setBackground(QColor(255, 150, 150))
-                    self.checkout_table.setItem(i, 4, item)
-                    continue
+            if checkout.id in overdue:
+                item = QTableWidgetItem(exp_return + " (OVERDUE)")
+                item.setBackground(QColor(255, 150, 150))
+                self.checkout_table.setItem(i, 4, item)
+                continue
             self.checkout_table.setItem(i, 4, QTableWidgetItem(exp_return))
 
+    def update_overdue_badge(self, count: int | None = None):
+        """Show the overdue count on the Checkouts tab, built or not."""
+        if count is None:
+            count = self.repo.count_overdue_checkouts()
+        index = self._checkouts_tab
+        label = self._tab_specs[index][0]
+        bar = self.tabs.tabBar()
+        if count:
+            self.tabs.setTabText(index, f"{label} ({count} overdue)")
+            bar.setTabTextColor(index, QColor(200, 0, 0))
+        else:
+            self.tabs.setTabText(index, label)
+            # An invalid colour restores the style's default
+            bar.setTabTextColor(index, QColor())
+
     def open_checkout_dialog(self):
         borrowers = self.repo.get_all_borrowers()
         if not borrowers:
@@ -1989,11 +3025,29 @@ class GearTrackerApp(QMainWindow):
         notes_input = QLineEdit()
         layout.addRow("Notes:", notes_input)
 
+        # Scanner mode: each scan adds an item, so several can go out at once
+        scanned_list = QListWidget()
+        scanned_list.setMaximumHeight(100)
+        scanned_list.setToolTip("Items scanned in scanner mode (F9)")
+        layout.addRow("Scanned:", scanned_list)
+        scanned: list[tuple[str, GearCategory]] = []
+
+        def on_scan(item_table: str, item_id: str):
+            for idx, (data_id, item_type) in enumerate(items_data):
+                if data_id == item_id:
+                    break
+            else:
+                self.statusBar().showMessage("⚠️ Scanned item is not available")
+                QApplication.beep()
+                return
+            if (item_id, item_type) not in scanned:
+                scanned.append((item_id, item_type))
+                scanned_list.addItem(item_combo.itemText(idx))
+            item_combo.setCurrentIndex(idx)
+
         save_btn = QPushButton("Checkout")
 
         def save():
-            idx = item_combo.currentIndex()
-            item_id, item_type = items_data[idx]
             borrower = borrowers[borrower_combo.currentIndex()]
 
             exp_return = datetime(
@@ -2002,9 +3056,18 @@ class GearTrackerApp(QMainWindow):
                 return_date.date().day(),
             )
 
-            self.repo.checkout_item(
-                item_id, item_type, borrower.id, exp_return, notes_input.text()
-            )
+            items = scanned or [items_data[item_combo.currentIndex()]]
+            try:
+                # One transaction (and one undo step) for the whole batch
+                self.repo.checkout_items(
+                    [item_id for item_id, _ in items],
+                    borrower.id,
+                    exp_return,
+                    notes_input.text(),
+                )
+            except ValueError as e:
+                QMessageBox.warning(dialog, "Error", str(e))
+                return
             self.refresh_all()
             dialog.accept()
 
@@ -2012,7 +3075,11 @@ class GearTrackerApp(QMainWindow):
         layout.addRow(save_btn)
 
         dialog.setLayout(layout)
-        dialog.exec()
+        self._scan_target = on_scan
+        try:
+            dialog.exec()
+        finally:
+            self._scan_target = None
 
     def return_selected_item(self):
         row = self.checkout_table.currentRow()
@@ -2222,31 +3289,10 @@ class GearTrackerApp(QMainWindow):
                 cons = consumable_dict.get(cons_id)
 
                 if cons:
-                    # Add back to inventory
-                    new_qty = cons.quantity + original_qty
-
-                    # Update consumable quantity
-                    conn = sqlite3.connect(self.repo.db_path)
-                    cursor = conn.cursor()
-                    cursor.execute(
-                        "UPDATE consumables SET quantity = ? WHERE id = ?",
-                        (new_qty, cons_id),
-                    )
-
-                    # Record transaction
-                    tx_id = str(uuid.uuid4())
-                    cursor.execute(
-                        "INSERT INTO consumable_transactions VALUES (?, ?, ?, ?, ?)",
-                        (
-                            tx_id,
-                            cons_id,
-                            "RESTOCK",
-                            original_qty,
-                            int(datetime.now().timestamp()),
-                        ),
+                    # Add back to inventory and record the transaction
+                    self.repo.update_consumable_quantity(
+                        cons_id, original_qty, "RESTOCK"
                     )
-                    conn.commit()
-                    conn.close()
 
                     restocked_items.append(f"{cons.name} (+{original_qty} {cons.unit})")
                     added_count += 1
@@ -2347,6 +3393,7 @@ class GearTrackerApp(QMainWindow):
         self.borrower_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.borrower_table, (0, 1, 2)))
         layout.addWidget(self.borrower_table)
 
         btn_layout = QHBoxLayout()
@@ -2364,6 +3411,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_borrowers(self):
         self.borrower_table.setRowCount(0)
         borrowers = self.repo.get_all_borrowers()
@@ -2479,6 +3527,7 @@ class GearTrackerApp(QMainWindow):
         self.nfa_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.nfa_table, (0, 1, 2, 3, 5)))
         layout.addWidget(self.nfa_table)
 
         btn_layout = QHBoxLayout()
@@ -2506,6 +3555,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_nfa_items(self):
         self.nfa_table.setRowCount(0)
         items = self.repo.get_all_nfa_items()
@@ -2652,6 +3702,7 @@ class GearTrackerApp(QMainWindow):
         )
 
         table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(TableFilterBar(table, (1, 2, 3, 4)))
         layout.addWidget(table)
         self.transfers_table = table
 
@@ -2669,6 +3720,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_transfers(self):
         self.transfers_table.setRowCount(0)
         transfers = self.repo.get_all_transfers()
@@ -2693,6 +3745,9 @@ class GearTrackerApp(QMainWindow):
 
     def create_import_export_tab(self):
         """Create Import/Export tab using CSV import/export module."""
+        # Imported on first use to keep it off the startup path
+        from csv_import_export import create_import_export_tab
+
         widget = create_import_export_tab(
             repo=self.repo, message_box_class=QMessageBox, qfiledialog_class=QFileDialog
         )
@@ -2887,7 +3942,6 @@ class GearTrackerApp(QMainWindow):
             return
 
         selected = items[row]
-        logs = self.repo.get_logs_for_item(selected.id)
 
         dialog = QDialog(self)
         dialog.setWindowTitle(f"History: {selected.name}")
@@ -2902,19 +3956,77 @@ class GearTrackerApp(QMainWindow):
             QHeaderView.ResizeMode.Stretch
         )
 
-        for i, log in enumerate(logs):
-            hist_table.insertRow(i)
-            hist_table.setItem(
-                i, 0, QTableWidgetItem(log.date.strftime("%Y-%m-%d %H:%M"))
-            )
-            hist_table.setItem(i, 1, QTableWidgetItem(log.log_type.value))
+        def fill_row(i, log):
+            date_item = QTableWidgetItem(log.date.strftime("%Y-%m-%d %H:%M"))
+            date_item.setData(Qt.ItemDataRole.UserRole, log)
+            hist_table.setItem(i, 0, date_item)
+            log_type = log.log_type.value
+            if log.photo_path:
+                log_type += " 📷"
+            hist_table.setItem(i, 1, QTableWidgetItem(log_type))
             hist_table.setItem(i, 2, QTableWidgetItem(log.details or ""))
             hist_table.setItem(
                 i, 3, QTableWidgetItem(str(log.ammo_count) if log.ammo_count else "")
             )
 
+        def show_event_photos():
+            row = hist_table.currentRow()
+            if row < 0:
+                QMessageBox.warning(dialog, "Error", "Select an event first")
+                return
+            log = hist_table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+            self.open_photo_gallery(
+                f"Photos: {selected.name}, {log.date.strftime('%Y-%m-%d')}",
+                [log] if log.photo_path else [],
+            )
+
         layout.addWidget(hist_table)
+
+        btn_layout = QHBoxLayout()
+        item_photos_btn = QPushButton("📷 All Photos")
+        item_photos_btn.clicked.connect(
+            lambda: self.open_photo_gallery(
+                f"Photos: {selected.name}", self.repo.get_photo_logs(selected.id)
+            )
+        )
+        btn_layout.addWidget(item_photos_btn)
+        event_photos_btn = QPushButton("📷 Event Photos")
+        event_photos_btn.clicked.connect(show_event_photos)
+        btn_layout.addWidget(event_photos_btn)
+        layout.addLayout(btn_layout)
+
         dialog.setLayout(layout)
+        dialog.loader = PagedTableLoader(
+            hist_table,
+            lambda after: self.repo.get_logs_for_item_page(selected.id, after),
+            fill_row,
+        )
+        dialog.exec()
+
+    def open_photo_gallery(self, title: str, logs: list[MaintenanceLog]):
+        photos = []
+        for log in logs:
+            caption = f"{log.date.strftime('%Y-%m-%d')} {log.log_type.value}"
+            photos.extend((path, caption) for path in photo_files(log.photo_path))
+        if not photos:
+            QMessageBox.information(self, "No Photos", "No photos are attached.")
+            return
+
+        if self._thumbnail_cache is None:
+            self._thumbnail_cache = ThumbnailCache()
+
+        dialog = QDialog(self)
+        dialog.setWindowTitle(f"{title} ({len(photos)})")
+        dialog.setMinimumSize(800, 600)
+        layout = QVBoxLayout(dialog)
+
+        loader = ThumbnailLoader(self._thumbnail_cache, parent=dialog)
+        dialog.finished.connect(loader.cancel)
+        layout.addWidget(PhotoGallery(photos, loader))
+
+        hint = QLabel("Double-click a photo to open it.")
+        hint.setStyleSheet("color: #888; font-style: italic;")
+        layout.addWidget(hint)
         dialog.exec()
 
     # ============== RELOADING TAB ==============
@@ -2946,6 +4058,7 @@ class GearTrackerApp(QMainWindow):
         self.reload_table.horizontalHeader().setSectionResizeMode(
             QHeaderView.ResizeMode.Stretch
         )
+        layout.addWidget(TableFilterBar(self.reload_table, (1, 2, 3, 4)))
         layout.addWidget(self.reload_table)
 
         btn_layout = QHBoxLayout()
@@ -2971,6 +4084,7 @@ class GearTrackerApp(QMainWindow):
         widget.setLayout(layout)
         return widget
 
+    @_built_tab_only
     def refresh_reloads(self):
         self.reload_table.setRowCount(0)
         batches = self.repo.get_all_reload_batches()
@@ -3227,6 +4341,24 @@ class GearTrackerApp(QMainWindow):
         sd_spin.setRange(0, 1000)
         layout.addRow("SD:", sd_spin)
 
+        shot_string_input = QLineEdit()
+        shot_string_input.setPlaceholderText("e.g., 2710, 2695, 2702 (overrides avg/ES/SD)")
+        layout.addRow("Shot string (fps):", shot_string_input)
+
+        pooled = self.repo.compare_reload_batches([batch.id]).get(batch.id)
+        if pooled:
+            summary = (
+                f"{pooled.shots} shots recorded: {pooled.mean_fps:.0f} fps avg, "
+                f"ES {pooled.es_fps:.0f}, SD {pooled.sd_fps:.1f}"
+            )
+            if pooled.ke_ftlb:
+                summary += f", {pooled.ke_ftlb:.0f} ft-lb"
+            if pooled.tko:
+                summary += f", TKO {pooled.tko:.1f}"
+            summary_label = QLabel(summary)
+            summary_label.setStyleSheet("color: #888; font-style: italic;")
+            layout.addRow("", summary_label)
+
         group_size_input = QLineEdit()
         group_size_input.setPlaceholderText("e.g., 1.5")
         layout.addRow("Group size (in):", group_size_input)
@@ -3259,12 +4391,31 @@ class GearTrackerApp(QMainWindow):
                 )
                 return
 
+            velocities = None
+            if shot_string_input.text().strip():
+                try:
+                    velocities = parse_velocities(shot_string_input.text())
+                except ValueError as e:
+                    QMessageBox.warning(dialog, "Error", f"Invalid shot string: {e}")
+                    return
+
             test_dt = datetime(
                 test_date_edit.date().year(),
                 test_date_edit.date().month(),
                 test_date_edit.date().day(),
             )
 
+            if velocities is not None:
+                self.repo.add_shot_string(
+                    ShotString(
+                        id=str(uuid.uuid4()),
+                        batch_id=batch.id,
+                        recorded_date=test_dt,
+                        velocities=velocities,
+                        firearm_id=batch.firearm_id,
+                    )
+                )
+
             updated = ReloadBatch(
                 id=batch.id,
                 cartridge=batch.cartridge,
@@ -3322,21 +4473,56 @@ class GearTrackerApp(QMainWindow):
                 self, "Deleted", "Reload batch has been deleted from log."
             )
 
+    def undo_action(self):
+        self._replay_action(self.repo.undo, "undo", "Undid")
+
+    def redo_action(self):
+        self._replay_action(self.repo.redo, "redo", "Redid")
+
+    def _replay_action(
+        self, replay: Callable[[], str | None], verb: str, done: str
+    ):
+        try:
+            label = replay()
+        except ValueError as e:
+            QMessageBox.warning(self, f"Cannot {verb}", str(e))
+            return
+        if label is None:
+            self.statusBar().showMessage(f"Nothing to {verb}")
+            return
+        self.refresh_all()
+        self.statusBar().showMessage(f"{done}: {label}")
+
     def refresh_all(self):
-        self.refresh_firearms()
-        self.refresh_attachments()
-        self.refresh_reloads()
-        self.refresh_soft_gear()
-        self.refresh_consumables()
-        self.refresh_loadouts()
-        self.refresh_checkouts()
-        self.refresh_borrowers()
-        self.refresh_nfa_items()
-        self.refresh_transfers()
+        # Tabs not built yet are populated when first opened
+        self._stale_tabs.clear()
+        for index in sorted(self._built_tabs):
+            refresher = self._tab_specs[index][2]
+            if refresher:
+                refresher()
+        if self._checkouts_tab not in self._built_tabs:
+            self.update_overdue_badge()
 
 
 def main():
+    # --profile-startup: print per-phase timings after the first paint and exit
+    profiler = None
+    if "--profile-startup" in sys.argv:
+        sys.argv.remove("--profile-startup")
+        profiler = StartupProfiler(_IMPORT_START)
+        profiler.mark("module imports")
+
+    # --trace-sql: per-method query counts on exit, slow statements logged
+    sql_trace = None
+    if "--trace-sql" in sys.argv:
+        sys.argv.remove("--trace-sql")
+        from instrumentation import QueryInstrumentation
+
+        sql_trace = QueryInstrumentation(log_path=VAULT_DIR / "slow_queries.log")
+
     app = QApplication(sys.argv)
+    if sql_trace:
+        app.aboutToQuit.connect(lambda: print(sql_trace.report()))
 
     # Apply Dark Mode
     app.setStyle("Fusion")
@@ -3360,9 +4546,24 @@ def main():
     palette.setColor(QPalette.ColorRole.HighlightedText, QColor(255, 255, 255))
 
     app.setPalette(palette)
+    if profiler:
+        profiler.mark("QApplication + theme")
 
-    window = GearTrackerApp()
+    window = GearTrackerApp(profiler, sql_trace)
     window.show()
+
+    if profiler:
+        profiler.mark("show window")
+
+        def first_paint():
+            window.repaint()
+            profiler.mark("first paint")
+            print(profiler.report())
+            app.quit()
+
+        # Runs once the event loop has processed the initial show/layout
+        QTimer.singleShot(0, first_paint)
+
     sys.exit(app.exec())
 
 
@@ -3705,4 +4906,6 @@ class ImportProgressDialog(QDialog):
 
 
 if __name__ == "__main__":
+    # Label encoding workers re-enter the frozen binary
+    multiprocessing.freeze_support()
     main()
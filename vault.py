@@ -0,0 +1,176 @@
+"""
+Vault Module
+
+Multi-profile support: each profile ("vault") is an independent GearTracker
+database file, e.g. personal.db and parish.db. Profiles are listed in a small
+JSON registry next to the databases; no data is shared between them.
+
+Opened repositories are cached by resolved database path, so switching back
+to a profile reuses its already-initialized repository and warm connections
+instead of re-running schema setup.
+"""
+
+import json
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from gear_tracker import GearRepository
+
+VAULT_DIR = Path.home() / ".gear_tracker"
+REGISTRY_FILE = "profiles.json"
+
+# The original single-database location becomes the default profile
+DEFAULT_PROFILE = "Personal"
+DEFAULT_DB_NAME = "tracker.db"
+
+# Repositories kept open at once; least recently used beyond this are closed
+MAX_OPEN_REPOSITORIES = 4
+
+
+@dataclass
+class Profile:
+    name: str
+    db_path: Path
+    last_opened: datetime | None = None
+
+
+class ProfileRegistry:
+    """Profiles persisted as JSON in the vault directory."""
+
+    def __init__(self, vault_dir: Path = VAULT_DIR):
+        self.vault_dir = vault_dir
+        self.path = vault_dir / REGISTRY_FILE
+        self.profiles: dict[str, Profile] = {}
+        self.active: str = DEFAULT_PROFILE
+        self._load()
+
+    def _load(self) -> None:
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            for entry in data.get("profiles", []):
+                last_opened = entry.get("last_opened")
+                self.profiles[entry["name"]] = Profile(
+                    name=entry["name"],
+                    db_path=Path(entry["db_path"]),
+                    last_opened=datetime.fromtimestamp(last_opened)
+                    if last_opened
+                    else None,
+                )
+            self.active = data.get("active", DEFAULT_PROFILE)
+
+        if not self.profiles:
+            self.profiles[DEFAULT_PROFILE] = Profile(
+                name=DEFAULT_PROFILE, db_path=self.vault_dir / DEFAULT_DB_NAME
+            )
+        if self.active not in self.profiles:
+            self.active = next(iter(self.profiles))
+
+    def save(self) -> None:
+        self.vault_dir.mkdir(parents=True, exist_ok=True)
+        data = {
+            "active": self.active,
+            "profiles": [
+                {
+                    "name": p.name,
+                    "db_path": str(p.db_path),
+                    "last_opened": int(p.last_opened.timestamp())
+                    if p.last_opened
+                    else None,
+                }
+                for p in self.profiles.values()
+            ],
+        }
+        # Write-then-rename so a crash never leaves a truncated registry
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+    def list_profiles(self) -> list[Profile]:
+        return list(self.profiles.values())
+
+    def get(self, name: str) -> Profile:
+        if name not in self.profiles:
+            raise ValueError(f"Unknown profile: {name}")
+        return self.profiles[name]
+
+    def add_profile(self, name: str, db_path: Path | None = None) -> Profile:
+        """Register a profile; the database is created when first opened."""
+        name = name.strip()
+        if not name:
+            raise ValueError("Profile name cannot be empty")
+        if name in self.profiles:
+            raise ValueError(f"Profile already exists: {name}")
+
+        if db_path is None:
+            slug = re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_") or "profile"
+            db_path = self.vault_dir / f"{slug}.db"
+        db_path = Path(db_path).expanduser()
+
+        for existing in self.profiles.values():
+            if existing.db_path.resolve() == db_path.resolve():
+                raise ValueError(
+                    f"Database already used by profile '{existing.name}': {db_path}"
+                )
+
+        profile = Profile(name=name, db_path=db_path)
+        self.profiles[name] = profile
+        self.save()
+        return profile
+
+    def remove_profile(self, name: str) -> None:
+        """Unregister a profile. The database file is left on disk."""
+        self.get(name)
+        if len(self.profiles) == 1:
+            raise ValueError("Cannot remove the only profile")
+        del self.profiles[name]
+        if self.active == name:
+            self.active = next(iter(self.profiles))
+        self.save()
+
+
+class RepositoryCache:
+    """Open GearRepository instances keyed by resolved database path (LRU)."""
+
+    def __init__(self, max_open: int = MAX_OPEN_REPOSITORIES):
+        self.max_open = max_open
+        self._repos: OrderedDict[Path, GearRepository] = OrderedDict()
+
+    def get(self, db_path: Path) -> GearRepository:
+        key = Path(db_path).expanduser().resolve()
+        repo = self._repos.get(key)
+        if repo is not None:
+            self._repos.move_to_end(key)
+            return repo
+
+        repo = GearRepository(key)
+        self._repos[key] = repo
+        while len(self._repos) > self.max_open:
+            _, evicted = self._repos.popitem(last=False)
+            evicted.close()
+        return repo
+
+    def close_all(self) -> None:
+        for repo in self._repos.values():
+            repo.close()
+        self._repos.clear()
+
+
+_cache = RepositoryCache()
+
+
+def get_repository(db_path: Path) -> GearRepository:
+    """Shared, already-initialized repository for a database file."""
+    return _cache.get(db_path)
+
+
+def open_profile(registry: ProfileRegistry, name: str) -> GearRepository:
+    """Open (or reuse) a profile's repository and mark it active."""
+    profile = registry.get(name)
+    repo = get_repository(profile.db_path)
+    profile.last_opened = datetime.now()
+    registry.active = name
+    registry.save()
+    return repo